@@ -0,0 +1,8 @@
+-- Encoded game fields (src/engine/field_codec.py). Rows written before the
+-- column existed keep a null blob until their field changes, and are read
+-- from their elements meanwhile.
+--
+--     psql -h "$DB_HOST" -U "$DB_USER" -d "$DB_NAME" \
+--         -f migrations/001_field_blob.sql
+
+alter table game_field_assignment add column if not exists field_blob bytea;
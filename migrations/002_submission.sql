@@ -0,0 +1,23 @@
+-- Runs of children's programs (src/models/submission_model.py), written in
+-- batches by src/services/submission_buffer.py.
+--
+--     psql -h "$DB_HOST" -U "$DB_USER" -d "$DB_NAME" \
+--         -f migrations/002_submission.sql
+
+create table if not exists submission (
+    submission_id uuid primary key,
+    user_login varchar(255) not null
+        references "user" (user_login) on delete cascade,
+    assignment_id uuid not null
+        references game_field_assignment (assignment_id) on delete cascade,
+    program jsonb not null,
+    outcome varchar(32) not null,
+    x smallint not null,
+    y smallint not null,
+    steps integer not null,
+    created_at timestamptz not null
+);
+
+-- keyset pagination of a child's submissions
+create index if not exists ix_submission_user_assignment_created
+    on submission (user_login, assignment_id, created_at, submission_id);
@@ -0,0 +1,20 @@
+-- Results of users on the assignments of a course
+-- (src/models/journal_model.py), upserted with every flush of submissions.
+--
+--     psql -h "$DB_HOST" -U "$DB_USER" -d "$DB_NAME" \
+--         -f migrations/003_journal.sql
+
+create table if not exists journal (
+    course_id uuid
+        references course (course_id) on delete cascade,
+    user_login varchar(255)
+        references "user" (user_login) on delete cascade,
+    assignment_id uuid
+        references assignment (assignment_id) on delete cascade,
+    attempts integer not null,
+    solved boolean not null,
+    best_steps integer,
+    last_outcome varchar(32) not null,
+    last_attempt_at timestamptz not null,
+    primary key (course_id, user_login, assignment_id)
+);
@@ -0,0 +1,20 @@
+-- Time of the first solution with the fewest steps, the tie-breaker of the
+-- course leaderboards (src/services/leaderboard.py). Entries solved before
+-- the column existed are filled from their submissions.
+--
+--     psql -h "$DB_HOST" -U "$DB_USER" -d "$DB_NAME" \
+--         -f migrations/004_journal_best_at.sql
+
+alter table journal add column if not exists best_at timestamptz;
+
+update journal j
+set best_at = (
+    select s.created_at
+    from submission s
+    where s.user_login = j.user_login
+        and s.assignment_id = j.assignment_id
+        and s.outcome = 'reached_goal'
+    order by s.steps, s.created_at
+    limit 1
+)
+where j.solved and j.best_at is null;
@@ -0,0 +1,10 @@
+-- Passwords are stored as scrypt hashes (scrypt$<n>$<r>$<p>$<salt>$<hash>,
+-- about 90 characters, see src/utils/user_utils/hash.py), longer than the
+-- old varchar(60). Apply before deploying the code that writes them:
+-- registrations and the rehash of old digests at login fail on a narrower
+-- column.
+--
+--     psql -h "$DB_HOST" -U "$DB_USER" -d "$DB_NAME" \
+--         -f migrations/005_user_password_length.sql
+
+alter table "user" alter column password type varchar(255);
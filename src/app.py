@@ -1,13 +1,116 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from time import perf_counter
+
+from fastapi import FastAPI, Request
 from views.user_view import router as user_router
 from views.course_view import router as course_router
 from views.assignment_view import router as assignment_router
+from views.service_view import router as service_router
+from views.grading_view import router as grading_router
+from views.submission_view import router as submission_router
+from views.journal_view import router as journal_router
+from views.leaderboard_view import router as leaderboard_router
+from views.classroom_view import router as classroom_router
 from uvicorn import run
 
-app = FastAPI()
+from db.db_helper import db_helper, SAFE_METHODS
+from core.config import DB_SETTINGS
+from services.process_pool import shutdown_executor
+from utils.user_utils.hash import shutdown_hash_executor
+from services.submission_buffer import SUBMISSION_BUFFER
+from services.leaderboard import LEADERBOARDS
+from services.leaderboard_services import LeaderboardService
+from services.classroom_hub import CLASSROOM_HUB
+
+# SQL queries
+import repository.sql_queries.assignments_queries as assignments_queries
+import repository.sql_queries.course_queries as course_queries
+import repository.sql_queries.user_queries as user_queries
+import repository.sql_queries.submission_queries as submission_queries
+import repository.sql_queries.journal_queries as journal_queries
+from repository.sql_queries import collect_statements
+
+# logger
+from logger.logger_module import ModuleLoger
+
+# path worker
+from pathlib import Path
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn doesn't accept requests until the startup part is finished
+    started = perf_counter()
+    statements = collect_statements(
+        assignments_queries,
+        course_queries,
+        user_queries,
+        submission_queries,
+        journal_queries,
+    )
+    try:
+        failed = await db_helper.warm_up(
+            statements=statements,
+            connections=DB_SETTINGS.warmup_connections,
+        )
+    except Exception as e:
+        logger.error("Warm-up failed, starting cold: %s" % e)
+    else:
+        for name, error in failed.items():
+            logger.warning("Statement %s was not prepared: %s" % (name, error))
+        logger.info(
+            "Warm-up finished in %.3f s: %s connections, %s of %s statements "
+            "prepared"
+            % (
+                perf_counter() - started,
+                DB_SETTINGS.warmup_connections,
+                len(statements) - len(failed),
+                len(statements),
+            )
+        )
+
+    await CLASSROOM_HUB.start()
+    # the boards follow the journal of every worker through the hub
+    CLASSROOM_HUB.add_listener(LEADERBOARDS.apply_message)
+    try:
+        await LeaderboardService.rebuild()
+    except Exception as e:
+        logger.error("Leaderboards were not rebuilt: %s" % e)
+    SUBMISSION_BUFFER.add_listener(CLASSROOM_HUB.publish)
+    SUBMISSION_BUFFER.start()
+
+    yield
+
+    # before the pools are closed: the buffer writes what it holds
+    await SUBMISSION_BUFFER.stop()
+    await CLASSROOM_HUB.stop()
+    await db_helper.dispose()
+    shutdown_executor()
+    shutdown_hash_executor()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(user_router)
 app.include_router(course_router)
 app.include_router(assignment_router)
+app.include_router(service_router)
+app.include_router(grading_router)
+app.include_router(submission_router)
+app.include_router(journal_router)
+app.include_router(leaderboard_router)
+app.include_router(classroom_router)
+
+
+@app.middleware("http")
+async def pin_writes(request: Request, call_next):
+    # read-your-writes: the cookie sends the next reads to the primary,
+    # whichever worker serves them
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        db_helper.write_pins.pin(response)
+    return response
 
 
 if __name__ == "__main__":
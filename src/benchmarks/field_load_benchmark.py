@@ -0,0 +1,105 @@
+"""
+Loading game fields for the engine: GET_GAME_FIELDS_DATA (joins and
+json_agg) against GET_FIELD_BLOBS (one bytea column) plus decoding.
+
+Seeds a course with assignments inside a transaction that is rolled back
+at the end, so it can be run against any development database:
+
+    cd src && python -m benchmarks.field_load_benchmark --assignments 30
+"""
+
+import asyncio
+import json
+from argparse import ArgumentParser
+from random import Random
+from statistics import mean, quantiles
+from time import perf_counter
+
+from benchmarks.seed import seed_assignment, seed_course, seed_user
+from core.config import ROLE_SETTING
+from db.db_helper import db_helper
+from engine.field_codec import decode_field, encode_field
+from engine.game_field import GameField
+from repository.assignment_repo import AssignmentRepo
+
+
+def summary(timings: list[float]) -> dict:
+    return {
+        "mean_ms": round(mean(timings), 3),
+        "p50_ms": round(quantiles(timings, n=100)[49], 3),
+        "p95_ms": round(quantiles(timings, n=100)[94], 3),
+    }
+
+
+async def main(assignments: int, obstacles: int, runs: int) -> dict:
+    async with db_helper.engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            session = db_helper.session_factory(bind=connection)
+            teacher = await seed_user(
+                session,
+                "bench_field_load",
+                password="-",
+                role_id=ROLE_SETTING.teacher_role_id,
+            )
+            course_id = await seed_course(session, teacher, "Bench course")
+            rng = Random(0)
+            assignment_ids = [
+                await seed_assignment(
+                    session, course_id, obstacles=obstacles, rng=rng
+                )
+                for _ in range(assignments)
+            ]
+            fields_data = await AssignmentRepo.get_fields_data(
+                assignment_ids, session
+            )
+            await AssignmentRepo.update_field_blobs(
+                {
+                    assignment_id: encode_field(
+                        GameField.from_field_data(data)
+                    )
+                    for assignment_id, data in fields_data.items()
+                },
+                session,
+            )
+
+            rows, blobs = [], []
+            for _ in range(runs):
+                started = perf_counter()
+                fields_data = await AssignmentRepo.get_fields_data(
+                    assignment_ids, session
+                )
+                for data in fields_data.values():
+                    GameField.from_field_data(data)
+                rows.append((perf_counter() - started) * 1000)
+
+                started = perf_counter()
+                for blob in (
+                    await AssignmentRepo.get_field_blobs(
+                        assignment_ids, session
+                    )
+                ).values():
+                    decode_field(blob)
+                blobs.append((perf_counter() - started) * 1000)
+        finally:
+            await transaction.rollback()
+    await db_helper.dispose()
+    return {
+        "assignments": assignments,
+        "rows_and_json": summary(rows),
+        "field_blob": summary(blobs),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assignments", type=int, default=30)
+    parser.add_argument("--obstacles", type=int, default=60)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            asyncio.run(main(args.assignments, args.obstacles, args.runs)),
+            indent=2,
+        )
+    )
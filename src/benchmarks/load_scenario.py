@@ -0,0 +1,383 @@
+"""
+Start of a lesson: every student logs in with POST /login/, then opens
+/courses/ and /full_assignment/{uuid} of their course. Reports latency
+percentiles and throughput per endpoint and saves them as JSON.
+
+Seeds teachers, courses with students and assignments under a login prefix
+and commits them, the app reads them through its own sessions. Run from
+src with the DB_* variables of the database set:
+
+    python -m benchmarks.load_scenario --courses 30 --students 25
+    python -m benchmarks.load_scenario --reuse --concurrency 200 \\
+        --compare load_before.json
+    python -m benchmarks.load_scenario --cleanup
+
+By default the app runs in this process (httpx ASGITransport, lifespan
+included), so client and server share the event loop and the CPU; with
+--url requests go over the network to a running server instead, e.g. a
+uvicorn with several workers: --url http://127.0.0.1:8000.
+"""
+
+import asyncio
+import json
+import platform
+from argparse import ArgumentParser
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime
+from random import Random
+from statistics import mean, quantiles
+from time import perf_counter
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.seed import seed_assignment, seed_course, seed_user
+from core.config import ROLE_SETTING
+from db.db_helper import db_helper
+from db.unit_of_work import UnitOfWork
+from utils.user_utils.hash import hash_password_sync
+
+PASSWORD = "load-scenario"
+
+GET_SEEDED_STUDENTS = text(
+    """
+    select cu.user_login, cu.course_id
+    from course_user cu
+    join course c using(course_id)
+    where left(c.owner, length(:prefix)) = :prefix
+    order by cu.course_id, cu.user_login
+    """
+)
+
+GET_SEEDED_ASSIGNMENTS = text(
+    """
+    select a.course_id, a.assignment_id
+    from assignment a
+    join course c using(course_id)
+    where left(c.owner, length(:prefix)) = :prefix
+    order by a.course_id, a.assignment_id
+    """
+)
+
+# rows of the prefix in the order of the foreign keys; submissions and the
+# journal go with their assignments
+CLEANUP = [
+    text(
+        f"""
+        with seeded as (
+            select a.assignment_id
+            from assignment a
+            join course c using(course_id)
+            where left(c.owner, length(:prefix)) = :prefix
+        )
+        {statement}
+        """
+    )
+    for statement in (
+        """
+        delete from assignment_action
+        where assignment_id in (select assignment_id from seeded)
+        """,
+        """
+        , placed as (
+            delete from assignment_element
+            where assignment_id in (select assignment_id from seeded)
+            returning element_id
+        )
+        delete from element
+        where element_id in (select element_id from placed)
+        """,
+        """
+        delete from game_field_assignment
+        where assignment_id in (select assignment_id from seeded)
+        """,
+        """
+        delete from assignment
+        where assignment_id in (select assignment_id from seeded)
+        """,
+    )
+] + [
+    text(
+        """
+        delete from course_user
+        where course_id in (
+            select course_id
+            from course
+            where left(owner, length(:prefix)) = :prefix
+        )
+        """
+    ),
+    text("delete from course where left(owner, length(:prefix)) = :prefix"),
+    text(
+        """
+        delete from md_user
+        where left(user_login, length(:prefix)) = :prefix
+        """
+    ),
+    text(
+        """
+        delete from "user"
+        where left(user_login, length(:prefix)) = :prefix
+        """
+    ),
+]
+
+
+async def seed(
+    prefix: str, courses: int, students: int, assignments: int
+) -> None:
+    """Teachers, courses with students and assignments, committed."""
+    rng = Random(0)
+    # one scrypt hash for everybody, the app checks it as any other
+    password = hash_password_sync(PASSWORD)
+    async with UnitOfWork(db_helper.session_factory) as session:
+        for course in range(courses):
+            teacher = await seed_user(
+                session,
+                f"{prefix}t{course}",
+                password=password,
+                role_id=ROLE_SETTING.teacher_role_id,
+            )
+            logins = [
+                await seed_user(session, f"{prefix}s{course}_{n}", password)
+                for n in range(students)
+            ]
+            course_id = await seed_course(
+                session, teacher, f"Load course {course}", logins
+            )
+            for _ in range(assignments):
+                await seed_assignment(session, course_id, rng=rng)
+
+
+async def load_plan(prefix: str) -> list[tuple[str, list[str]]]:
+    """(student login, assignment ids of their course) of the seeded rows."""
+    async with UnitOfWork(db_helper.session_factory) as session:
+        students = (
+            await session.execute(GET_SEEDED_STUDENTS, {"prefix": prefix})
+        ).all()
+        assignments: dict[str, list[str]] = {}
+        for course_id, assignment_id in await session.execute(
+            GET_SEEDED_ASSIGNMENTS, {"prefix": prefix}
+        ):
+            assignments.setdefault(str(course_id), []).append(
+                str(assignment_id)
+            )
+    return [
+        (user_login, assignments.get(str(course_id), []))
+        for user_login, course_id in students
+    ]
+
+
+async def cleanup(prefix: str) -> None:
+    async with UnitOfWork(db_helper.session_factory) as session:
+        for statement in CLEANUP:
+            await session.execute(statement, {"prefix": prefix})
+
+
+class Recorder:
+    def __init__(self):
+        # endpoint -> latencies in ms, endpoint -> failed requests
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        method: str,
+        url: str,
+        **kwargs,
+    ) -> httpx.Response | None:
+        started = perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies.setdefault(endpoint, []).append(
+            (perf_counter() - started) * 1000
+        )
+        if response is None or response.status_code >= 400:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        report = {}
+        for endpoint, latencies in self.latencies.items():
+            if len(latencies) > 1:
+                cuts = quantiles(latencies, n=100, method="inclusive")
+                p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+            else:
+                p50 = p95 = p99 = latencies[0]
+            report[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput_rps": round(len(latencies) / elapsed, 1),
+                "mean_ms": round(mean(latencies), 2),
+                "p50_ms": round(p50, 2),
+                "p95_ms": round(p95, 2),
+                "p99_ms": round(p99, 2),
+                "max_ms": round(max(latencies), 2),
+            }
+        return report
+
+
+async def student(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    user_login: str,
+    assignment_ids: list[str],
+    opens: int,
+) -> None:
+    """One student's start of the lesson, with their own cookies."""
+    response = await recorder.request(
+        client,
+        "POST /login/",
+        "POST",
+        "/login/",
+        json={"user_login": user_login, "password": PASSWORD},
+    )
+    if response is None or response.status_code != 200:
+        return
+    cookies = response.cookies
+    await recorder.request(
+        client, "GET /courses/", "GET", "/courses/", cookies=cookies
+    )
+    for assignment_id in assignment_ids[:opens]:
+        await recorder.request(
+            client,
+            "GET /full_assignment/{uuid}",
+            "GET",
+            f"/full_assignment/{assignment_id}",
+            cookies=cookies,
+        )
+
+
+async def storm(
+    client: httpx.AsyncClient,
+    plan: list[tuple[str, list[str]]],
+    concurrency: int,
+    ramp: float,
+    opens: int,
+) -> dict:
+    """
+    Students arrive evenly over ramp seconds, at most concurrency of them
+    are in flight.
+    """
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def arrive(index: int, user_login: str, assignment_ids) -> None:
+        await asyncio.sleep(ramp * index / max(len(plan), 1))
+        async with semaphore:
+            await student(client, recorder, user_login, assignment_ids, opens)
+
+    started = perf_counter()
+    await asyncio.gather(
+        *(
+            arrive(index, user_login, assignment_ids)
+            for index, (user_login, assignment_ids) in enumerate(plan)
+        )
+    )
+    elapsed = perf_counter() - started
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "students": len(plan),
+        "endpoints": recorder.report(elapsed),
+    }
+
+
+def compare(current: dict, previous: dict) -> dict:
+    """Ratios current / previous per endpoint, below 1 is faster."""
+    ratios = {}
+    for endpoint, now in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        ratios[endpoint] = {
+            key: round(now[key] / before[key], 3) if before[key] else None
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        }
+    return ratios
+
+
+async def main(args) -> dict:
+    if args.cleanup:
+        await cleanup(args.prefix)
+        await db_helper.dispose()
+        return {"cleanup": args.prefix}
+
+    if not args.reuse:
+        await seed(args.prefix, args.courses, args.students, args.assignments)
+    plan = await load_plan(args.prefix)
+    if not plan:
+        raise SystemExit(f"Nothing seeded with prefix {args.prefix!r}")
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url)
+        else:
+            from app import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://load.local",
+            )
+        await stack.enter_async_context(client)
+        client.timeout = httpx.Timeout(args.timeout)
+        result = await storm(
+            client, plan, args.concurrency, args.ramp, args.opens
+        )
+    await db_helper.dispose()
+
+    result = {
+        "started_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "target": args.url or "in-process",
+        "config": {
+            "prefix": args.prefix,
+            "concurrency": args.concurrency,
+            "ramp_s": args.ramp,
+            "opens": args.opens,
+        },
+        **result,
+    }
+    if args.compare:
+        with open(args.compare) as file:
+            result["compared_to"] = args.compare
+            result["ratio_to_previous"] = compare(result, json.load(file))
+    return result
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prefix", default="load_")
+    parser.add_argument("--courses", type=int, default=30)
+    parser.add_argument("--students", type=int, default=25)
+    parser.add_argument("--assignments", type=int, default=3)
+    parser.add_argument(
+        "--reuse", action="store_true", help="use the rows of a previous run"
+    )
+    parser.add_argument(
+        "--cleanup", action="store_true", help="delete the seeded rows"
+    )
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument(
+        "--ramp", type=float, default=0.0, help="seconds over which students"
+        " arrive"
+    )
+    parser.add_argument(
+        "--opens", type=int, default=1, help="assignments each student opens"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--url", help="running server instead of in-process")
+    parser.add_argument("--output", help="JSON file for the results")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    text_report = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text_report)
+    print(text_report)
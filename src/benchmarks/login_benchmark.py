@@ -0,0 +1,111 @@
+"""
+Password checks of a login storm: logins per second and how long the event
+loop stalls, for the old subprocess hashing and for scrypt in the thread
+pool of utils/user_utils/hash.py.
+
+No database is needed, only the hashing of authentication() is measured:
+
+    cd src && python -m benchmarks.login_benchmark --logins 200
+
+Without the sha3-256sum binary the old scheme runs `openssl dgst -sha3-256`
+instead, a shell and an external binary per call all the same.
+"""
+
+import asyncio
+import json
+from argparse import ArgumentParser
+from shutil import which
+from subprocess import getoutput
+from time import perf_counter
+
+from core.config import CREDENTIALS_CONFIG
+from utils.user_utils.hash import (
+    get_hash_executor,
+    hash_password_sync,
+    shutdown_hash_executor,
+    verify_password,
+)
+
+PASSWORD = "correct horse battery staple"
+
+
+SHA3_COMMAND = (
+    "sha3-256sum" if which("sha3-256sum") else "openssl dgst -sha3-256 -r"
+)
+
+
+def subprocess_hash(password: str) -> str:
+    """hash_password() before: a shell and sha3-256sum per call."""
+    password = password + (CREDENTIALS_CONFIG.salt or "")
+    return getoutput(f'echo "{password}" | {SHA3_COMMAND}').split()[0]
+
+
+async def subprocess_login(stored: str) -> bool:
+    return subprocess_hash(PASSWORD) == stored
+
+
+async def pool_login(stored: str) -> bool:
+    matches, _ = await verify_password(PASSWORD, stored)
+    return matches
+
+
+async def watch_loop(stop: asyncio.Event, interval: float) -> float:
+    """Longest lateness of a timer: the loop was blocked that long."""
+    worst = 0.0
+    while not stop.is_set():
+        started = perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, perf_counter() - started - interval)
+    return worst
+
+
+async def storm(login, stored: str, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> bool:
+        async with semaphore:
+            return await login(stored)
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop, 0.005))
+    started = perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = perf_counter() - started
+    stop.set()
+    worst_stall = await watcher
+    assert all(results), "password check failed"
+    return {
+        "logins_per_second": round(logins / elapsed, 1),
+        "max_event_loop_stall_ms": round(worst_stall * 1000, 1),
+    }
+
+
+async def run(logins: int, concurrency: int) -> dict:
+    report = {
+        "logins": logins,
+        "concurrency": concurrency,
+        "hash_workers": CREDENTIALS_CONFIG.hash_workers,
+        "scrypt": {
+            "n": CREDENTIALS_CONFIG.scrypt_n,
+            "r": CREDENTIALS_CONFIG.scrypt_r,
+            "p": CREDENTIALS_CONFIG.scrypt_p,
+        },
+    }
+    report["subprocess_sha3"] = await storm(
+        subprocess_login, subprocess_hash(PASSWORD), logins, concurrency
+    )
+    get_hash_executor()
+    report["scrypt_pool"] = await storm(
+        pool_login, hash_password_sync(PASSWORD), logins, concurrency
+    )
+    shutdown_hash_executor()
+    return report
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    report = asyncio.run(run(args.logins, args.concurrency))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,191 @@
+"""
+Seeding of a local database for benchmarks.
+
+Reference rows (roles, statuses, assignment types, element types, actions)
+are expected to exist already, everything else is created here. Callers
+decide whether the seeded rows are committed or rolled back.
+"""
+
+from random import Random
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import ROLE_SETTING, STATUS_OF_ELEMENTS_SETTINGS
+
+INSERT_USER = text(
+    """
+    with new_user as (
+        insert into "user" (user_login, email, phone, password, role_id)
+        values (:user_login, :email, null, :password, :role_id)
+        returning user_login
+    )
+    insert into md_user (user_login, first_name, second_name)
+    select user_login, 'Bench', 'User' from new_user
+    """
+)
+
+INSERT_COURSE = text(
+    """
+    insert into course (name, owner, status_id, description)
+    values (:name, :owner, :status_id, '')
+    returning course_id
+    """
+)
+
+ADD_USER_TO_COURSE = text(
+    """
+    insert into course_user (course_id, user_login)
+    values (:course_id, :user_login)
+    on conflict do nothing
+    """
+)
+
+INSERT_ASSIGNMENT = text(
+    """
+    with new_assignment as (
+        insert into assignment (
+            assignment_id, name, course_id, assignment_type_id, status_id
+        )
+        values (:assignment_id, :name, :course_id, 1, :status_id)
+        returning assignment_id
+    )
+    insert into game_field_assignment (
+        assignment_id, field_width, field_height, start_x, start_y, end_x, end_y
+    )
+    select assignment_id, :width, :height, 1, 1, :width, :height
+    from new_assignment
+    """
+)
+
+# one element row per placed obstacle keeps the seed valid whatever the
+# primary key of assignment_element is
+INSERT_ELEMENTS = text(
+    """
+    insert into element (name, element_type_id)
+    select 'bench obstacle ' || n, (select min(element_type_id) from element_type)
+    from generate_series(1, :count) as n
+    returning element_id
+    """
+)
+
+PLACE_ELEMENTS = text(
+    """
+    insert into assignment_element (element_id, assignment_id, pos_x, pos_y)
+    select element_id, cast(:assignment_id as uuid), pos_x, pos_y
+    from unnest(
+        cast(:element_ids as int[]),
+        cast(:pos_xs as int[]),
+        cast(:pos_ys as int[])
+    ) as placed(element_id, pos_x, pos_y)
+    """
+)
+
+GET_ACTION_IDS = text(
+    """
+    select action_id from action order by action_id limit :count
+    """
+)
+
+ADD_ACTIONS = text(
+    """
+    insert into assignment_action (assignment_id, action_id)
+    select cast(:assignment_id as uuid), unnest(cast(:action_ids as int[]))
+    on conflict do nothing
+    """
+)
+
+
+async def seed_user(
+    session: AsyncSession,
+    user_login: str,
+    password: str,
+    role_id: int = ROLE_SETTING.user_role_id,
+) -> str:
+    """Create a user. password must already be hashed as the app stores it."""
+    await session.execute(
+        INSERT_USER,
+        {
+            "user_login": user_login,
+            "email": f"{user_login}@bench.local",
+            "password": password,
+            "role_id": role_id,
+        },
+    )
+    return user_login
+
+
+async def seed_course(
+    session: AsyncSession, owner: str, name: str, students: list[str] = ()
+) -> str:
+    result = await session.execute(
+        INSERT_COURSE,
+        {
+            "name": name,
+            "owner": owner,
+            "status_id": STATUS_OF_ELEMENTS_SETTINGS.published,
+        },
+    )
+    course_id = str(result.scalar_one())
+    for user_login in students:
+        await session.execute(
+            ADD_USER_TO_COURSE,
+            {"course_id": course_id, "user_login": user_login},
+        )
+    return course_id
+
+
+async def seed_assignment(
+    session: AsyncSession,
+    course_id: str,
+    width: int = 25,
+    height: int = 25,
+    obstacles: int = 40,
+    actions: int = 4,
+    rng: Random | None = None,
+) -> str:
+    """
+    Create a game assignment with obstacles on random free cells (never on
+    the start (1, 1) or the end (width, height)) and the first actions of the
+    action table.
+    """
+    rng = rng or Random(0)
+    assignment_id = str(uuid4())
+    await session.execute(
+        INSERT_ASSIGNMENT,
+        {
+            "assignment_id": assignment_id,
+            "name": f"Bench {assignment_id[:8]}",
+            "course_id": course_id,
+            "status_id": STATUS_OF_ELEMENTS_SETTINGS.published,
+            "width": width,
+            "height": height,
+        },
+    )
+
+    cells = [
+        (x, y)
+        for x in range(1, width + 1)
+        for y in range(1, height + 1)
+        if (x, y) not in ((1, 1), (width, height))
+    ]
+    cells = rng.sample(cells, min(obstacles, len(cells)))
+    if cells:
+        result = await session.execute(INSERT_ELEMENTS, {"count": len(cells)})
+        await session.execute(
+            PLACE_ELEMENTS,
+            {
+                "assignment_id": assignment_id,
+                "element_ids": list(result.scalars()),
+                "pos_xs": [x for x, _ in cells],
+                "pos_ys": [y for _, y in cells],
+            },
+        )
+
+    result = await session.execute(GET_ACTION_IDS, {"count": actions})
+    await session.execute(
+        ADD_ACTIONS,
+        {"assignment_id": assignment_id, "action_ids": list(result.scalars())},
+    )
+    return assignment_id
@@ -0,0 +1,90 @@
+"""
+Throughput of the simulation engine on one core: programs per second with
+and without the step trace.
+
+Runs on generated fields only, no database is needed:
+
+    cd src && python -m benchmarks.simulation_benchmark --programs 20000
+"""
+
+import json
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+from engine.game_field import GameField
+from engine.simulator import simulate
+
+# right, left, up, down
+ACTIONS = {1: (1, 0), 2: (-1, 0), 3: (0, -1), 4: (0, 1)}
+
+
+def make_field(size: int, obstacles: int, rng: Random) -> GameField:
+    cells = bytearray(size * size)
+    # keep the start and end corners free
+    for index in rng.sample(range(1, size * size - 1), obstacles):
+        cells[index] = rng.choice((1, 2))
+    return GameField(
+        width=size,
+        height=size,
+        start=(1, 1),
+        end=(size, size),
+        cells=cells,
+        actions=ACTIONS,
+    )
+
+
+def make_program(size: int, rng: Random) -> list[int]:
+    # a path towards the goal with some noise, so programs don't all fail on
+    # the first step
+    program = [1] * (size - 1) + [4] * (size - 1)
+    rng.shuffle(program)
+    for _ in range(size // 2):
+        program.insert(rng.randrange(len(program)), rng.choice((1, 2, 3, 4)))
+    return program
+
+
+def measure(fields, programs, with_trace: bool) -> dict:
+    outcomes = {}
+    steps = 0
+    started = perf_counter()
+    for field, program in zip(fields, programs, strict=True):
+        result = simulate(field, program, with_trace=with_trace)
+        outcomes[result.outcome] = outcomes.get(result.outcome, 0) + 1
+        steps += result.steps
+    elapsed = perf_counter() - started
+    return {
+        "programs_per_second": round(len(programs) / elapsed),
+        "steps_per_second": round(steps / elapsed),
+        "outcomes": {str(k): v for k, v in sorted(outcomes.items())},
+    }
+
+
+def main(programs: int, size: int, obstacles: int, seed: int) -> dict:
+    rng = Random(seed)
+    fields = [make_field(size, obstacles, rng) for _ in range(100)]
+    field_list = [fields[i % len(fields)] for i in range(programs)]
+    program_list = [make_program(size, rng) for _ in range(programs)]
+    return {
+        "programs": programs,
+        "mean_program_length": round(
+            sum(map(len, program_list)) / programs, 1
+        ),
+        "with_trace": measure(field_list, program_list, with_trace=True),
+        "without_trace": measure(field_list, program_list, with_trace=False),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--programs", type=int, default=20_000)
+    parser.add_argument("--size", type=int, default=25)
+    parser.add_argument("--obstacles", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            main(args.programs, args.size, args.obstacles, args.seed),
+            indent=2,
+        )
+    )
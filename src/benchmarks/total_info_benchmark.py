@@ -0,0 +1,156 @@
+"""
+GET_TOTAL_INFO_ABOUT_ASSIGNMENT before and after the rewrite with
+correlated subqueries: latency and size of the aggregated payload.
+
+Seeds a course with one assignment inside a transaction that is rolled
+back at the end, so it can be run against any development database:
+
+    cd src && python -m benchmarks.total_info_benchmark --obstacles 60
+"""
+
+import asyncio
+import json
+from argparse import ArgumentParser
+from statistics import mean, quantiles
+from time import perf_counter
+
+from sqlalchemy import text
+
+import repository.sql_queries.assignments_queries as assignments_queries
+from benchmarks.seed import seed_assignment, seed_course, seed_user
+from core.config import ROLE_SETTING
+from db.db_helper import db_helper
+
+# the query as it was before the rewrite: both sides joined in one group by
+LEGACY_GET_TOTAL_INFO_ABOUT_ASSIGNMENT = text(
+    """
+    select
+      assignment_id,
+      assignment_type_id,
+      course_id,
+      a.name,
+      description,
+      field_width,
+      field_height,
+      start_x,
+      start_y,
+      end_x,
+      end_y,
+      status_id,
+      json_agg(
+        jsonb_build_array(
+          'action_id',
+          action_id,
+          'name',
+          act.name,
+          'x_changes',
+          x_value_changes,
+          'y_changes',
+          y_value_changes
+        )
+      ) as actions,
+      json_agg(
+        jsonb_build_object(
+          'element_id',
+          element_id,
+          'name',
+          el.name,
+          'element_type_id',
+          element_type_id,
+          'pos_x',
+          pos_x,
+          'pos_y',
+          pos_y
+        )
+      ) as elements
+    from assignment a
+    left join game_field_assignment gfa using(assignment_id)
+    left join assignment_element using (assignment_id)
+    left join element as el using (element_id)
+    left join assignment_action using (assignment_id)
+    left join action act using (action_id)
+    where assignment_id = :assignment_id
+    group by assignment_id, gfa.assignment_id;
+    """
+)
+
+
+async def measure(connection, query, assignment_id: str, runs: int) -> dict:
+    timings = []
+    row = None
+    for _ in range(runs):
+        started = perf_counter()
+        result = await connection.execute(
+            query, {"assignment_id": assignment_id}
+        )
+        row = result.mappings().one()
+        timings.append((perf_counter() - started) * 1000)
+
+    payload = json.dumps(
+        {"actions": row["actions"], "elements": row["elements"]}
+    )
+    return {
+        "mean_ms": round(mean(timings), 3),
+        "p50_ms": round(quantiles(timings, n=100)[49], 3),
+        "p95_ms": round(quantiles(timings, n=100)[94], 3),
+        "payload_bytes": len(payload),
+        "actions": len(row["actions"]),
+        "elements": len(row["elements"]),
+    }
+
+
+async def main(obstacles: int, actions: int, size: int, runs: int) -> dict:
+    async with db_helper.engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            session = db_helper.session_factory(bind=connection)
+            teacher = await seed_user(
+                session,
+                "bench_total_info",
+                password="-",
+                role_id=ROLE_SETTING.teacher_role_id,
+            )
+            course_id = await seed_course(session, teacher, "Bench course")
+            assignment_id = await seed_assignment(
+                session,
+                course_id,
+                width=size,
+                height=size,
+                obstacles=obstacles,
+                actions=actions,
+            )
+            report = {
+                "legacy": await measure(
+                    connection,
+                    LEGACY_GET_TOTAL_INFO_ABOUT_ASSIGNMENT,
+                    assignment_id,
+                    runs,
+                ),
+                "current": await measure(
+                    connection,
+                    assignments_queries.GET_TOTAL_INFO_ABOUT_ASSIGNMENT,
+                    assignment_id,
+                    runs,
+                ),
+            }
+        finally:
+            await transaction.rollback()
+    await db_helper.dispose()
+    return report
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--obstacles", type=int, default=40)
+    parser.add_argument("--actions", type=int, default=8)
+    parser.add_argument("--size", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            asyncio.run(
+                main(args.obstacles, args.actions, args.size, args.runs)
+            ),
+            indent=2,
+        )
+    )
@@ -0,0 +1,220 @@
+"""
+Level library files (engine/level_library.py) from the command line.
+
+    cd src
+    python -m commands.level_library generate pack.lvl --count 1000 \
+        --width 8 --height 8 --actions 1 2 3 4 --min-steps 6 --max-steps 14
+    python -m commands.level_library info pack.lvl
+    python -m commands.level_library import pack.lvl --course <course uuid> \
+        --start 0 --stop 50
+
+import inserts the chosen slice of the library into the course in one
+transaction.
+"""
+
+import asyncio
+from argparse import ArgumentParser
+from random import randrange
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import STATUS_OF_ELEMENTS_SETTINGS
+from db.db_helper import db_helper
+from db.unit_of_work import UnitOfWork
+from engine.game_field import GameField
+from engine.generator import LevelSpec
+from engine.level_library import LevelLibrary, write_library
+from exceptions.ValidationException import UUIDValidationException
+from repository.assignment_repo import AssignmentRepo
+from repository.course_repo import CourseRepository
+from services.assignments_sevices import generate_levels
+from services.process_pool import shutdown_executor
+from utils.assignment_utils.assignment_validator import validate_game_field
+from utils.uuid_checker import normalize_uuid
+
+# levels inserted by one set of statements
+IMPORT_BATCH_SIZE = 500
+
+
+async def generate(args) -> None:
+    async with UnitOfWork(db_helper.replica_session_factory) as session:
+        actions = await AssignmentRepo.get_action_vectors(
+            action_ids=args.actions, session=session
+        )
+    await db_helper.dispose()
+    if missing := set(args.actions) - set(actions):
+        raise SystemExit(f"Actions {sorted(missing)} don't exist.")
+
+    spec = LevelSpec(
+        width=args.width,
+        height=args.height,
+        actions=actions,
+        min_steps=args.min_steps,
+        max_steps=args.max_steps,
+        obstacle_density=args.density,
+        pit_share=args.pit_share,
+    )
+    seed = args.seed if args.seed is not None else randrange(2**32)
+    try:
+        levels, duplicates = await generate_levels(
+            spec=spec, count=args.count, seed=seed
+        )
+    finally:
+        shutdown_executor()
+
+    written = write_library(
+        args.library,
+        (
+            (
+                GameField(
+                    width=level.width,
+                    height=level.height,
+                    start=level.start,
+                    end=level.end,
+                    cells=level.cells,
+                    actions=actions,
+                ),
+                level.optimal_steps,
+            )
+            for level in levels
+        ),
+    )
+    print(
+        f"{written} levels written to {args.library} "
+        f"({duplicates} duplicates dropped, seed {seed})"
+    )
+
+
+def info(args) -> None:
+    with LevelLibrary(args.library) as library:
+        print(f"{args.library}: {len(library)} levels")
+        for number in range(min(len(library), args.show)):
+            field = library[number]
+            print(
+                f"  {number}: {field.width}x{field.height} "
+                f"{field.start} -> {field.end}, "
+                f"actions {sorted(field.actions)}, "
+                f"optimal steps {library.optimal_steps(number)}"
+            )
+
+
+def check_field(number: int, field: GameField) -> None:
+    if not validate_game_field(field.width, field.height):
+        raise SystemExit(f"Level {number}: field size violates standards.")
+    if not (field.contains(*field.start) and field.contains(*field.end)):
+        raise SystemExit(f"Level {number}: start or end is off the field.")
+
+
+async def import_fields(
+    session: AsyncSession,
+    course_uuid: str,
+    fields: list[GameField],
+    names: list[str],
+    description: str | None,
+    status_id: int,
+) -> list[str]:
+    """Insert the fields as assignments of the course, in the session."""
+    if not await CourseRepository.is_course_exists(session, course_uuid):
+        raise SystemExit(f"Course {course_uuid} doesn't exist.")
+
+    # action ids of another database may mean other moves
+    used = {}
+    for field in fields:
+        used.update(field.actions)
+    existing = await AssignmentRepo.get_action_vectors(
+        action_ids=list(used), session=session
+    )
+    if existing != used:
+        raise SystemExit(
+            "Actions of the library don't match the action table: "
+            f"library {sorted(used.items())}, "
+            f"database {sorted(existing.items())}"
+        )
+
+    assignment_ids = []
+    for start in range(0, len(fields), IMPORT_BATCH_SIZE):
+        batch = slice(start, start + IMPORT_BATCH_SIZE)
+        assignment_ids += await AssignmentRepo.create_assignments_from_fields(
+            course_uuid=course_uuid,
+            fields=fields[batch],
+            names=names[batch],
+            description=description,
+            status_id=status_id,
+            session=session,
+        )
+    return assignment_ids
+
+
+async def import_levels(args) -> None:
+    try:
+        course_uuid = normalize_uuid(args.course)
+    except UUIDValidationException:
+        raise SystemExit(f"{args.course} is not a course uuid.") from None
+
+    with LevelLibrary(args.library) as library:
+        numbers = range(len(library))[args.start : args.stop]
+        fields = [library[number] for number in numbers]
+    for number, field in zip(numbers, fields, strict=True):
+        check_field(number, field)
+
+    async with UnitOfWork(db_helper.session_factory) as session:
+        await import_fields(
+            session,
+            course_uuid=course_uuid,
+            fields=fields,
+            names=[f"{args.name_prefix} {number + 1}" for number in numbers],
+            description=args.description,
+            status_id=args.status_id,
+        )
+    await db_helper.dispose()
+    print(f"{len(fields)} levels imported into course {course_uuid}")
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser(
+        "generate", help="write generated levels to a new library"
+    )
+    generate_parser.add_argument("library")
+    generate_parser.add_argument("--count", type=int, required=True)
+    generate_parser.add_argument("--width", type=int, required=True)
+    generate_parser.add_argument("--height", type=int, required=True)
+    generate_parser.add_argument(
+        "--actions", type=int, nargs="+", required=True
+    )
+    generate_parser.add_argument("--min-steps", type=int, default=1)
+    generate_parser.add_argument("--max-steps", type=int, default=1000)
+    generate_parser.add_argument("--density", type=float, default=0.2)
+    generate_parser.add_argument("--pit-share", type=float, default=0.5)
+    generate_parser.add_argument("--seed", type=int)
+
+    info_parser = commands.add_parser("info", help="describe a library")
+    info_parser.add_argument("library")
+    info_parser.add_argument("--show", type=int, default=10)
+
+    import_parser = commands.add_parser(
+        "import", help="insert a slice of a library into a course"
+    )
+    import_parser.add_argument("library")
+    import_parser.add_argument("--course", required=True)
+    import_parser.add_argument("--start", type=int, default=None)
+    import_parser.add_argument("--stop", type=int, default=None)
+    import_parser.add_argument("--name-prefix", default="Level")
+    import_parser.add_argument("--description")
+    import_parser.add_argument(
+        "--status-id", type=int, default=STATUS_OF_ELEMENTS_SETTINGS.draft
+    )
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        asyncio.run(generate(args))
+    elif args.command == "info":
+        info(args)
+    else:
+        asyncio.run(import_levels(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from os import getenv
+from os import getenv, cpu_count
 
 # JWT authorization/authentication library
 from authx import AuthXConfig
@@ -16,6 +16,43 @@ class DBSettings(BaseModel):
     )
     echo: bool = True
 
+    # read replica; reads go to the primary when DB_REPLICA_HOST is not set
+    replica_url: str | None = (
+        f"postgresql+asyncpg://{getenv('DB_USER')}:"
+        + f"{getenv('DB_PASSWORD')}@{getenv('DB_REPLICA_HOST')}:"
+        + f"{getenv('DB_REPLICA_PORT', getenv('DB_PORT'))}/{getenv('DB_NAME')}"
+        if getenv("DB_REPLICA_HOST")
+        else None
+    )
+    # after a write the client reads from the primary for this many seconds
+    read_your_writes_seconds: float = float(
+        getenv("DB_READ_YOUR_WRITES_SECONDS", 5)
+    )
+    read_your_writes_cookie: str = "read_primary"
+
+    # connection pool, tuned for the morning login peak
+    pool_size: int = int(getenv("DB_POOL_SIZE", 10))
+    max_overflow: int = int(getenv("DB_MAX_OVERFLOW", 20))
+    pool_timeout: float = float(getenv("DB_POOL_TIMEOUT", 30))
+    pool_recycle: int = int(getenv("DB_POOL_RECYCLE", 1800))
+    pool_pre_ping: bool = getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # statement caches: asyncpg's own one and the SQLAlchemy adapter one
+    statement_cache_size: int = int(getenv("DB_STATEMENT_CACHE_SIZE", 100))
+    prepared_statement_cache_size: int = int(
+        getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 100)
+    )
+
+    # connections opened (and statements prepared on) at application start
+    warmup_connections: int = int(getenv("DB_WARMUP_CONNECTIONS", 5))
+    # limit of one statement run by the warm-up, see DataBaseHelper.warm_up
+    warmup_statement_timeout_ms: int = int(
+        getenv("DB_WARMUP_STATEMENT_TIMEOUT_MS", 250)
+    )
+
+    # checkouts slower than this are written to the pool log
+    slow_checkout_ms: float = float(getenv("DB_SLOW_CHECKOUT_MS", 100))
+
 
 class RoleSettings(BaseModel):
     admin_role_id: int = 2
@@ -29,7 +66,22 @@ class StatusOfElementsSettings(BaseModel):
 
 
 class CredentialsSettings(BaseModel):
+    # appended to every password before hashing
     salt: str | None = getenv("SALT")
+    # scrypt cost, 128 * n * r bytes of memory per hash; stored hashes with
+    # other parameters are replaced on login, utils/user_utils/hash.py
+    scrypt_n: int = int(getenv("PASSWORD_SCRYPT_N", 2**14))
+    scrypt_r: int = int(getenv("PASSWORD_SCRYPT_R", 8))
+    scrypt_p: int = int(getenv("PASSWORD_SCRYPT_P", 1))
+    scrypt_maxmem: int = 64 * 1024 * 1024
+    scrypt_dklen: int = 32
+    salt_bytes: int = 16
+    # threads hashing passwords at once
+    hash_workers: int = int(
+        getenv("PASSWORD_HASH_WORKERS", min(4, cpu_count() or 1))
+    )
+    # verified access tokens kept decoded, until they expire
+    token_cache_size: int = int(getenv("TOKEN_CACHE_SIZE", 10_000))
 
 
 class ValidationSettings(BaseModel):
@@ -43,6 +95,118 @@ class ValidationSettings(BaseModel):
     max_height: int = 25
 
 
+class GameSettings(BaseModel):
+    # element types (element_type.element_type_id) by their effect on the
+    # robot, elements of other types stop it like walls
+    pit_element_types: tuple[int, ...] = (1,)
+    wall_element_types: tuple[int, ...] = (2,)
+
+    # solutions kept per worker, one per version of a field
+    solution_cache_size: int = int(getenv("GAME_SOLUTION_CACHE_SIZE", 4096))
+
+    # element rows (element.element_id) copied for every obstacle of a
+    # generated or imported level
+    generated_pit_element_id: int = 1
+    generated_wall_element_id: int = 2
+    # level generator: attempt budget per requested level, attempts done
+    # by one worker task and levels per request
+    generator_attempts_per_level: int = int(
+        getenv("GAME_GENERATOR_ATTEMPTS_PER_LEVEL", 200)
+    )
+    generator_task_attempts: int = int(
+        getenv("GAME_GENERATOR_TASK_ATTEMPTS", 500)
+    )
+    generator_max_levels: int = int(getenv("GAME_GENERATOR_MAX_LEVELS", 100))
+
+    # distance maps for hints, kept per worker by assignment id
+    distance_map_cache_size: int = int(
+        getenv("GAME_DISTANCE_MAP_CACHE_SIZE", 1024)
+    )
+    distance_map_ttl_seconds: float = float(
+        getenv("GAME_DISTANCE_MAP_TTL_SECONDS", 300)
+    )
+
+
+class ProgramSettings(BaseModel):
+    # limits of programs with repeat blocks and procedures, checked when a
+    # program is compiled (engine/program.py)
+    max_repeat: int = 10_000
+    max_depth: int = 16
+    max_procedures: int = 32
+    max_instructions: int = 4096
+    # hard limits of one run (engine/interpreter.py)
+    max_steps: int = int(getenv("PROGRAM_MAX_STEPS", 100_000))
+    time_limit_ms: float = float(getenv("PROGRAM_TIME_LIMIT_MS", 200))
+    # action ids of a plain program accepted by a request
+    max_length: int = int(getenv("PROGRAM_MAX_LENGTH", 10_000))
+    # plain programs up to this length are run on the event loop, longer
+    # ones and programs with repeats on the process pool
+    inline_length: int = int(getenv("PROGRAM_INLINE_LENGTH", 256))
+
+
+class GradingSettings(BaseModel):
+    # processes of the grading pool, created on the first batch
+    workers: int = int(getenv("GRADING_WORKERS", cpu_count() or 1))
+    # "spawn" doesn't copy the event loop, pool threads and sockets of the
+    # server into workers
+    start_method: str = getenv("GRADING_START_METHOD", "spawn")
+    # programs of one assignment sent to a worker at once
+    chunk_size: int = int(getenv("GRADING_CHUNK_SIZE", 500))
+    # submissions accepted by one batch request
+    max_batch_size: int = int(getenv("GRADING_MAX_BATCH_SIZE", 100_000))
+    # graded results kept per process, see engine/cache.py GRADE_CACHE
+    result_cache_size: int = int(
+        getenv("GRADING_RESULT_CACHE_SIZE", 200_000)
+    )
+    result_cache_mb: float = float(getenv("GRADING_RESULT_CACHE_MB", 64))
+    # bytecode fingerprints of submitted programs, see PROGRAM_FINGERPRINTS
+    program_cache_size: int = int(
+        getenv("GRADING_PROGRAM_CACHE_SIZE", 200_000)
+    )
+
+
+class SubmissionSettings(BaseModel):
+    # submissions are written in batches, see services/submission_buffer.py:
+    # a flush starts after flush_interval_ms or when flush_rows are waiting
+    flush_interval_ms: float = float(
+        getenv("SUBMISSION_FLUSH_INTERVAL_MS", 200)
+    )
+    flush_rows: int = int(getenv("SUBMISSION_FLUSH_ROWS", 500))
+    # unwritten rows a process keeps while the database is unavailable,
+    # new submissions are refused above it
+    max_pending_rows: int = int(getenv("SUBMISSION_MAX_PENDING_ROWS", 50_000))
+    page_size: int = 50
+    max_page_size: int = 500
+
+
+class TraceStreamSettings(BaseModel):
+    # runs of moves per frame of /run/{uuid}/stream/, engine/trace_codec.py
+    frame_runs: int = int(getenv("TRACE_STREAM_FRAME_RUNS", 256))
+    # frames sent ahead of the last acknowledged one
+    window: int = int(getenv("TRACE_STREAM_WINDOW", 8))
+    # seconds to wait for the program or an acknowledgement
+    receive_timeout: float = float(getenv("TRACE_STREAM_RECEIVE_TIMEOUT", 30))
+
+
+class ClassroomSettings(BaseModel):
+    # a teacher's socket gets at most one message per interval, with the
+    # last update of every student and assignment in it
+    coalesce_ms: float = float(getenv("CLASSROOM_COALESCE_MS", 500))
+    # updates go between workers over Postgres NOTIFY on this channel;
+    # without it every worker only sees the submissions it wrote itself
+    listen: bool = getenv("CLASSROOM_LISTEN", "true").lower() == "true"
+    channel: str = getenv("CLASSROOM_CHANNEL", "classroom_updates")
+    reconnect_s: float = 5
+    # queued NOTIFY payloads, updates are delivered locally above it
+    max_outbox: int = 1000
+
+
+class LeaderboardSettings(BaseModel):
+    # places returned by default and at most
+    size: int = 50
+    max_size: int = 1000
+
+
 ROLE_SETTING = RoleSettings()
 DB_SETTINGS = DBSettings()
 
@@ -57,3 +221,17 @@ CREDENTIALS_CONFIG = CredentialsSettings()
 STATUS_OF_ELEMENTS_SETTINGS = StatusOfElementsSettings()
 
 VALIDATION_SETTINGS = ValidationSettings()
+
+GAME_SETTINGS = GameSettings()
+
+PROGRAM_SETTINGS = ProgramSettings()
+
+GRADING_SETTINGS = GradingSettings()
+
+SUBMISSION_SETTINGS = SubmissionSettings()
+
+LEADERBOARD_SETTINGS = LeaderboardSettings()
+
+TRACE_STREAM_SETTINGS = TraceStreamSettings()
+
+CLASSROOM_SETTINGS = ClassroomSettings()
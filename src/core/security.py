@@ -0,0 +1,8 @@
+# JWT authorization/authentication library
+from authx import AuthX
+
+from core.config import AUTH_CONFIG
+
+# one instance for the whole application: tokens are created in user_view
+# and read by utils/user_utils/user_utils.py
+security = AuthX(config=AUTH_CONFIG)
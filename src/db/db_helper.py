@@ -1,20 +1,83 @@
-from asyncio import current_task
+from asyncio import current_task, gather
+from math import ceil
+from time import time
 
+from fastapi import Request, Response
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
     async_scoped_session,
+    AsyncEngine,
+    AsyncConnection,
 )
+from sqlalchemy.sql.elements import TextClause
 
 from core.config import DB_SETTINGS
+from db.pool_stats import InstrumentedAsyncQueuePool
+from db.unit_of_work import UnitOfWork
 
+# methods that never write, requests with any other method pin the client
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-class DataBaseHelper:
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(
-            url=url,
-            echo=echo,
+
+class WritePins:
+    """
+    Clients that wrote recently. Their reads go to the primary until the
+    replica had time to catch up (read-your-writes). The pin is a cookie
+    holding the time it runs out, so every worker sees it; a value further
+    than the window ahead isn't one of ours and is ignored.
+    """
+
+    def __init__(self, window: float, cookie_name: str):
+        self.window = window
+        self.cookie_name = cookie_name
+
+    def pin(self, response: Response) -> None:
+        response.set_cookie(
+            self.cookie_name,
+            "%.3f" % (time() + self.window),
+            max_age=ceil(self.window),
+            httponly=True,
+            samesite="lax",
         )
+
+    def is_pinned(self, request: Request) -> bool:
+        try:
+            until = float(request.cookies.get(self.cookie_name, ""))
+        except ValueError:
+            return False
+        now = time()
+        return now < until <= now + self.window
+
+
+def make_engine(url: str, echo: bool = False) -> AsyncEngine:
+    return create_async_engine(
+        url=url,
+        echo=echo,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_SETTINGS.pool_size,
+        max_overflow=DB_SETTINGS.max_overflow,
+        pool_timeout=DB_SETTINGS.pool_timeout,
+        pool_recycle=DB_SETTINGS.pool_recycle,
+        pool_pre_ping=DB_SETTINGS.pool_pre_ping,
+        connect_args={
+            "statement_cache_size": DB_SETTINGS.statement_cache_size,
+            "prepared_statement_cache_size": (
+                DB_SETTINGS.prepared_statement_cache_size
+            ),
+        },
+    )
+
+
+class DataBaseHelper:
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        replica_url: str | None = None,
+    ):
+        self.engine = make_engine(url=url, echo=echo)
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -22,6 +85,28 @@ class DataBaseHelper:
             expire_on_commit=False,
         )
 
+        # Without a replica the read engine is the primary one, so the
+        # project can be run (and tested) against a single Postgres.
+        self.replica_engine = (
+            make_engine(url=replica_url, echo=echo)
+            if replica_url
+            else self.engine
+        )
+        self.replica_session_factory = async_sessionmaker(
+            bind=self.replica_engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+        self.write_pins = WritePins(
+            window=DB_SETTINGS.read_your_writes_seconds,
+            cookie_name=DB_SETTINGS.read_your_writes_cookie,
+        )
+
+    @property
+    def has_replica(self) -> bool:
+        return self.replica_engine is not self.engine
+
     def get_scoped_session(self):
         session = async_scoped_session(
             session_factory=self.session_factory,
@@ -29,10 +114,105 @@ class DataBaseHelper:
         )
         return session
 
+    def pool_stats(self) -> dict:
+        """Return checkout/overflow counters and latency histogram of the pools."""
+        stats = {"primary": self.engine.pool.telemetry()}
+        if self.has_replica:
+            stats["replica"] = self.replica_engine.pool.telemetry()
+        return stats
+
+    async def warm_up(
+        self, statements: dict[str, TextClause], connections: int
+    ) -> dict[str, str]:
+        """
+        Open connections in advance and run the statements once on each of
+        them, so the first requests after a deploy don't pay for connecting,
+        parsing and planning.
+
+        :param statements: statements to run, see collect_statements
+        :param connections: connections to open per engine (at most pool_size,
+            overflow connections are closed when returned to the pool)
+        :return: statements that could not be prepared with the error text
+        """
+        connections = min(connections, DB_SETTINGS.pool_size)
+        engines = [self.engine]
+        if self.has_replica:
+            engines.append(self.replica_engine)
+
+        failed = {}
+        for engine in engines:
+            opened = await gather(
+                *(engine.connect().start() for _ in range(connections))
+            )
+            try:
+                results = await gather(
+                    *(
+                        self._run_statements(connection, statements)
+                        for connection in opened
+                    )
+                )
+            finally:
+                await gather(*(connection.close() for connection in opened))
+            for result in results:
+                failed.update(result)
+        return failed
+
+    @staticmethod
+    async def _run_statements(
+        connection: AsyncConnection, statements: dict[str, TextClause]
+    ) -> dict[str, str]:
+        """
+        Execute every statement with null parameters, each in a transaction
+        that is rolled back (not in savepoints: their statements would fill
+        the cache too). The asyncpg adapter caches a statement when it
+        prepares it, before executing it, so an execution that fails on the
+        nulls or is cut by the timeout warms the cache all the same. Only
+        errors of SQLSTATE class 42 (syntax, unknown names) mean the
+        statement wasn't prepared.
+        """
+        failed = {}
+        for name, statement in statements.items():
+            transaction = await connection.begin()
+            try:
+                # statements without parameters read whole tables
+                await connection.exec_driver_sql(
+                    "set local statement_timeout = %d"
+                    % DB_SETTINGS.warmup_statement_timeout_ms
+                )
+                await connection.execute(
+                    statement, dict.fromkeys(statement.compile().params)
+                )
+            except DBAPIError as e:
+                if str(getattr(e.orig, "sqlstate", "")).startswith("42"):
+                    failed[name] = str(e.orig)
+            finally:
+                await transaction.rollback()
+        return failed
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        if self.has_replica:
+            await self.replica_engine.dispose()
+
     async def session_dependency(self):
-        async with self.session_factory() as session:
+        """
+        Request-scoped unit of work on the primary: every repository call of
+        the request shares its session and transaction.
+        """
+        async with UnitOfWork(self.session_factory) as session:
+            yield session
+
+    async def read_session_dependency(self, request: Request):
+        """
+        Session for read-only repository calls. Goes to the replica unless
+        the client wrote within the pinning window.
+        """
+        session_factory = self.replica_session_factory
+        if self.write_pins.is_pinned(request):
+            session_factory = self.session_factory
+
+        async with UnitOfWork(session_factory) as session:
             yield session
-            await session.close()
 
     async def scoped_session_dependency(self):
         session = self.get_scoped_session()
@@ -43,4 +223,5 @@ class DataBaseHelper:
 db_helper = DataBaseHelper(
     url=DB_SETTINGS.url,
     echo=DB_SETTINGS.echo,
+    replica_url=DB_SETTINGS.replica_url,
 )
@@ -0,0 +1,94 @@
+# connection pool with checkout telemetry
+from bisect import bisect_left
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.config import DB_SETTINGS
+from logger.logger_module import ModuleLoger
+
+logger = ModuleLoger(Path(__file__).stem)
+
+# upper bounds (ms) of the checkout latency histogram buckets
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    """Counters of connection checkouts from the pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # last bucket collects everything slower than CHECKOUT_BUCKETS_MS[-1]
+        self.histogram = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self.histogram[bisect_left(CHECKOUT_BUCKETS_MS, seconds * 1000)] += 1
+
+    def as_dict(self) -> dict:
+        buckets = [f"<={bound}ms" for bound in CHECKOUT_BUCKETS_MS]
+        buckets.append(f">{CHECKOUT_BUCKETS_MS[-1]}ms")
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "total_wait_ms": round(self.total_wait * 1000, 3),
+            "avg_wait_ms": round(
+                self.total_wait * 1000 / self.checkouts, 3
+            )
+            if self.checkouts
+            else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "checkout_latency_histogram": dict(
+                zip(buckets, self.histogram, strict=True)
+            ),
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that measures how long every checkout takes
+    (waiting for a free connection plus opening a new one on overflow).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            logger.error(f"Pool checkout timed out. {self.status()}")
+            raise
+        finally:
+            waited = perf_counter() - started
+            self.stats.observe(waited)
+            if waited * 1000 >= DB_SETTINGS.slow_checkout_ms:
+                logger.warning(
+                    f"Slow pool checkout: {waited * 1000:.1f} ms. "
+                    f"{self.status()}"
+                )
+
+    def recreate(self):
+        # keep collected telemetry when the engine recreates its pool
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def telemetry(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            **self.stats.as_dict(),
+        }
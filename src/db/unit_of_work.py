@@ -0,0 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class UnitOfWork:
+    """
+    One session, one connection and one transaction for a whole request.
+
+    Repositories only execute statements on the session, the transaction is
+    committed when the unit of work exits normally and rolled back when it
+    exits with an exception (including HTTPException raised by a view).
+    The connection is checked out on the first statement and returned to the
+    pool when the unit of work exits.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self.session: AsyncSession | None = None
+
+    async def __aenter__(self) -> AsyncSession:
+        self.session = self.session_factory()
+        await self.session.begin()
+        return self.session
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+        finally:
+            await self.session.close()
@@ -0,0 +1,162 @@
+"""
+In-process caches of the game engine. Every worker process has its own.
+"""
+
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Hashable
+from sys import getsizeof
+from time import monotonic
+from typing import Any
+
+from core.config import GAME_SETTINGS, GRADING_SETTINGS
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entry. With ttl
+    entries also expire, which limits how long a worker can serve a value
+    that another worker has invalidated. With max_bytes the sizes of the
+    entries, as weigh(key, value) estimates them, are bounded too.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        weigh: Callable[[Hashable, Any], int] | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.weigh = weigh
+        # key -> (expires at, value, size)
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = (
+            OrderedDict()
+        )
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _removed(self, key: Hashable) -> None:
+        """Let subclasses react to an entry leaving the cache."""
+
+    def _remove(self, key: Hashable) -> tuple[float, Any, int] | None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+            self._removed(key)
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or (self.ttl is not None and entry[0] < monotonic()):
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = monotonic() + self.ttl if self.ttl is not None else 0.0
+        size = self.weigh(key, value) if self.weigh is not None else 0
+        self._remove(key)
+        self._data[key] = (expires, value, size)
+        self.bytes += size
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        entry = self._remove(key)
+        return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        for key in list(self._data):
+            self._remove(key)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def _weigh_grade(key: tuple, value: tuple) -> int:
+    # the outcome strings are shared by all entries
+    return (
+        getsizeof(key)
+        + sum(getsizeof(part) for part in key)
+        + getsizeof(value)
+        + sum(getsizeof(part) for part in value[1:])
+    )
+
+
+class GradeCache(LRUCache):
+    """
+    Results of grading by (assignment id, GameField.fingerprint,
+    Bytecode.fingerprint), with an index by assignment for invalidation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._keys_by_assignment: defaultdict[str, set] = defaultdict(set)
+
+    def put(self, key: tuple, value: tuple) -> None:
+        super().put(key, value)
+        if key in self._data:
+            self._keys_by_assignment[key[0]].add(key)
+
+    def _removed(self, key: tuple) -> None:
+        keys = self._keys_by_assignment.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_assignment[key[0]]
+
+    def invalidate(self, assignment_id: str) -> int:
+        """Drop the results of the assignment, returns how many."""
+        keys = list(self._keys_by_assignment.get(assignment_id, ()))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+
+# engine.solver.Solution by GameField.fingerprint; a field that changes
+# gets a new fingerprint, so entries never go stale
+SOLUTION_CACHE = LRUCache(maxsize=GAME_SETTINGS.solution_cache_size)
+
+# engine.distance_map.DistanceMap by assignment id, so a hint needs no
+# query. Dropped by invalidate_assignment when the field changes, the ttl
+# bounds staleness in other worker processes.
+DISTANCE_MAP_CACHE = LRUCache(
+    maxsize=GAME_SETTINGS.distance_map_cache_size,
+    ttl=GAME_SETTINGS.distance_map_ttl_seconds,
+)
+
+# (outcome, x, y, steps) of graded programs, see GradeCache. The field
+# fingerprint in the key keeps other worker processes from serving results
+# of a changed field, invalidation frees the memory of the old ones.
+GRADE_CACHE = GradeCache(
+    maxsize=GRADING_SETTINGS.result_cache_size,
+    max_bytes=int(GRADING_SETTINGS.result_cache_mb * 2**20),
+    weigh=_weigh_grade,
+)
+
+# Bytecode.fingerprint by the digest of a program as it was submitted (see
+# services/grading_services.program_digest), so the event loop finds the
+# GRADE_CACHE key of a program it has seen without compiling it
+PROGRAM_FINGERPRINTS = LRUCache(maxsize=GRADING_SETTINGS.program_cache_size)
@@ -0,0 +1,119 @@
+"""
+Distance to the goal from every cell of a field, computed once by a
+breadth-first search backwards from the goal. A hint is then two array
+lookups.
+"""
+
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from uuid import UUID
+
+from engine.cache import DISTANCE_MAP_CACHE
+from engine.game_field import FREE, ORIGIN, GameField
+
+# distance of cells the goal can't be reached from
+UNREACHABLE = 0xFFFF
+
+
+@dataclass(slots=True, frozen=True)
+class Hint:
+    # steps left to the goal, None when it can't be reached from here
+    distance: int | None
+    # first move of a shortest path and where it leads
+    action_id: int | None = None
+    next_x: int | None = None
+    next_y: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class DistanceMap:
+    width: int
+    height: int
+    # per cell, row by row: steps to the goal and the action to take
+    distances: array
+    next_actions: array
+    actions: dict[int, tuple[int, int]]
+
+    def contains(self, x: int, y: int) -> bool:
+        return (
+            ORIGIN <= x < self.width + ORIGIN
+            and ORIGIN <= y < self.height + ORIGIN
+        )
+
+    def hint(self, x: int, y: int) -> Hint:
+        cell = (y - ORIGIN) * self.width + x - ORIGIN
+        distance = self.distances[cell]
+        if distance == UNREACHABLE:
+            return Hint(distance=None)
+        if distance == 0:
+            return Hint(distance=0)
+        action_id = self.next_actions[cell]
+        dx, dy = self.actions[action_id]
+        return Hint(
+            distance=distance,
+            action_id=action_id,
+            next_x=x + dx,
+            next_y=y + dy,
+        )
+
+
+def build_distance_map(field: GameField) -> DistanceMap:
+    """
+    Reverse BFS from the goal: a cell gets a distance when one action moves
+    the robot from it onto a cell that already has one. The robot can only
+    stand on free cells and stops on the goal, so neither walls, pits nor
+    the goal itself are expanded as sources.
+    """
+    width, height = field.width, field.height
+    kinds = field.kinds
+    # 2 bytes per cell: distances on a 25x25 field go beyond 255
+    distances = array("H", [UNREACHABLE]) * (width * height)
+    next_actions = array("i", [0]) * (width * height)
+    goal = field.index(*field.end)
+    distances[goal] = 0
+    moves = sorted(field.actions.items())
+
+    queue = deque([goal])
+    while queue:
+        cell = queue.popleft()
+        y, x = divmod(cell, width)
+        distance = distances[cell] + 1
+        for action_id, (dx, dy) in moves:
+            source_x, source_y = x - dx, y - dy
+            if not (0 <= source_x < width and 0 <= source_y < height):
+                continue
+            source = source_y * width + source_x
+            if distances[source] != UNREACHABLE or kinds[source] != FREE:
+                continue
+            distances[source] = distance
+            next_actions[source] = action_id
+            queue.append(source)
+
+    return DistanceMap(
+        width=width,
+        height=height,
+        distances=distances,
+        next_actions=next_actions,
+        actions=dict(field.actions),
+    )
+
+
+def _key(assignment_id: str | UUID) -> str:
+    # the same uuid can come with or without dashes
+    return str(UUID(str(assignment_id)))
+
+
+def get_distance_map(assignment_id: str) -> DistanceMap | None:
+    return DISTANCE_MAP_CACHE.get(_key(assignment_id))
+
+
+def put_distance_map(assignment_id: str, field: GameField) -> DistanceMap:
+    distance_map = build_distance_map(field)
+    DISTANCE_MAP_CACHE.put(_key(assignment_id), distance_map)
+    return distance_map
+
+
+def invalidate_assignment(assignment_id: str | UUID) -> None:
+    """Forget what is cached by assignment id, call when the field changes."""
+    DISTANCE_MAP_CACHE.pop(_key(assignment_id))
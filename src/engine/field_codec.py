@@ -0,0 +1,88 @@
+"""
+Versioned binary encoding of a game field, stored in
+game_field_assignment.field_blob.
+
+Layout (little endian), version 1:
+
+    header   4s magic b"ALGF", B version, B width, B height,
+             B start x, B start y, B end x, B end y, B number of actions
+    actions  per action: I action id, b x change, b y change
+    cells    width * height bytes, element type id per cell (0 - empty),
+             row by row
+
+Decoding doesn't copy the cells: the field gets a memoryview of the blob.
+"""
+
+from struct import Struct, iter_unpack
+
+from engine.game_field import GameField
+
+MAGIC = b"ALGF"
+VERSION = 1
+
+HEADER = Struct("<4sBBBBBBBB")
+ACTION = Struct("<Ibb")
+
+
+class FieldCodecError(ValueError):
+    pass
+
+
+def encode_field(field: GameField) -> bytes:
+    actions = sorted(field.actions.items())
+    try:
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            field.width,
+            field.height,
+            *field.start,
+            *field.end,
+            len(actions),
+        )
+        table = b"".join(
+            ACTION.pack(action_id, dx, dy) for action_id, (dx, dy) in actions
+        )
+    except Exception as e:
+        raise FieldCodecError(f"Field can't be encoded: {e}") from e
+    return header + table + bytes(field.cells)
+
+
+def decode_field(blob: bytes | memoryview) -> GameField:
+    view = memoryview(blob)
+    if len(view) < HEADER.size:
+        raise FieldCodecError("Blob is shorter than the header.")
+    (
+        magic,
+        version,
+        width,
+        height,
+        start_x,
+        start_y,
+        end_x,
+        end_y,
+        action_count,
+    ) = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise FieldCodecError("Not a field blob.")
+    if version != VERSION:
+        raise FieldCodecError(f"Unsupported field blob version {version}.")
+
+    cells_offset = HEADER.size + action_count * ACTION.size
+    if len(view) != cells_offset + width * height:
+        raise FieldCodecError("Blob size doesn't match its header.")
+
+    actions = {
+        action_id: (dx, dy)
+        for action_id, dx, dy in iter_unpack(
+            ACTION.format, view[HEADER.size : cells_offset]
+        )
+    }
+    return GameField(
+        width=width,
+        height=height,
+        start=(start_x, start_y),
+        end=(end_x, end_y),
+        cells=view[cells_offset:],
+        actions=actions,
+    )
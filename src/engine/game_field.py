@@ -0,0 +1,180 @@
+"""
+Game field of an assignment in a compact form: one byte per cell with the
+element type placed on it, plus the action vectors of the assignment.
+"""
+
+from array import array
+from collections.abc import Mapping
+from hashlib import blake2b
+
+from core.config import GAME_SETTINGS, VALIDATION_SETTINGS
+
+# coordinates of the first cell
+ORIGIN = VALIDATION_SETTINGS.counting_field_from
+
+# what a cell does to the robot
+FREE = 0
+PIT = 1
+WALL = 2
+
+
+def _kind_table() -> bytes:
+    """bytes.translate table: element type id -> FREE/PIT/WALL."""
+    table = bytearray([WALL]) * 256
+    table[0] = FREE
+    for element_type_id in GAME_SETTINGS.pit_element_types:
+        table[element_type_id] = PIT
+    for element_type_id in GAME_SETTINGS.wall_element_types:
+        table[element_type_id] = WALL
+    return bytes(table)
+
+
+KIND_BY_ELEMENT_TYPE = _kind_table()
+
+
+class GameField:
+    __slots__ = (
+        "width",
+        "height",
+        "start",
+        "end",
+        "cells",
+        "kinds",
+        "actions",
+        "fingerprint",
+        "_run_lengths",
+    )
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        start: tuple[int, int],
+        end: tuple[int, int],
+        cells: bytes | bytearray | memoryview,
+        actions: dict[int, tuple[int, int]],
+    ):
+        """
+        :param width: field width
+        :param height: field height
+        :param start: start cell (x, y)
+        :param end: goal cell (x, y)
+        :param cells: element type id per cell (0 - empty), row by row
+        :param actions: action id -> (x change, y change)
+        """
+        if len(cells) != width * height:
+            raise ValueError("Cells don't match the field size.")
+        self.width = width
+        self.height = height
+        self.start = start
+        self.end = end
+        self.cells = cells
+        self.kinds = bytes(cells).translate(KIND_BY_ELEMENT_TYPE)
+        self.actions = actions
+        self.fingerprint = self._fingerprint()
+        self._run_lengths = {}
+
+    def _fingerprint(self) -> str:
+        """
+        Hash of everything that affects a run. Changes whenever the field,
+        its elements or its actions change, so it works as the version of
+        the assignment for caches.
+        """
+        digest = blake2b(digest_size=16)
+        digest.update(
+            repr(
+                (
+                    self.width,
+                    self.height,
+                    self.start,
+                    self.end,
+                    sorted(self.actions.items()),
+                )
+            ).encode()
+        )
+        digest.update(self.kinds)
+        return digest.hexdigest()
+
+    def __reduce__(self):
+        # cells may be a memoryview, which can't be pickled
+        return (
+            GameField,
+            (
+                self.width,
+                self.height,
+                self.start,
+                self.end,
+                bytes(self.cells),
+                self.actions,
+            ),
+        )
+
+    def run_lengths(self, dx: int, dy: int) -> array:
+        """
+        For every cell: how many times in a row the move (dx, dy) lands on
+        a free cell other than the goal. The move after that many ends the
+        run (edge, wall, pit or goal). Computed once per move vector.
+        """
+        runs = self._run_lengths.get((dx, dy))
+        if runs is not None:
+            return runs
+
+        width, height = self.width, self.height
+        kinds = self.kinds
+        goal = self.index(*self.end)
+        runs = array("H", [0]) * (width * height)
+        # cells are visited so that the target of a move is done first
+        rows = range(height - 1, -1, -1) if dy > 0 else range(height)
+        columns = range(width - 1, -1, -1) if dx > 0 else range(width)
+        for y in rows:
+            next_y = y + dy
+            if not 0 <= next_y < height:
+                continue
+            for x in columns:
+                next_x = x + dx
+                if not 0 <= next_x < width:
+                    continue
+                target = next_y * width + next_x
+                if kinds[target] == FREE and target != goal:
+                    runs[y * width + x] = min(runs[target] + 1, 0xFFFF)
+        self._run_lengths[(dx, dy)] = runs
+        return runs
+
+    def index(self, x: int, y: int) -> int:
+        return (y - ORIGIN) * self.width + x - ORIGIN
+
+    def contains(self, x: int, y: int) -> bool:
+        return (
+            ORIGIN <= x < self.width + ORIGIN
+            and ORIGIN <= y < self.height + ORIGIN
+        )
+
+    @classmethod
+    def from_field_data(cls, data: Mapping) -> "GameField":
+        """
+        Build the field from a row of GET_GAME_FIELDS_DATA
+        (see AssignmentRepo.get_fields_data).
+        """
+        width, height = data["field_width"], data["field_height"]
+        cells = bytearray(width * height)
+        for element in data["elements"]:
+            x, y = element["pos_x"], element["pos_y"]
+            if not (
+                ORIGIN <= x < width + ORIGIN and ORIGIN <= y < height + ORIGIN
+            ):
+                continue
+            cells[(y - ORIGIN) * width + x - ORIGIN] = element[
+                "element_type_id"
+            ]
+        actions = {
+            action["action_id"]: (action["x_changes"], action["y_changes"])
+            for action in data["actions"]
+        }
+        return cls(
+            width=width,
+            height=height,
+            start=(data["start_x"], data["start_y"]),
+            end=(data["end_x"], data["end_y"]),
+            cells=cells,
+            actions=actions,
+        )
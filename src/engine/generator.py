@@ -0,0 +1,156 @@
+"""
+Procedural generation of solvable levels.
+
+Levels are sampled at random and kept when the solver finds a shortest
+program of the wanted length. Levels that are rotations or reflections of
+each other (with their action vectors transformed the same way) get the
+same canonical hash, so duplicates can be dropped across processes.
+"""
+
+from dataclasses import dataclass
+from hashlib import blake2b
+from itertools import product
+from random import Random
+
+from core.config import GAME_SETTINGS
+from engine.game_field import ORIGIN, GameField
+from engine.solver import solve
+
+# element types placed by the generator
+PIT_TYPE = GAME_SETTINGS.pit_element_types[0]
+WALL_TYPE = GAME_SETTINGS.wall_element_types[0]
+
+# the 8 symmetries of a rectangle: (swap axes, mirror x, mirror y)
+SYMMETRIES = tuple(product((False, True), repeat=3))
+
+
+@dataclass(slots=True, frozen=True)
+class LevelSpec:
+    width: int
+    height: int
+    # action id -> (x change, y change), the action set of every level
+    actions: dict[int, tuple[int, int]]
+    # bounds of the optimal program length
+    min_steps: int
+    max_steps: int
+    # share of the cells (besides start and end) taken by obstacles
+    obstacle_density: float
+    # share of the obstacles that are pits, the rest are walls
+    pit_share: float
+
+
+@dataclass(slots=True, frozen=True)
+class Level:
+    width: int
+    height: int
+    start: tuple[int, int]
+    end: tuple[int, int]
+    # element type id per cell (0 - empty), row by row
+    cells: bytes
+    optimal_steps: int
+    canonical_hash: str
+
+
+def _point(
+    x: int, y: int, symmetry: tuple[bool, bool, bool], width: int, height: int
+) -> tuple[int, int]:
+    """Move cell x, y by the symmetry; width and height are after the move."""
+    swap, mirror_x, mirror_y = symmetry
+    if swap:
+        x, y = y, x
+    if mirror_x:
+        x = width - 1 - x
+    if mirror_y:
+        y = height - 1 - y
+    return x, y
+
+
+def _vector(
+    dx: int, dy: int, symmetry: tuple[bool, bool, bool]
+) -> tuple[int, int]:
+    """Move an action vector by the symmetry."""
+    swap, mirror_x, mirror_y = symmetry
+    if swap:
+        dx, dy = dy, dx
+    return (-dx if mirror_x else dx, -dy if mirror_y else dy)
+
+
+def canonical_hash(field: GameField) -> str:
+    """Hash that is equal for fields equal up to rotation and reflection."""
+    width, height = field.width, field.height
+    vectors = list(field.actions.values())
+    start = (field.start[0] - ORIGIN, field.start[1] - ORIGIN)
+    end = (field.end[0] - ORIGIN, field.end[1] - ORIGIN)
+
+    candidates = []
+    for symmetry in SYMMETRIES:
+        size = (height, width) if symmetry[0] else (width, height)
+        new_width = size[0]
+
+        kinds = bytearray(width * height)
+        for index, kind in enumerate(field.kinds):
+            if kind:
+                y, x = divmod(index, width)
+                new_x, new_y = _point(x, y, symmetry, *size)
+                kinds[new_y * new_width + new_x] = kind
+        header = repr(
+            (
+                *size,
+                _point(*start, symmetry, *size),
+                _point(*end, symmetry, *size),
+                sorted(_vector(*v, symmetry) for v in vectors),
+            )
+        ).encode()
+        candidates.append(header + bytes(kinds))
+
+    return blake2b(min(candidates), digest_size=16).hexdigest()
+
+
+def random_level(spec: LevelSpec, rng: Random) -> Level | None:
+    """One attempt: a random level, or None when it misses the spec."""
+    width, height = spec.width, spec.height
+    size = width * height
+    start, end = rng.sample(range(size), 2)
+    free = [index for index in range(size) if index != start and index != end]
+
+    cells = bytearray(size)
+    for index in rng.sample(free, round(spec.obstacle_density * len(free))):
+        cells[index] = PIT_TYPE if rng.random() < spec.pit_share else WALL_TYPE
+
+    field = GameField(
+        width=width,
+        height=height,
+        start=(start % width + ORIGIN, start // width + ORIGIN),
+        end=(end % width + ORIGIN, end // width + ORIGIN),
+        cells=cells,
+        actions=spec.actions,
+    )
+    solution = solve(field)
+    if not (
+        solution.reachable
+        and spec.min_steps <= solution.optimal_steps <= spec.max_steps
+    ):
+        return None
+    return Level(
+        width=width,
+        height=height,
+        start=field.start,
+        end=field.end,
+        cells=bytes(cells),
+        optimal_steps=solution.optimal_steps,
+        canonical_hash=canonical_hash(field),
+    )
+
+
+def generate_batch(spec: LevelSpec, attempts: int, seed: int) -> list[Level]:
+    """
+    Entry point of generator worker processes: make attempts and return the
+    distinct levels found.
+    """
+    rng = Random(seed)
+    levels = {}
+    for _ in range(attempts):
+        level = random_level(spec, rng)
+        if level is not None:
+            levels.setdefault(level.canonical_hash, level)
+    return list(levels.values())
@@ -0,0 +1,267 @@
+"""
+Execution of compiled programs (engine/program.py) with hard step and time
+limits.
+
+Runs cost the number of executed instructions rather than the number of
+robot steps:
+    - MOVE with a count jumps over the cells the move passes safely, using
+      GameField.run_lengths, and only the last move is looked at closely;
+    - a repeat whose iteration brings the robot back to a cell it already
+      started an iteration from is periodic from then on, the remaining
+      whole periods are skipped by adding their steps.
+
+Results are the same as of engine/simulator.py for the same moves.
+"""
+
+from collections.abc import Sequence
+from time import perf_counter
+
+from core.config import PROGRAM_SETTINGS
+from engine.game_field import PIT, WALL, GameField
+from engine.program import (
+    CALL,
+    END,
+    HALT,
+    MOVE,
+    REPEAT,
+    Bytecode,
+    ProgramCompileError,
+    compile_program,
+)
+from engine.simulator import Outcome, SimulationResult
+from engine.solver import get_solution
+
+# instructions between checks of the time limit
+TIME_CHECK_INTERVAL = 1024
+
+
+def _leave_safe_cells(
+    field: GameField, x: int, y: int, dx: int, dy: int, trace: list | None
+) -> tuple[int, int, Outcome]:
+    """
+    Make the move from the last safe cell: off the board, into a wall, a
+    pit or the goal. Returns the cell the robot ends on and the outcome.
+    """
+    next_x = x + dx
+    next_y = y + dy
+    if not field.contains(next_x, next_y):
+        return x, y, Outcome.LEFT_BOARD
+    kind = field.kinds[field.index(next_x, next_y)]
+    if kind == WALL:
+        return x, y, Outcome.HIT_WALL
+    if trace is not None:
+        trace.append((next_x, next_y))
+    outcome = Outcome.FELL_IN_PIT if kind == PIT else Outcome.REACHED_GOAL
+    return next_x, next_y, outcome
+
+
+def _move(
+    field: GameField,
+    action_id: int,
+    count: int,
+    x: int,
+    y: int,
+    steps: int,
+    max_steps: int,
+    trace: list | None,
+) -> tuple[int, int, int, Outcome | None]:
+    """
+    Make the move count times in a row, jumping over the safe cells.
+
+    :return: position and steps after it, and the outcome when the run
+        ends on this move
+    """
+    move = field.actions.get(action_id)
+    if move is None:
+        if steps >= max_steps:
+            return x, y, steps, Outcome.STEP_LIMIT
+        return x, y, steps + 1, Outcome.UNKNOWN_ACTION
+    dx, dy = move
+    if dx == 0 and dy == 0:
+        # stays on its cell, which is free unless it's the goal
+        safe = 0 if (x, y) == field.end else count
+    else:
+        safe = field.run_lengths(dx, dy)[field.index(x, y)]
+    limited = steps + min(count, safe + 1) > max_steps
+    moves = min(count, safe, max_steps - steps)
+    if trace is not None:
+        trace.extend(
+            (x + dx * step, y + dy * step) for step in range(1, moves + 1)
+        )
+    x += dx * moves
+    y += dy * moves
+    steps += moves
+    if limited:
+        return x, y, steps, Outcome.STEP_LIMIT
+    if count <= safe:
+        return x, y, steps, None
+    # this move leaves the safe cells
+    x, y, outcome = _leave_safe_cells(field, x, y, dx, dy, trace)
+    return x, y, steps + 1, outcome
+
+
+def _end_iteration(
+    loop: list, x: int, y: int, steps: int, max_steps: int
+) -> int:
+    """
+    Count an iteration of the running repeat down. Once an iteration starts
+    from a cell an earlier one started from, the remaining whole periods
+    are skipped.
+
+    :param loop: [iterations left, start cell -> (iterations left, steps)
+        or None when periods aren't looked for]
+    :return: steps, with the steps of the skipped periods
+    """
+    loop[0] -= 1
+    left, starts = loop
+    if not left or starts is None:
+        return steps
+    seen = starts.get((x, y))
+    if seen is None:
+        starts[(x, y)] = (left, steps)
+        return steps
+    period = seen[0] - left
+    period_steps = steps - seen[1]
+    periods = left // period
+    if period_steps:
+        periods = min(periods, (max_steps - steps) // period_steps)
+    loop[0] = left - periods * period
+    # the rest of the repeat is shorter than a period or ends on the step
+    # limit, it is simply executed
+    loop[1] = None
+    return steps + periods * period_steps
+
+
+def _start_trace(
+    field: GameField, with_trace: bool, trace: list | None
+) -> list | None:
+    """Return the trace given to execute(), or a new one when asked for."""
+    if trace is None and with_trace:
+        return [field.start]
+    return trace
+
+
+def execute(
+    field: GameField,
+    bytecode: Bytecode,
+    with_trace: bool = True,
+    max_steps: int = PROGRAM_SETTINGS.max_steps,
+    time_limit: float = PROGRAM_SETTINGS.time_limit_ms / 1000,
+    trace: list | None = None,
+) -> SimulationResult:
+    """
+    Run the bytecode from the start cell.
+
+    The run ends like in simulate(), or with STEP_LIMIT when the program
+    would make more than max_steps moves (steps is max_steps then), or with
+    TIME_LIMIT after time_limit seconds.
+
+    :param with_trace: collect every visited cell. Periods of repeats aren't
+        skipped then, a trace is as long as the run.
+    :param trace: takes the visited cells after the start cell as they are
+        visited instead of a new list, anything with append and extend
+        (e.g. trace_codec.RunWriter); implies with_trace
+    """
+    code = bytecode.code
+    x, y = field.start
+    trace = _start_trace(field, with_trace, trace)
+
+    steps = 0
+    pc = 0
+    # per running repeat, see _end_iteration
+    loops: list[list] = []
+    returns: list[int] = []
+    deadline = perf_counter() + time_limit
+    executed = 0
+
+    while True:
+        executed += 1
+        if (
+            executed % TIME_CHECK_INTERVAL == 0
+            and perf_counter() > deadline
+        ):
+            return SimulationResult(Outcome.TIME_LIMIT, x, y, steps, trace)
+
+        opcode = code[pc]
+        if opcode == MOVE:
+            x, y, steps, outcome = _move(
+                field,
+                code[pc + 1],
+                code[pc + 2],
+                x,
+                y,
+                steps,
+                max_steps,
+                trace,
+            )
+            if outcome is not None:
+                return SimulationResult(outcome, x, y, steps, trace)
+            pc += 3
+        elif opcode == REPEAT:
+            iterations = code[pc + 1]
+            starts = (
+                None if trace is not None else {(x, y): (iterations, steps)}
+            )
+            loops.append([iterations, starts])
+            pc += 3
+        elif opcode == END:
+            steps = _end_iteration(loops[-1], x, y, steps, max_steps)
+            if loops[-1][0]:
+                pc = code[pc + 1] + 3
+            else:
+                loops.pop()
+                pc += 3
+        elif opcode == CALL:
+            returns.append(pc + 3)
+            pc = code[pc + 1]
+        elif opcode == HALT:
+            return SimulationResult(Outcome.STOPPED, x, y, steps, trace)
+        else:
+            pc = returns.pop()
+
+
+def grade_programs(
+    field: GameField, programs: Sequence[Bytecode]
+) -> list[tuple[str, int, int, int]]:
+    """
+    Run compiled programs without traces. Entry point of grading worker
+    processes, returns plain tuples (outcome, x, y, steps) to keep pickling
+    cheap.
+    """
+    results = []
+    for bytecode in programs:
+        result = execute(field, bytecode, with_trace=False)
+        results.append(
+            (result.outcome.value, result.x, result.y, result.steps)
+        )
+    return results
+
+
+def grade_submitted(
+    field: GameField, programs: Sequence[list[int] | dict]
+) -> tuple[int | None, list[str | None], list[tuple[str, int, int, int]]]:
+    """
+    Compile and run programs as they were submitted. Entry point of batch
+    grading workers, so that neither compilation nor the solver run on the
+    event loop.
+
+    :return: optimal number of steps of the field (None when the goal is
+        unreachable), Bytecode.fingerprint per program (None for programs
+        that don't compile) and (outcome, x, y, steps) per program,
+        INVALID_PROGRAM for programs that don't compile
+    """
+    fingerprints = []
+    results = []
+    for program in programs:
+        try:
+            bytecode = compile_program(program)
+        except ProgramCompileError:
+            fingerprints.append(None)
+            results.append((Outcome.INVALID_PROGRAM.value, *field.start, 0))
+            continue
+        result = execute(field, bytecode, with_trace=False)
+        fingerprints.append(bytecode.fingerprint())
+        results.append(
+            (result.outcome.value, result.x, result.y, result.steps)
+        )
+    return get_solution(field).optimal_steps, fingerprints, results
@@ -0,0 +1,151 @@
+"""
+Level library: many levels in one file, read through mmap.
+
+Layout (little endian), version 1:
+
+    header  32 bytes: 8s magic b"ALGLVLIB", H version, H reserved,
+            I number of levels, Q offset of the index, Q offset of the data
+    index   per level 16 bytes: Q offset of the field, I its length,
+            H optimal steps (0xFFFF - unknown), H reserved
+    data    fields one after another in the format of engine/field_codec.py
+
+Opening a library reads the header only, a level is decoded when it is
+accessed, so any level is reached in O(1) whatever the size of the file.
+"""
+
+import mmap
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from struct import Struct
+
+from engine.field_codec import decode_field, encode_field
+from engine.game_field import GameField
+
+MAGIC = b"ALGLVLIB"
+VERSION = 1
+
+HEADER = Struct("<8sHHIQQ")
+ENTRY = Struct("<QIHH")
+
+UNKNOWN_STEPS = 0xFFFF
+
+
+class LevelLibraryError(ValueError):
+    pass
+
+
+class LevelLibrary:
+    """
+    Read-only view of a library file. Fields are decoded from a copy of
+    their few hundred bytes, so they stay valid after the library is closed.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            # an empty file can't be mapped
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise LevelLibraryError("File is shorter than the header.")
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_header(self) -> None:
+        if len(self._mmap) < HEADER.size:
+            raise LevelLibraryError("File is shorter than the header.")
+        magic, version, _, count, index_offset, data_offset = (
+            HEADER.unpack_from(self._mmap)
+        )
+        if magic != MAGIC:
+            raise LevelLibraryError("Not a level library.")
+        if version != VERSION:
+            raise LevelLibraryError(f"Unsupported library version {version}.")
+        if index_offset + count * ENTRY.size > len(self._mmap):
+            raise LevelLibraryError("Index goes beyond the end of the file.")
+        self._count = count
+        self._index_offset = index_offset
+        self._data_offset = data_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "LevelLibrary":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _entry(self, number: int) -> tuple[int, int, int]:
+        if not 0 <= number < self._count:
+            raise IndexError(f"Level {number} is not in the library.")
+        offset, length, optimal_steps, _ = ENTRY.unpack_from(
+            self._mmap, self._index_offset + number * ENTRY.size
+        )
+        if offset + length > len(self._mmap):
+            raise LevelLibraryError(f"Level {number} is truncated.")
+        return offset, length, optimal_steps
+
+    def blob(self, number: int) -> bytes:
+        """Return the encoded field of the level, see engine/field_codec.py."""
+        offset, length, _ = self._entry(number)
+        return self._mmap[offset : offset + length]
+
+    def optimal_steps(self, number: int) -> int | None:
+        optimal_steps = self._entry(number)[2]
+        return None if optimal_steps == UNKNOWN_STEPS else optimal_steps
+
+    def __getitem__(self, number: int) -> GameField:
+        return decode_field(self.blob(number))
+
+    def __iter__(self) -> Iterator[GameField]:
+        for number in range(self._count):
+            yield self[number]
+
+
+def write_library(
+    path: str | Path, levels: Iterable[tuple[GameField, int | None]]
+) -> int:
+    """
+    Write (field, optimal steps) pairs to a new library file. The file is
+    written next to the target and renamed, readers never see half of it.
+
+    :return: number of written levels
+    """
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    entries = []
+    with open(temporary, "wb") as file:
+        file.write(bytes(HEADER.size))
+        data_offset = HEADER.size
+        offset = data_offset
+        for field, optimal_steps in levels:
+            blob = encode_field(field)
+            file.write(blob)
+            entries.append(
+                ENTRY.pack(
+                    offset,
+                    len(blob),
+                    UNKNOWN_STEPS if optimal_steps is None else optimal_steps,
+                    0,
+                )
+            )
+            offset += len(blob)
+        index_offset = offset
+        file.write(b"".join(entries))
+        file.seek(0)
+        file.write(
+            HEADER.pack(
+                MAGIC, VERSION, 0, len(entries), index_offset, data_offset
+            )
+        )
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    return len(entries)
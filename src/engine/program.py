@@ -0,0 +1,253 @@
+"""
+Programs with repeat blocks and procedures, compiled to bytecode for
+engine/interpreter.py.
+
+A program is either a plain list of action ids or
+
+    {
+        "main": [block, ...],
+        "procedures": {"name": [block, ...], ...},
+    }
+
+where a block is {"action": id}, {"repeat": n, "body": [block, ...]} or
+{"call": "name"}. Procedures can't call themselves, directly or through
+other procedures: without conditions such a program never ends.
+
+Bytecode is a flat array of instructions, three ints each (opcode and two
+arguments):
+
+    MOVE    action id, count    make the move count times in a row
+    REPEAT  count, end address  run the body up to the END count times
+    END     repeat address, 0
+    CALL    address, 0
+    RET     0, 0
+    HALT    0, 0
+
+main comes first and ends with HALT, the called procedures follow it, each
+ending with RET. The compiler folds what it can: neighbouring equal moves
+and repeats of a single move become one MOVE, repeats of one iteration and
+calls of one-move procedures are inlined, empty repeats and unused
+procedures are dropped. Programs that do the same thing with the same
+structure compile to the same bytecode.
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from hashlib import blake2b
+from itertools import groupby
+
+from core.config import PROGRAM_SETTINGS
+
+HALT = 0
+MOVE = 1
+REPEAT = 2
+END = 3
+CALL = 4
+RET = 5
+
+INSTRUCTION_SIZE = 3
+
+# largest int of the bytecode; MOVE counts are clamped to it, such runs end
+# on the step limit anyway
+MAX_COUNT = 2**31 - 1
+
+
+class ProgramCompileError(ValueError):
+    pass
+
+
+@dataclass(slots=True, frozen=True)
+class Bytecode:
+    code: array
+
+    def __len__(self) -> int:
+        """Return the number of instructions."""
+        return len(self.code) // INSTRUCTION_SIZE
+
+    def fingerprint(self) -> str:
+        return blake2b(self.code.tobytes(), digest_size=16).hexdigest()
+
+
+def _merge(instructions: list, instruction: tuple) -> None:
+    """Append the instruction, joining it with an equal previous move."""
+    if (
+        instruction[0] == MOVE
+        and instructions
+        and instructions[-1][0] == MOVE
+        and instructions[-1][1] == instruction[1]
+    ):
+        count = min(instructions[-1][2] + instruction[2], MAX_COUNT)
+        instructions[-1] = (MOVE, instruction[1], count)
+    else:
+        instructions.append(instruction)
+
+
+class _Compiler:
+    def __init__(self, procedures: Mapping[str, Sequence]):
+        if len(procedures) > PROGRAM_SETTINGS.max_procedures:
+            raise ProgramCompileError(
+                f"More than {PROGRAM_SETTINGS.max_procedures} procedures."
+            )
+        self.procedures = procedures
+        # name -> instructions, filled in the order of dependencies
+        self.compiled: dict[str, list] = {}
+        self.in_progress: list[str] = []
+
+    def procedure(self, name: str, depth: int) -> list:
+        compiled = self.compiled.get(name)
+        if compiled is not None:
+            return compiled
+        if name not in self.procedures:
+            raise ProgramCompileError(f"Unknown procedure {name!r}.")
+        if name in self.in_progress:
+            cycle = " -> ".join(
+                self.in_progress[self.in_progress.index(name) :] + [name]
+            )
+            raise ProgramCompileError(f"Recursive procedure call: {cycle}.")
+        self.in_progress.append(name)
+        compiled = self.blocks(self.procedures[name], depth)
+        self.in_progress.pop()
+        self.compiled[name] = compiled
+        return compiled
+
+    def blocks(self, blocks: Sequence, depth: int) -> list:
+        """
+        Instructions of the blocks as a tree: repeats keep their bodies as
+        nested lists until the program is laid out.
+        """
+        if depth > PROGRAM_SETTINGS.max_depth:
+            raise ProgramCompileError(
+                f"Blocks are nested deeper than {PROGRAM_SETTINGS.max_depth}."
+            )
+        instructions = []
+        for block in blocks:
+            if not isinstance(block, Mapping):
+                raise ProgramCompileError(f"Block {block!r} is not an object.")
+            if "action" in block:
+                _merge(instructions, (MOVE, int(block["action"]), 1))
+            elif "repeat" in block:
+                self.repeat(instructions, block, depth)
+            elif "call" in block:
+                body = self.procedure(block["call"], depth + 1)
+                if len(body) == 1 and body[0][0] == MOVE:
+                    _merge(instructions, body[0])
+                elif body:
+                    instructions.append((CALL, block["call"]))
+            else:
+                raise ProgramCompileError(f"Unknown block {block!r}.")
+        return instructions
+
+    def repeat(self, instructions: list, block: Mapping, depth: int) -> None:
+        count = int(block["repeat"])
+        if not 0 <= count <= PROGRAM_SETTINGS.max_repeat:
+            raise ProgramCompileError(
+                f"Repeat count must be from 0 to "
+                f"{PROGRAM_SETTINGS.max_repeat}."
+            )
+        body = self.blocks(block.get("body") or (), depth + 1)
+        if not count or not body:
+            return
+        if count == 1:
+            for instruction in body:
+                _merge(instructions, instruction)
+        elif len(body) == 1 and body[0][0] == MOVE:
+            _, action_id, moves = body[0]
+            _merge(
+                instructions,
+                (MOVE, action_id, min(moves * count, MAX_COUNT)),
+            )
+        else:
+            instructions.append((REPEAT, count, body))
+
+
+class _Layout:
+    """Lays the instruction tree out as bytecode."""
+
+    def __init__(self, compiled: Mapping[str, list]):
+        self.compiled = compiled
+        self.code = array("i")
+        # CALL instructions are patched once procedures get their addresses
+        self.calls: list[tuple[int, str]] = []
+        self.addresses: dict[str, int] = {}
+
+    def emit(self, opcode: int, first: int = 0, second: int = 0) -> int:
+        address = len(self.code)
+        if address // INSTRUCTION_SIZE >= PROGRAM_SETTINGS.max_instructions:
+            raise ProgramCompileError(
+                f"Program compiles to more than "
+                f"{PROGRAM_SETTINGS.max_instructions} instructions."
+            )
+        self.code.extend((opcode, first, second))
+        return address
+
+    def instructions(self, instructions: list) -> None:
+        for instruction in instructions:
+            opcode = instruction[0]
+            if opcode == MOVE:
+                self.emit(*instruction)
+            elif opcode == REPEAT:
+                start = self.emit(REPEAT, instruction[1])
+                self.instructions(instruction[2])
+                end = self.emit(END, start)
+                self.code[start + 2] = end
+            else:
+                self.calls.append((self.emit(CALL), instruction[1]))
+
+    def program(self, main: list) -> array:
+        self.instructions(main)
+        self.emit(HALT)
+        # procedures in the order of their first call
+        position = 0
+        while position < len(self.calls):
+            name = self.calls[position][1]
+            if name not in self.addresses:
+                self.addresses[name] = len(self.code)
+                self.instructions(self.compiled[name])
+                self.emit(RET)
+            position += 1
+        for address, name in self.calls:
+            self.code[address + 1] = self.addresses[name]
+        return self.code
+
+
+def compile_program(program: Sequence[int] | Mapping) -> Bytecode:
+    """
+    :param program: action ids or {"main": [...], "procedures": {...}}
+    :raise ProgramCompileError: the program is malformed, recursive or
+        exceeds PROGRAM_SETTINGS limits
+    """
+    try:
+        return _compile(program)
+    except ProgramCompileError:
+        raise
+    except OverflowError as e:
+        # bytecode holds signed 32-bit ints
+        raise ProgramCompileError(
+            f"Action ids must be from 0 to {MAX_COUNT}."
+        ) from e
+    except (TypeError, ValueError) as e:
+        raise ProgramCompileError(f"Malformed program: {e}") from e
+
+
+def _compile(program: Sequence[int] | Mapping) -> Bytecode:
+    if isinstance(program, Mapping):
+        main = program.get("main")
+        procedures = program.get("procedures") or {}
+        if not isinstance(main, Sequence) or not isinstance(
+            procedures, Mapping
+        ):
+            raise ProgramCompileError(
+                "Program must have a list of blocks in main and an object "
+                "of procedures."
+            )
+        compiler = _Compiler(procedures)
+        instructions = compiler.blocks(main, 0)
+        return Bytecode(_Layout(compiler.compiled).program(instructions))
+
+    # action ids: runs of equal moves, the length of the request bounds it
+    code = array("i")
+    for action_id, run in groupby(program):
+        code.extend((MOVE, int(action_id), sum(1 for _ in run)))
+    code.extend((HALT, 0, 0))
+    return Bytecode(code)
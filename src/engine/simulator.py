@@ -0,0 +1,89 @@
+"""
+Execution of a child's program (a sequence of action ids) on a game field.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import StrEnum
+
+from engine.game_field import ORIGIN, PIT, WALL, GameField
+
+
+class Outcome(StrEnum):
+    REACHED_GOAL = "reached_goal"
+    FELL_IN_PIT = "fell_in_pit"
+    HIT_WALL = "hit_wall"
+    LEFT_BOARD = "left_board"
+    # the program ended before the robot reached the goal
+    STOPPED = "stopped"
+    # the action is not available in this assignment
+    UNKNOWN_ACTION = "unknown_action"
+    # limits of engine/interpreter.py
+    STEP_LIMIT = "step_limit"
+    TIME_LIMIT = "time_limit"
+    # the program didn't compile, see engine/program.py
+    INVALID_PROGRAM = "invalid_program"
+
+
+@dataclass(slots=True)
+class SimulationResult:
+    outcome: Outcome
+    x: int
+    y: int
+    steps: int
+    trace: list[tuple[int, int]] | None = None
+
+    @property
+    def solved(self) -> bool:
+        return self.outcome is Outcome.REACHED_GOAL
+
+
+def simulate(
+    field: GameField, program: Sequence[int], with_trace: bool = True
+) -> SimulationResult:
+    """
+    Run the program from the start cell.
+
+    The robot stops on the first action that would take it off the board or
+    into a wall (it stays on its cell), when it steps into a pit, and when it
+    reaches the goal. steps counts executed actions including the last one.
+
+    :param field: game field of the assignment
+    :param program: action ids
+    :param with_trace: collect every visited cell, starting with the start
+    """
+    width = field.width
+    max_x = width + ORIGIN
+    max_y = field.height + ORIGIN
+    kinds = field.kinds
+    actions = field.actions
+    end_x, end_y = field.end
+    x, y = field.start
+    trace = [(x, y)] if with_trace else None
+
+    steps = 0
+    for action_id in program:
+        steps += 1
+        move = actions.get(action_id)
+        if move is None:
+            return SimulationResult(Outcome.UNKNOWN_ACTION, x, y, steps, trace)
+
+        next_x = x + move[0]
+        next_y = y + move[1]
+        if not (ORIGIN <= next_x < max_x and ORIGIN <= next_y < max_y):
+            return SimulationResult(Outcome.LEFT_BOARD, x, y, steps, trace)
+
+        kind = kinds[(next_y - ORIGIN) * width + next_x - ORIGIN]
+        if kind == WALL:
+            return SimulationResult(Outcome.HIT_WALL, x, y, steps, trace)
+
+        x, y = next_x, next_y
+        if trace is not None:
+            trace.append((x, y))
+        if kind == PIT:
+            return SimulationResult(Outcome.FELL_IN_PIT, x, y, steps, trace)
+        if x == end_x and y == end_y:
+            return SimulationResult(Outcome.REACHED_GOAL, x, y, steps, trace)
+
+    return SimulationResult(Outcome.STOPPED, x, y, steps, trace)
+
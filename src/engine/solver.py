@@ -0,0 +1,77 @@
+"""
+Breadth-first search over the game field: is the goal reachable with the
+actions of the assignment and how many steps the shortest program takes.
+Moves follow the simulator: a move jumps to the target cell, walls and the
+board edge keep the robot in place, pits end the run.
+"""
+
+from array import array
+from collections import deque
+from dataclasses import dataclass
+
+from engine.cache import SOLUTION_CACHE
+from engine.game_field import PIT, WALL, GameField
+
+
+@dataclass(slots=True, frozen=True)
+class Solution:
+    reachable: bool
+    # length of the shortest program, None when the goal is unreachable
+    optimal_steps: int | None
+    # one of the shortest programs
+    program: tuple[int, ...] | None
+
+
+def solve(field: GameField) -> Solution:
+    width, height = field.width, field.height
+    kinds = field.kinds
+    start = field.index(*field.start)
+    goal = field.index(*field.end)
+    if start == goal:
+        return Solution(reachable=True, optimal_steps=0, program=())
+
+    # cell -> cell it was reached from and action that reached it
+    previous = array("i", [-1]) * (width * height)
+    via_action = array("i", [0]) * (width * height)
+    previous[start] = start
+    moves = sorted(field.actions.items())
+
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        y, x = divmod(cell, width)
+        for action_id, (dx, dy) in moves:
+            next_x, next_y = x + dx, y + dy
+            if not (0 <= next_x < width and 0 <= next_y < height):
+                continue
+            target = next_y * width + next_x
+            if previous[target] != -1 or kinds[target] in (WALL, PIT):
+                continue
+            previous[target] = cell
+            via_action[target] = action_id
+            if target == goal:
+                return _solution(previous, via_action, start, goal)
+            queue.append(target)
+
+    return Solution(reachable=False, optimal_steps=None, program=None)
+
+
+def _solution(previous, via_action, start: int, goal: int) -> Solution:
+    program = []
+    cell = goal
+    while cell != start:
+        program.append(via_action[cell])
+        cell = previous[cell]
+    program.reverse()
+    return Solution(
+        reachable=True, optimal_steps=len(program), program=tuple(program)
+    )
+
+
+def get_solution(field: GameField) -> Solution:
+    """solve with SOLUTION_CACHE in front."""
+    solution = SOLUTION_CACHE.get(field.fingerprint)
+    if solution is None:
+        solution = solve(field)
+        SOLUTION_CACHE.put(field.fingerprint, solution)
+    return solution
@@ -0,0 +1,119 @@
+"""
+Binary frames of execution traces, streamed by /run/{uuid}/stream/.
+
+A trace is sent as runs of equal moves: the robot moved count times by
+(x change, y change) in a row. Frames (little endian), the first byte is
+the kind:
+
+    START  B kind=1, B start x, B start y, I reserved (0)
+    MOVES  B kind=2, I sequence number from 0,
+           then runs: b x change, b y change, H count
+    END    B kind=3, B outcome (index in OUTCOMES), B x, B y, I steps
+
+MOVES frames are made while the program runs, so their number isn't known
+when START goes out: the client plays MOVES frames until END. A run of a
+straight program line costs 4 bytes whatever its length, while the trace
+of /run/ costs a cell per step.
+"""
+
+from array import array
+from collections.abc import Callable
+from struct import Struct
+
+from engine.game_field import GameField
+from engine.interpreter import execute
+from engine.program import Bytecode
+from engine.simulator import Outcome, SimulationResult
+
+START = 1
+MOVES = 2
+END = 3
+
+START_FRAME = Struct("<BBBI")
+MOVES_HEADER = Struct("<BI")
+RUN = Struct("<bbH")
+END_FRAME = Struct("<BBBBI")
+
+OUTCOMES = list(Outcome)
+MAX_RUN = 0xFFFF
+
+
+class RunWriter:
+    """
+    Trace of execute() that packs the moves into RUN records as the robot
+    makes them and passes every frame_runs finished runs to emit as a
+    MOVES frame. What it keeps is the runs of one frame.
+    """
+
+    def __init__(
+        self,
+        start: tuple[int, int],
+        frame_runs: int,
+        emit: Callable[[bytes], None],
+    ):
+        self.x, self.y = start
+        self.frame_runs = frame_runs
+        self.emit = emit
+        self.sequence = 0
+        # x change, y change and count of the runs of the next frame,
+        # flattened; the last run can still grow
+        self._runs = array("i")
+
+    def append(self, cell: tuple[int, int]) -> None:
+        x, y = cell
+        dx = x - self.x
+        dy = y - self.y
+        self.x, self.y = x, y
+        runs = self._runs
+        if runs and runs[-3] == dx and runs[-2] == dy and runs[-1] < MAX_RUN:
+            runs[-1] += 1
+            return
+        if len(runs) == 3 * self.frame_runs:
+            self._emit_frame()
+        runs.extend((dx, dy, 1))
+
+    def extend(self, cells) -> None:
+        for cell in cells:
+            self.append(cell)
+
+    def close(self) -> None:
+        """Emit the runs that are left, the run is over."""
+        if self._runs:
+            self._emit_frame()
+
+    def _emit_frame(self) -> None:
+        runs = self._runs
+        frame = bytearray(MOVES_HEADER.pack(MOVES, self.sequence))
+        for i in range(0, len(runs), 3):
+            frame += RUN.pack(runs[i], runs[i + 1], runs[i + 2])
+        del runs[:]
+        self.sequence += 1
+        self.emit(bytes(frame))
+
+
+def start_frame(field: GameField) -> bytes:
+    return START_FRAME.pack(START, *field.start, 0)
+
+
+def end_frame(result: SimulationResult) -> bytes:
+    return END_FRAME.pack(
+        END, OUTCOMES.index(result.outcome), result.x, result.y, result.steps
+    )
+
+
+def run_frames(
+    field: GameField,
+    bytecode: Bytecode,
+    frame_runs: int,
+    emit: Callable[[bytes], None],
+) -> SimulationResult:
+    """
+    Run the bytecode and pass START, MOVES frames of at most frame_runs
+    runs each and END to emit as the interpreter produces them.
+    """
+    emit(start_frame(field))
+    writer = RunWriter(field.start, frame_runs, emit)
+    result = execute(field, bytecode, trace=writer)
+    writer.close()
+    emit(end_frame(result))
+    return result
@@ -16,3 +16,27 @@ class AssignmentPositionError(AssignmentException):
 
 class AssignmentElementFieldError(AssignmentException):
     pass
+
+
+class AssignmentElementDuplicateError(AssignmentException):
+    """An element is placed on one assignment more than once."""
+
+
+class AssignmentActionError(AssignmentException):
+    pass
+
+
+class AssignmentGenerationError(AssignmentException):
+    pass
+
+
+class AssignmentProgramError(AssignmentException):
+    pass
+
+
+class AssignmentFieldEncodingError(AssignmentException):
+    """The field doesn't fit the binary format of engine/field_codec.py."""
+
+
+class TraceStreamError(AssignmentException):
+    """The client of a trace stream sent a bad message or none in time."""
@@ -0,0 +1,18 @@
+class SubmissionException(Exception):
+    pass
+
+
+class SubmissionNotFoundException(SubmissionException):
+    pass
+
+
+class SubmissionCursorError(SubmissionException):
+    pass
+
+
+class SubmissionBufferFullError(SubmissionException):
+    pass
+
+
+class SubmissionForbiddenError(SubmissionException):
+    pass
@@ -7,6 +7,7 @@ from sqlalchemy import (
     ForeignKey,
     Identity,
     Integer,
+    LargeBinary,
     SmallInteger,
     String,
     UniqueConstraint,
@@ -68,6 +69,9 @@ class GameFieldAssignment(Base):
     start_y = Column(SmallInteger, nullable=False)
     end_x = Column(SmallInteger, nullable=False)
     end_y = Column(SmallInteger, nullable=False)
+    # whole field with elements and actions, see engine/field_codec.py;
+    # rewritten by every write to the field
+    field_blob = Column(LargeBinary, nullable=True)
 
     # Relationship to AssignmentElement (one-to-many)
     assignment_elements = relationship(
@@ -0,0 +1,52 @@
+from sqlalchemy import (
+    UUID,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+)
+
+from models.base_model import Base
+
+
+class JournalEntry(Base):
+    """
+    Results of a user on an assignment of a course, kept up to date from
+    the submissions: every flush of the submission buffer upserts the
+    entries of its rows (see INSERT_SUBMISSIONS).
+    """
+
+    __tablename__ = "journal"
+
+    course_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("course.course_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_login = Column(
+        String(255),
+        ForeignKey("user.user_login", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    assignment_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("assignment.assignment_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    attempts = Column(Integer, nullable=False)
+    solved = Column(Boolean, nullable=False)
+    # fewest steps of a solution, None until solved
+    best_steps = Column(Integer)
+    # time of the first solution with best_steps
+    best_at = Column(DateTime(timezone=True))
+    last_outcome = Column(String(32), nullable=False)
+    last_attempt_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<JournalEntry(course_id={self.course_id}, "
+            f"user_login='{self.user_login}', "
+            f"assignment_id={self.assignment_id}, attempts={self.attempts})>"
+        )
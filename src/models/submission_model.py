@@ -0,0 +1,61 @@
+from sqlalchemy import (
+    UUID,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from models.base_model import Base
+
+
+class Submission(Base):
+    """
+    A run of a child's program. Rows are only inserted (in batches, see
+    services/submission_buffer.py) and deleted, never updated.
+    """
+
+    __tablename__ = "submission"
+
+    # generated by the server when the run is accepted, before the row is
+    # written
+    submission_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_login = Column(
+        String(255),
+        ForeignKey("user.user_login", ondelete="CASCADE"),
+        nullable=False,
+    )
+    assignment_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("game_field_assignment.assignment_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # action ids or a program with repeats and procedures
+    program = Column(JSONB, nullable=False)
+    outcome = Column(String(32), nullable=False)
+    x = Column(SmallInteger, nullable=False)
+    y = Column(SmallInteger, nullable=False)
+    steps = Column(Integer, nullable=False)
+    # time the run was accepted, not the time of the insert
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # keyset pagination of a child's submissions
+        Index(
+            "ix_submission_user_assignment_created",
+            "user_login",
+            "assignment_id",
+            "created_at",
+            "submission_id",
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<Submission(submission_id={self.submission_id}, "
+            f"user_login='{self.user_login}', outcome='{self.outcome}')>"
+        )
@@ -13,7 +13,8 @@ class User(Base):
     user_login = Column(String(255), primary_key=True)
     email = Column(String(320), unique=True, nullable=False)
     phone = Column(String(18), unique=True)
-    password = Column(String(60), nullable=False)
+    # scrypt hash, see utils/user_utils/hash.py
+    password = Column(String(255), nullable=False)
     role_id = Column(Integer, ForeignKey("role.role_id"), nullable=False)
     role = relationship("Role", back_populates="users")
     md_user = relationship("MdUser", back_populates="user", uselist=False)
@@ -1,24 +1,21 @@
 # module for work with db in asyncio mod
 import uuid
-from typing import Any, Coroutine
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from exceptions.AssignmentException import AssignmentElementFieldError
-from models.assignment_element_model import (
-    AssignmentElement,
-    AssignmentAction,
+from exceptions.AssignmentException import (
+    AssignmentElementFieldError,
+    AssignmentActionError,
 )
-from schemas.action_schema import ActionGet
+from schemas.action_schema import AssignmentActionsChange
 from schemas.assignment_schema import (
     AssignmentCreate,
     AssignmentGet,
     AssignmentDelete,
+    GeneratedAssignmentGet,
 )
 
-from asyncpg.exceptions import RaiseError
-
-from sqlalchemy.exc import SQLAlchemyError, DatabaseError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 # Logger module
 from logger.logger_module import ModuleLoger
@@ -27,7 +24,12 @@ from logger.logger_module import ModuleLoger
 import repository.sql_queries.assignments_queries as assignments_queries
 
 # configuration file
-from core.config import STATUS_OF_ELEMENTS_SETTINGS
+from core.config import GAME_SETTINGS, VALIDATION_SETTINGS
+
+# game engine
+from engine.generator import Level
+from engine.game_field import PIT, WALL, GameField
+from engine.field_codec import encode_field
 
 # lib for working with path
 from pathlib import Path
@@ -40,8 +42,6 @@ from schemas.game_element_schema import GameElementGet, GameElementCreate
 
 logger = ModuleLoger(Path(__file__).stem)
 
-INSERT_ELEMENT_PATTER = "(:element_id, :assignment_id, :pos_x, :pos_y)"
-
 
 class AssignmentRepo:
 
@@ -50,11 +50,10 @@ class AssignmentRepo:
         assignment_uuid: str,
         session: AsyncSession,
     ):
-        async with session:
-            result = await session.execute(
-                assignments_queries.IS_ASSIGNMENT_EXISTS,
-                params={"assignment_uuid": assignment_uuid},
-            )
+        result = await session.execute(
+            assignments_queries.IS_ASSIGNMENT_EXISTS,
+            params={"assignment_uuid": assignment_uuid},
+        )
         return result.fetchone()
 
     @staticmethod
@@ -62,11 +61,10 @@ class AssignmentRepo:
         course_uuid: str,
         session: AsyncSession,
     ) -> list[AssignmentGet] | None:
-        async with session:
-            result = await session.execute(
-                assignments_queries.GET_COURSE_ASSIGNMENTS,
-                params={"course_uuid": course_uuid},
-            )
+        result = await session.execute(
+            assignments_queries.GET_COURSE_ASSIGNMENTS,
+            params={"course_uuid": course_uuid},
+        )
         assignments = [AssignmentGet(**row) for row in result.mappings()]
         return assignments
 
@@ -76,39 +74,42 @@ class AssignmentRepo:
         session: AsyncSession,
     ) -> AssignmentGet | None:
         """
-        Create (or update on uuid-conflict) an assignment.
+        Create an assignment together with its game field in one statement.
+        Raises IntegrityError if the course doesn't exist.
 
         :param assignment_in: Assignment data to create.
         :param session: Async session to database.
         """
-
-        async with session:
-            try:
-                result = await session.execute(
-                    assignments_queries.CREATE_ASSIGNMENT,
-                    params=assignment_in.model_dump(),
-                )
-                assignment_uuid = (
-                    result.mappings().fetchone().get("assignment_id")
-                )
-                logger.info(f"Created assignment {assignment_uuid}")
-                await session.execute(
-                    assignments_queries.CREATE_GAME_ASSIGNMENT,
-                    params={
-                        "assignment_id": assignment_uuid,
-                        "field_width": assignment_in.field_width,
-                        "field_height": assignment_in.field_height,
-                        "start_x": assignment_in.start_x,
-                        "start_y": assignment_in.start_y,
-                        "end_x": assignment_in.end_x,
-                        "end_y": assignment_in.end_y,
-                    },
-                )
-                await session.commit()
-            except SQLAlchemyError as e:
-                logger.error(e)
-                await session.rollback()
-                raise DatabaseError()
+        # a new field has neither elements nor actions
+        field_blob = encode_field(
+            GameField(
+                width=assignment_in.field_width,
+                height=assignment_in.field_height,
+                start=(assignment_in.start_x, assignment_in.start_y),
+                end=(assignment_in.end_x, assignment_in.end_y),
+                cells=bytes(
+                    assignment_in.field_width * assignment_in.field_height
+                ),
+                actions={},
+            )
+        )
+        try:
+            result = await session.execute(
+                assignments_queries.CREATE_ASSIGNMENT_WITH_GAME_FIELD,
+                params={
+                    **assignment_in.model_dump(),
+                    "field_blob": field_blob,
+                },
+            )
+        except IntegrityError as e:
+            # unknown course (foreign key), mapped by the service
+            logger.info("Assignment is not created: %s" % e)
+            raise
+        except SQLAlchemyError as e:
+            logger.error(e)
+            raise
+        assignment_uuid = result.scalar_one()
+        logger.info(f"Created assignment {assignment_uuid}")
 
         assignment = AssignmentGet(
             assignment_id=assignment_uuid,
@@ -127,36 +128,151 @@ class AssignmentRepo:
         return assignment
 
     @staticmethod
-    async def update_assignment(
-        assignment_in: AssignmentCreate,
+    async def create_assignments_from_fields(
+        course_uuid: str,
+        fields: list[GameField],
+        names: list[str],
+        description: str | None,
+        status_id: int,
         session: AsyncSession,
-    ) -> AssignmentGet | None:
+    ) -> list[str]:
         """
-        Create an assignment.
-
-        :param assignment_in: Assignment data to create.
-        :param session: Async session to database.
+        Insert ready game fields as assignments with their obstacles,
+        actions and field blobs: three multi-row statements whatever the
+        number of fields. Ids are generated here, so no statement has to
+        wait for another's result. Every pit and wall gets a new element
+        row, a copy of the one configured in GAME_SETTINGS.
+        Raises IntegrityError if the course or an action doesn't exist.
+
+        :return: ids of the new assignments, in the order of fields
         """
+        template_ids = {
+            PIT: GAME_SETTINGS.generated_pit_element_id,
+            WALL: GAME_SETTINGS.generated_wall_element_id,
+        }
+        assignment_ids = [str(uuid.uuid4()) for _ in fields]
+
+        elements = {
+            "template_ids": [],
+            "assignment_ids": [],
+            "pos_xs": [],
+            "pos_ys": [],
+        }
+        actions = {"assignment_ids": [], "action_ids": []}
+        for assignment_id, field in zip(assignment_ids, fields, strict=True):
+            for index, kind in enumerate(field.kinds):
+                if kind:
+                    y, x = divmod(index, field.width)
+                    elements["template_ids"].append(template_ids[kind])
+                    elements["assignment_ids"].append(assignment_id)
+                    elements["pos_xs"].append(
+                        x + VALIDATION_SETTINGS.counting_field_from
+                    )
+                    elements["pos_ys"].append(
+                        y + VALIDATION_SETTINGS.counting_field_from
+                    )
+            for action_id in field.actions:
+                actions["assignment_ids"].append(assignment_id)
+                actions["action_ids"].append(action_id)
 
-        # TODO what are you sinking about update history?
-        async with session:
-            result = await session.execute(
-                assignments_queries.CREATE_ASSIGNMENT,
-                params=assignment_in.model_dump(),
+        try:
+            await session.execute(
+                assignments_queries.INSERT_ASSIGNMENTS_WITH_GAME_FIELDS,
+                params={
+                    "course_id": course_uuid,
+                    # game assignment, as the default of AssignmentBase
+                    "assignment_type_id": 1,
+                    "status_id": status_id,
+                    "assignment_ids": assignment_ids,
+                    "names": names,
+                    "descriptions": [description] * len(fields),
+                    "field_widths": [field.width for field in fields],
+                    "field_heights": [field.height for field in fields],
+                    "start_xs": [field.start[0] for field in fields],
+                    "start_ys": [field.start[1] for field in fields],
+                    "end_xs": [field.end[0] for field in fields],
+                    "end_ys": [field.end[1] for field in fields],
+                    "field_blobs": [encode_field(field) for field in fields],
+                },
             )
-            await session.commit()
+            if elements["template_ids"]:
+                await session.execute(
+                    assignments_queries.PLACE_NEW_ELEMENTS,
+                    params=elements,
+                )
+            if actions["action_ids"]:
+                await session.execute(
+                    assignments_queries.INSERT_ACTIONS_OF_ASSIGNMENTS,
+                    params=actions,
+                )
+        except IntegrityError as e:
+            logger.info("Assignments are not created: %s" % e)
+            raise
+        logger.info(
+            "Created %s assignments in course %s" % (len(fields), course_uuid)
+        )
+        return assignment_ids
 
-        result = result.fetchone()
-        logger.info("The assignment was created. Params: %s" % result)
+    @staticmethod
+    async def create_generated_assignments(
+        course_uuid: str,
+        levels: list[Level],
+        actions: dict[int, tuple[int, int]],
+        name_prefix: str,
+        description: str | None,
+        status_id: int,
+        session: AsyncSession,
+    ) -> list[GeneratedAssignmentGet]:
+        """
+        Insert generated levels, see create_assignments_from_fields.
+        Raises IntegrityError if the course doesn't exist.
+        """
+        names = [
+            f"{name_prefix} {number}" for number in range(1, len(levels) + 1)
+        ]
+        assignment_ids = await AssignmentRepo.create_assignments_from_fields(
+            course_uuid=course_uuid,
+            fields=[
+                GameField(
+                    width=level.width,
+                    height=level.height,
+                    start=level.start,
+                    end=level.end,
+                    cells=level.cells,
+                    actions=actions,
+                )
+                for level in levels
+            ],
+            names=names,
+            description=description,
+            status_id=status_id,
+            session=session,
+        )
+        return [
+            GeneratedAssignmentGet(
+                assignment_id=assignment_id,
+                name=name,
+                optimal_steps=level.optimal_steps,
+            )
+            for assignment_id, name, level in zip(
+                assignment_ids, names, levels, strict=True
+            )
+        ]
 
-        assignment = AssignmentGet(
-            course_id=result.course_id,
-            assignment_id=result.assignment_id,
-            name=result.name,
-            assignment_type_id=result.assignment_type_id,
-            status_id=result.status_id,
+    @staticmethod
+    async def get_action_vectors(
+        action_ids: list[int],
+        session: AsyncSession,
+    ) -> dict[int, tuple[int, int]]:
+        """Map the ids of existing actions to their (x, y) changes."""
+        result = await session.execute(
+            assignments_queries.GET_ACTIONS_BY_IDS,
+            params={"action_ids": action_ids},
         )
-        return assignment
+        return {
+            row["action_id"]: (row["x_value_changes"], row["y_value_changes"])
+            for row in result.mappings()
+        }
 
     @staticmethod
     async def delete_assignment(
@@ -171,12 +287,10 @@ class AssignmentRepo:
         :return:
         """
 
-        async with session:
-            await session.execute(
-                assignments_queries.SAFE_DELETE_ASSIGNMENT,
-                params={"assignment_id": assignment_id},
-            )
-            await session.commit()
+        await session.execute(
+            assignments_queries.SAFE_DELETE_ASSIGNMENT,
+            params={"assignment_id": assignment_id},
+        )
 
         return AssignmentDelete(assignment_id=assignment_id)
 
@@ -190,11 +304,10 @@ class AssignmentRepo:
         table in JSON format.
         :return:
         """
-        async with session:
-            result = await session.execute(
-                assignments_queries.GET_TOTAL_INFO_ABOUT_ASSIGNMENT,
-                params={"assignment_id": assignment_uuid},
-            )
+        result = await session.execute(
+            assignments_queries.GET_TOTAL_INFO_ABOUT_ASSIGNMENT,
+            params={"assignment_id": assignment_uuid},
+        )
         data = result.mappings().fetchone()
 
         if data:
@@ -213,14 +326,14 @@ class AssignmentRepo:
                 end_y=data["end_y"],
             )
             elements = None
-            if data["elements"] != [None]:
+            if data["elements"]:
                 elements = [GameElementGet(**row) for row in data["elements"]]
             logger.info(
                 "Get game elements of %s: %s" % (assignment_uuid, elements)
             )
             logger.info(
                 "Available actions of assignment %s: %s"
-                % (assignment_uuid, elements)
+                % (assignment_uuid, data["actions"])
             )
             if assigment:
                 return assigment, elements
@@ -230,47 +343,118 @@ class AssignmentRepo:
             )
         return None
 
+    @staticmethod
+    async def get_fields_data(
+        assignment_ids: list[str],
+        session: AsyncSession,
+    ) -> dict[str, dict]:
+        """
+        Field size, start and end cells, elements and actions (as lists of
+        dicts) of several assignments with one statement, keyed by
+        assignment id. Assignments without a game field are left out.
+        """
+        result = await session.execute(
+            assignments_queries.GET_GAME_FIELDS_DATA,
+            params={"assignment_ids": assignment_ids},
+        )
+        return {
+            str(row["assignment_id"]): dict(row) for row in result.mappings()
+        }
+
+    @staticmethod
+    async def get_field_blobs(
+        assignment_ids: list[str],
+        session: AsyncSession,
+    ) -> dict[str, bytes | None]:
+        """
+        Return the encoded fields by assignment id, None for fields that were
+        never encoded. Assignments without a game field are left out.
+        """
+        result = await session.execute(
+            assignments_queries.GET_FIELD_BLOBS,
+            params={"assignment_ids": assignment_ids},
+        )
+        return {
+            str(row["assignment_id"]): row["field_blob"]
+            for row in result.mappings()
+        }
+
+    @staticmethod
+    async def update_field_blobs(
+        field_blobs: dict[str, bytes | None],
+        session: AsyncSession,
+    ) -> None:
+        if not field_blobs:
+            return
+        await session.execute(
+            assignments_queries.UPDATE_FIELD_BLOBS,
+            params={
+                "assignment_ids": list(field_blobs),
+                "field_blobs": list(field_blobs.values()),
+            },
+        )
+        logger.info("Field blobs updated: %s" % list(field_blobs))
+
+    @staticmethod
+    async def get_game_fields(
+        assignment_ids: list[str],
+        session: AsyncSession,
+    ) -> dict[str, dict]:
+        """
+        Return game fields of the assignments with coordinates of the cells
+        already taken by elements and the ids of these elements, keyed by
+        assignment id.
+        """
+        result = await session.execute(
+            assignments_queries.GET_GAME_FIELDS_WITH_OCCUPIED_CELLS,
+            params={"assignment_ids": assignment_ids},
+        )
+        return {
+            str(row["assignment_id"]): dict(row) for row in result.mappings()
+        }
+
     @staticmethod
     async def add_elements(
         element_list: list[GameElementCreate, ...],
         session: AsyncSession,
-    ) -> list[AssignmentElement]:
+    ) -> list[GameElementCreate]:
+        """
+        Insert all elements with one multi-row statement.
+
+        :param element_list: elements, already checked against their fields
+        :param session: async session to database
+        :return: added elements
+        """
         try:
-            assignment_elements = [
-                AssignmentElement(
-                    assignment_id=element.assignment_id,
-                    element_id=element.element_id,
-                    pos_x=element.pos_x,
-                    pos_y=element.pos_y,
-                )
-                for element in element_list
-            ]
-            logger.info(assignment_elements)
-            async with session:
-                session.add(assignment_elements[0])
-                # session.add_all(assignment_elements)
-                await session.commit()
-            logger.info(
-                "Elements successfully added: %s" % assignment_elements
+            await session.execute(
+                assignments_queries.INSERT_GAME_ELEMENTS,
+                params={
+                    "element_ids": [e.element_id for e in element_list],
+                    "assignment_ids": [
+                        str(e.assignment_id) for e in element_list
+                    ],
+                    "pos_xs": [e.pos_x for e in element_list],
+                    "pos_ys": [e.pos_y for e in element_list],
+                },
             )
-            return assignment_elements
         except SQLAlchemyError as e:
             logger.info("Conflict with creating assigment elements: %s " % e)
-            await session.rollback()
             raise AssignmentElementFieldError()
 
+        logger.info("Elements successfully added: %s" % element_list)
+        return element_list
+
     @staticmethod
     async def get_assignment_actions(
         action_uuid: str,
         session: AsyncSession,
     ):
-        async with session:
-            result = await session.execute(
-                assignments_queries.GET_ASSIGNMENT_ACTIONS,
-                params={
-                    "assignment_id": action_uuid,
-                },
-            )
+        result = await session.execute(
+            assignments_queries.GET_ASSIGNMENT_ACTIONS,
+            params={
+                "assignment_id": action_uuid,
+            },
+        )
 
         actions = result.mappings().fetchall()
         return actions
@@ -280,22 +464,66 @@ class AssignmentRepo:
         actions_id: list[int, any],
         assignment_uuid: str,
         session: AsyncSession,
-    ):
-        actions_assignment = [
-            AssignmentAction(
-                assignment_id=assignment_uuid, action_id=action_id
+    ) -> AssignmentActionsChange:
+        """
+        Attach actions to an assignment, skipping the attached ones.
+
+        :return: actions that were really added
+        """
+        try:
+            result = await session.execute(
+                assignments_queries.ADD_ASSIGNMENT_ACTIONS,
+                params={
+                    "assignment_id": assignment_uuid,
+                    "action_ids": actions_id,
+                },
             )
-            for action_id in actions_id
-        ]
+        except IntegrityError as e:
+            logger.info(
+                "Actions %s can't be added to assignment %s: %s"
+                % (actions_id, assignment_uuid, e)
+            )
+            raise AssignmentActionError()
+
+        change = AssignmentActionsChange(
+            assignment_id=assignment_uuid,
+            added=sorted(result.scalars()),
+        )
+        logger.info("Actions of assignment changed: %s" % change)
+        return change
+
+    @staticmethod
+    async def set_actions(
+        actions_id: list[int, any],
+        assignment_uuid: str,
+        session: AsyncSession,
+    ) -> AssignmentActionsChange:
+        """
+        Make actions_id the whole action set of an assignment: actions that
+        are not in the list are removed, missing ones are added.
+
+        :return: added and removed actions
+        """
         try:
-            async with session:
-                session.add_all(actions_assignment)
-                await session.commit()
-        except SQLAlchemyError as e:
-            logger.error(e)
-            await session.rollback()
+            result = await session.execute(
+                assignments_queries.SET_ASSIGNMENT_ACTIONS,
+                params={
+                    "assignment_id": assignment_uuid,
+                    "action_ids": actions_id,
+                },
+            )
+        except IntegrityError as e:
+            logger.info(
+                "Actions of assignment %s can't be set to %s: %s"
+                % (assignment_uuid, actions_id, e)
+            )
+            raise AssignmentActionError()
 
-        logger.info(
-            "Actions to assignment %s successfully added: %s"
-            % (assignment_uuid, actions_assignment)
+        row = result.mappings().one()
+        change = AssignmentActionsChange(
+            assignment_id=assignment_uuid,
+            added=row["added"],
+            removed=row["removed"],
         )
+        logger.info("Actions of assignment changed: %s" % change)
+        return change
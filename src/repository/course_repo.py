@@ -24,20 +24,28 @@ class CourseRepository:
 
     @staticmethod
     async def is_course_exists(session: AsyncSession, course_id: str) -> bool:
-        async with session:
-            result = await session.execute(
-                course_queries.IS_COURSE_EXISTS, {"course_id": course_id}
-            )
+        result = await session.execute(
+            course_queries.IS_COURSE_EXISTS, {"course_id": course_id}
+        )
 
         if course := result.fetchone():
             logger.info(course)
             return True
         return False
 
+    @staticmethod
+    async def is_user_on_assignment_course(
+        session: AsyncSession, assignment_id: str, user_login: str
+    ) -> bool:
+        result = await session.execute(
+            course_queries.IS_USER_ON_ASSIGNMENT_COURSE,
+            {"assignment_id": assignment_id, "user_login": user_login},
+        )
+        return result.scalar_one()
+
     @staticmethod
     async def get_all_course(session: AsyncSession) -> list[CourseGet]:
-        async with session:
-            result = await session.execute(course_queries.GET_COURSES)
+        result = await session.execute(course_queries.GET_COURSES)
 
         courses = [
             CourseGet(
@@ -56,11 +64,10 @@ class CourseRepository:
         course_id: str, session: AsyncSession
     ) -> CourseGet | None:
         """Get courses by id."""
-        async with session:
-            result = await session.execute(
-                course_queries.GET_COURSE_BY_ID,
-                params={"course_id": course_id},
-            )
+        result = await session.execute(
+            course_queries.GET_COURSE_BY_ID,
+            params={"course_id": course_id},
+        )
         course = CourseGet(**result.mappings().fetchone())
         logger.info("The course: %s have been requests" % course)
 
@@ -71,11 +78,10 @@ class CourseRepository:
         owner: str, session: AsyncSession
     ) -> list[CourseGet]:
         """Get all courses owned by a specific owner."""
-        async with session:
-            result = await session.execute(
-                course_queries.GET_COURSES_BY_OWNER,
-                params={"owner": owner},
-            )
+        result = await session.execute(
+            course_queries.GET_COURSES_BY_OWNER,
+            params={"owner": owner},
+        )
         courses = [CourseGet(**row) for row in result.mappings().fetchall()]
         logger.info(
             "Courses owned by %s have been requested: %s" % (owner, courses)
@@ -88,11 +94,10 @@ class CourseRepository:
         course_id: str, session: AsyncSession
     ) -> list[dict]:
         """Get all users enrolled in a specific course."""
-        async with session:
-            result = await session.execute(
-                course_queries.GET_USERS_ON_COURSE,
-                params={"course_id": course_id},
-            )
+        result = await session.execute(
+            course_queries.GET_USERS_ON_COURSE,
+            params={"course_id": course_id},
+        )
         users = [
             {"course_id": row["course_id"], "user_login": row["user_login"]}
             for row in result.mappings().fetchall()
@@ -108,17 +113,15 @@ class CourseRepository:
         course: CourseCreate, session: AsyncSession
     ) -> None:
         """Create a new course."""
-        async with session:
-            await session.execute(
-                course_queries.CREATE_COURSE,
-                params={
-                    "name": course.name,
-                    "owner": course.owner,
-                    "status_id": STATUS_OF_ELEMENTS_SETTINGS.draft,
-                    "description": course.description or "",
-                },
-            )
-            await session.commit()
+        await session.execute(
+            course_queries.CREATE_COURSE,
+            params={
+                "name": course.name,
+                "owner": course.owner,
+                "status_id": STATUS_OF_ELEMENTS_SETTINGS.draft,
+                "description": course.description or "",
+            },
+        )
         logger.info("Course %s created by %s" % (course.name, course.owner))
 
     @staticmethod
@@ -126,10 +129,8 @@ class CourseRepository:
         course_id: str, user_login: str, session: AsyncSession
     ) -> None:
         """Add a user to a course."""
-        async with session:
-            await session.execute(
-                course_queries.ADD_USER_TO_COURSE,
-                params={"course_id": course_id, "user_login": user_login},
-            )
-            await session.commit()
+        await session.execute(
+            course_queries.ADD_USER_TO_COURSE,
+            params={"course_id": course_id, "user_login": user_login},
+        )
         logger.info("User %s added to course %s" % (user_login, course_id))
@@ -0,0 +1,83 @@
+# module for work with db in asyncio mod
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import repository.sql_queries.journal_queries as journal_queries
+from logger.logger_module import ModuleLoger
+from schemas.journal_schema import (
+    CourseJournal,
+    JournalAssignment,
+    JournalCell,
+    JournalRow,
+)
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+def build_journal(course_id: str, rows) -> CourseJournal:
+    """
+    Matrix users x assignments from rows of GET_COURSE_JOURNAL: ordered by
+    user, every user has a row per assignment of the course.
+    """
+    assignments: dict[str, JournalAssignment] = {}
+    cells_by_user: dict[str, dict[str, JournalCell]] = {}
+    for row in rows:
+        assignment_id = str(row["assignment_id"])
+        if assignment_id not in assignments:
+            assignments[assignment_id] = JournalAssignment(
+                assignment_id=assignment_id, name=row["assignment_name"]
+            )
+        if row["user_login"] is None:
+            continue
+        cell = (
+            JournalCell.model_validate(row)
+            if row["attempts"] is not None
+            else JournalCell()
+        )
+        cells_by_user.setdefault(row["user_login"], {})[assignment_id] = cell
+    return CourseJournal(
+        course_id=course_id,
+        assignments=list(assignments.values()),
+        rows=[
+            JournalRow(
+                user_login=user_login,
+                cells=[
+                    cells.get(assignment_id, JournalCell())
+                    for assignment_id in assignments
+                ],
+            )
+            for user_login, cells in cells_by_user.items()
+        ],
+    )
+
+
+class JournalRepo:
+
+    @staticmethod
+    async def get_course_journal(
+        course_id: str, session: AsyncSession
+    ) -> CourseJournal:
+        """Journal of every user of the course, one query."""
+        result = await session.execute(
+            journal_queries.GET_COURSE_JOURNAL,
+            params={"course_id": course_id},
+        )
+        return build_journal(course_id, result.mappings())
+
+    @staticmethod
+    async def get_user_journal(
+        course_id: str, user_login: str, session: AsyncSession
+    ) -> CourseJournal:
+        """Journal of the course with the row of one user."""
+        result = await session.execute(
+            journal_queries.GET_USER_JOURNAL,
+            params={"course_id": course_id, "user_login": user_login},
+        )
+        return build_journal(course_id, result.mappings())
+
+    @staticmethod
+    async def get_solved_entries(session: AsyncSession) -> list[dict]:
+        """Solved entries of all courses, see services/leaderboard.py."""
+        result = await session.execute(journal_queries.GET_SOLVED_ENTRIES)
+        return [dict(row) for row in result.mappings()]
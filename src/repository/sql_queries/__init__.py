@@ -0,0 +1,19 @@
+from types import ModuleType
+
+from sqlalchemy.sql.elements import TextClause
+
+
+def collect_statements(*modules: ModuleType) -> dict[str, TextClause]:
+    """
+    Collect text() statements declared on module level of query modules.
+
+    :param modules: modules from repository.sql_queries
+    :return: mapping "module.NAME" -> statement
+    """
+    statements = {}
+    for module in modules:
+        module_name = module.__name__.rsplit(".", 1)[-1]
+        for name, value in vars(module).items():
+            if isinstance(value, TextClause):
+                statements[f"{module_name}.{name}"] = value
+    return statements
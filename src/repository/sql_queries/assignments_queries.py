@@ -6,6 +6,7 @@ IS_ASSIGNMENT_EXISTS = text(
     select 1
     from assignment
     where assignment_id = :assignment_uuid
+    )
     """
 )
 
@@ -55,57 +56,126 @@ GET_FIELD_ELEMENTS = text(
         element_type_id,
         pos_x,
         pos_y
-    from element
-    left join assignment_element using(assignment_id)
+    from assignment_element
+    join element using(element_id)
     where assignment_id = :assignment_id 
     """
 )
 
-CREATE_ASSIGNMENT = text(
+# Assignment and its game field in one round trip. An unknown course is
+# rejected by the foreign key of assignment.course_id.
+CREATE_ASSIGNMENT_WITH_GAME_FIELD = text(
     """
-    insert into assignment( 
-     name,
-     course_id,
-     assignment_type_id,
-     status_id,
-     description
-    )
-    values (      
-        :name,      
-        :course_id, 
-        :assignment_type_id,
-        :status_id, 
-        :description
+    with new_assignment as (
+        insert into assignment(
+         name,
+         course_id,
+         assignment_type_id,
+         status_id,
+         description
+        )
+        values (
+            :name,
+            :course_id,
+            :assignment_type_id,
+            :status_id,
+            :description
+        )
+        returning assignment_id
     )
-    returning *
-    """
-)
-
-CREATE_GAME_ASSIGNMENT = text(
-    """
-    insert into game_field_assignment( 
+    insert into game_field_assignment(
     assignment_id,
     field_width,
     field_height,
     start_x,
     start_y,
     end_x,
-    end_y 
+    end_y,
+    field_blob
     )
-    values (      
-        :assignment_id,
+    select
+        assignment_id,
         :field_width,
         :field_height,
         :start_x,
         :start_y,
         :end_x,
-        :end_y
-    )
-    returning *
+        :end_y,
+        :field_blob
+    from new_assignment
+    returning assignment_id
     """
 )
 
 
+# Many assignments with their game fields, ids are generated by the caller.
+INSERT_ASSIGNMENTS_WITH_GAME_FIELDS = text(
+    """
+    with new_assignment as (
+        insert into assignment(
+         assignment_id,
+         name,
+         course_id,
+         assignment_type_id,
+         status_id,
+         description
+        )
+        select
+            assignment_id,
+            name,
+            :course_id,
+            :assignment_type_id,
+            :status_id,
+            description
+        from unnest(
+            cast(:assignment_ids as uuid[]),
+            cast(:names as text[]),
+            cast(:descriptions as text[])
+        ) as a(assignment_id, name, description)
+        returning assignment_id
+    )
+    insert into game_field_assignment(
+    assignment_id,
+    field_width,
+    field_height,
+    start_x,
+    start_y,
+    end_x,
+    end_y,
+    field_blob
+    )
+    select
+        f.assignment_id,
+        field_width,
+        field_height,
+        start_x,
+        start_y,
+        end_x,
+        end_y,
+        field_blob
+    from unnest(
+        cast(:assignment_ids as uuid[]),
+        cast(:field_widths as smallint[]),
+        cast(:field_heights as smallint[]),
+        cast(:start_xs as smallint[]),
+        cast(:start_ys as smallint[]),
+        cast(:end_xs as smallint[]),
+        cast(:end_ys as smallint[]),
+        cast(:field_blobs as bytea[])
+    ) as f(
+        assignment_id,
+        field_width,
+        field_height,
+        start_x,
+        start_y,
+        end_x,
+        end_y,
+        field_blob
+    )
+    join new_assignment using (assignment_id)
+    """
+)
+
 UPDATE_ASSIGNMENT = text(
     """
     update assignment
@@ -132,10 +202,12 @@ SAFE_DELETE_ASSIGNMENT = text(
     """
 )
 
+# Elements and actions are aggregated by separate correlated subqueries:
+# joining both to the assignment multiplies them (elements x actions rows).
 GET_TOTAL_INFO_ABOUT_ASSIGNMENT = text(
     """
     select
-      assignment_id,
+      a.assignment_id,
       assignment_type_id,
       course_id,
       a.name,
@@ -147,48 +219,221 @@ GET_TOTAL_INFO_ABOUT_ASSIGNMENT = text(
       end_x,
       end_y,
       status_id,
-      json_agg(
-        jsonb_build_array(
-          'action_id',
-          action_id,
-          'name',
-          act.name,
-          'x_changes',
-          x_value_changes,
-          'y_changes',
-          y_value_changes
-        )
+      coalesce(
+        (
+          select
+            json_agg(
+              json_build_object(
+                'action_id',
+                act.action_id,
+                'name',
+                act.name,
+                'x_changes',
+                x_value_changes,
+                'y_changes',
+                y_value_changes
+              )
+              order by act.action_id
+            )
+          from assignment_action aa
+          join action act using (action_id)
+          where aa.assignment_id = a.assignment_id
+        ),
+        '[]'
       ) as actions,
-      json_agg(
-        jsonb_build_object(
-          'element_id',
-          element_id,
-          'name',
-          el.name,
-          'element_type_id',
-          element_type_id,
-          'pos_x',
-          pos_x,
-          'pos_y',
-          pos_y
-        )
+      coalesce(
+        (
+          select
+            json_agg(
+              json_build_object(
+                'element_id',
+                ae.element_id,
+                'name',
+                el.name,
+                'element_type_id',
+                element_type_id,
+                'pos_x',
+                pos_x,
+                'pos_y',
+                pos_y
+              )
+              order by pos_y, pos_x
+            )
+          from assignment_element ae
+          join element as el using (element_id)
+          where ae.assignment_id = a.assignment_id
+        ),
+        '[]'
       ) as elements
     from assignment a
     left join game_field_assignment gfa using(assignment_id)
-    left join assignment_element using (assignment_id)
-    left join element as el using (element_id)
-    left join assignment_action using (assignment_id)
-    left join action act using (action_id)
-    where assignment_id = :assignment_id 
-    group by assignment_id, gfa.assignment_id;
+    where a.assignment_id = :assignment_id;
     """
 )
 
-INSERT_GAME_ELEMENT = text(
+# Everything the game engine needs for several assignments in one round trip.
+GET_GAME_FIELDS_DATA = text(
+    """
+    select
+      gfa.assignment_id,
+      field_width,
+      field_height,
+      start_x,
+      start_y,
+      end_x,
+      end_y,
+      coalesce(
+        (
+          select
+            json_agg(
+              json_build_object(
+                'action_id',
+                act.action_id,
+                'x_changes',
+                x_value_changes,
+                'y_changes',
+                y_value_changes
+              )
+            )
+          from assignment_action aa
+          join action act using (action_id)
+          where aa.assignment_id = gfa.assignment_id
+        ),
+        '[]'
+      ) as actions,
+      coalesce(
+        (
+          select
+            json_agg(
+              json_build_object(
+                'element_type_id',
+                element_type_id,
+                'pos_x',
+                pos_x,
+                'pos_y',
+                pos_y
+              )
+            )
+          from assignment_element ae
+          join element as el using (element_id)
+          where ae.assignment_id = gfa.assignment_id
+        ),
+        '[]'
+      ) as elements
+    from game_field_assignment gfa
+    where gfa.assignment_id = any(cast(:assignment_ids as uuid[]))
+    """
+)
+
+# Encoded fields (engine/field_codec.py), no joins needed.
+GET_FIELD_BLOBS = text(
+    """
+    select assignment_id, field_blob
+    from game_field_assignment
+    where assignment_id = any(cast(:assignment_ids as uuid[]))
+    """
+)
+
+UPDATE_FIELD_BLOBS = text(
+    """
+    update game_field_assignment gfa
+    set field_blob = new_blob.field_blob
+    from unnest(
+        cast(:assignment_ids as uuid[]),
+        cast(:field_blobs as bytea[])
+    ) as new_blob(assignment_id, field_blob)
+    where gfa.assignment_id = new_blob.assignment_id
+    """
+)
+
+# Fields with their occupied cells and placed elements, for checking new
+# elements in memory.
+GET_GAME_FIELDS_WITH_OCCUPIED_CELLS = text(
+    """
+    select
+        assignment_id,
+        field_width,
+        field_height,
+        start_x,
+        start_y,
+        end_x,
+        end_y,
+        array(
+            select pos_x
+            from assignment_element ae
+            where ae.assignment_id = gfa.assignment_id
+            order by pos_y, pos_x
+        ) as occupied_x,
+        array(
+            select pos_y
+            from assignment_element ae
+            where ae.assignment_id = gfa.assignment_id
+            order by pos_y, pos_x
+        ) as occupied_y,
+        array(
+            select element_id
+            from assignment_element ae
+            where ae.assignment_id = gfa.assignment_id
+        ) as placed_element_ids
+    from game_field_assignment gfa
+    where assignment_id = any(cast(:assignment_ids as uuid[]))
+    """
+)
+
+# All elements of a request in one multi-row insert.
+INSERT_GAME_ELEMENTS = text(
     """
     insert into assignment_element
     (element_id, assignment_id, pos_x, pos_y)
-    values
+    select element_id, assignment_id, pos_x, pos_y
+    from unnest(
+        cast(:element_ids as int[]),
+        cast(:assignment_ids as uuid[]),
+        cast(:pos_xs as smallint[]),
+        cast(:pos_ys as smallint[])
+    ) as new_element(element_id, assignment_id, pos_x, pos_y)
+    """
+)
+
+# Obstacles of generated or imported fields. An element can be placed once
+# per assignment (primary key element_id, assignment_id), so every obstacle
+# gets its own element row, a copy of the name and type of its template
+# row. Ids are taken from the sequence first: the placement needs them and
+# the order of returning rows of an insert isn't defined.
+PLACE_NEW_ELEMENTS = text(
+    """
+    with placed as materialized (
+        select
+            nextval(pg_get_serial_sequence('element', 'element_id'))
+                as element_id,
+            template_id,
+            assignment_id,
+            pos_x,
+            pos_y
+        from unnest(
+            cast(:template_ids as int[]),
+            cast(:assignment_ids as uuid[]),
+            cast(:pos_xs as smallint[]),
+            cast(:pos_ys as smallint[])
+        ) as p(template_id, assignment_id, pos_x, pos_y)
+    ),
+    new_element as (
+        insert into element (
+            element_id, name, element_type_id, created_at, updated_at
+        )
+        overriding system value
+        select
+            p.element_id,
+            e.name,
+            e.element_type_id,
+            timezone('utc', now()),
+            timezone('utc', now())
+        from placed p
+        join element e on e.element_id = p.template_id
+    )
+    insert into assignment_element (element_id, assignment_id, pos_x, pos_y)
+    select element_id, assignment_id, pos_x, pos_y
+    from placed
     """
 )
 
@@ -215,3 +460,57 @@ GET_ASSIGNMENT_ACTIONS = text(
     group by assignment_id;
     """
 )
+
+GET_ACTIONS_BY_IDS = text(
+    """
+    select action_id, x_value_changes, y_value_changes
+    from action
+    where action_id = any(cast(:action_ids as int[]))
+    """
+)
+
+# (assignment, action) pairs of many assignments in one insert.
+INSERT_ACTIONS_OF_ASSIGNMENTS = text(
+    """
+    insert into assignment_action (assignment_id, action_id)
+    select assignment_id, action_id
+    from unnest(
+        cast(:assignment_ids as uuid[]),
+        cast(:action_ids as int[])
+    ) as new_action(assignment_id, action_id)
+    on conflict do nothing
+    """
+)
+
+# Idempotent: actions that are already attached are skipped.
+ADD_ASSIGNMENT_ACTIONS = text(
+    """
+    insert into assignment_action (assignment_id, action_id)
+    select cast(:assignment_id as uuid), action_id
+    from unnest(cast(:action_ids as int[])) as new_action(action_id)
+    on conflict do nothing
+    returning action_id
+    """
+)
+
+# Replace the whole action set of an assignment with one diff statement.
+SET_ASSIGNMENT_ACTIONS = text(
+    """
+    with removed as (
+        delete from assignment_action
+        where assignment_id = cast(:assignment_id as uuid)
+        and action_id <> all(cast(:action_ids as int[]))
+        returning action_id
+    ),
+    added as (
+        insert into assignment_action (assignment_id, action_id)
+        select cast(:assignment_id as uuid), action_id
+        from unnest(cast(:action_ids as int[])) as new_action(action_id)
+        on conflict do nothing
+        returning action_id
+    )
+    select
+        array(select action_id from added order by action_id) as added,
+        array(select action_id from removed order by action_id) as removed
+    """
+)
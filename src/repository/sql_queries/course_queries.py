@@ -20,6 +20,18 @@ IS_COURSE_EXISTS = text(
     """
 )
 
+# Whether the user is on the course of the assignment.
+IS_USER_ON_ASSIGNMENT_COURSE = text(
+    """
+    select exists(
+        select 1
+        from assignment
+        join course_user using (course_id)
+        where assignment_id = :assignment_id and user_login = :user_login
+    )
+    """
+)
+
 GET_COURSE_BY_ID = text(
     """
     select
@@ -39,7 +51,7 @@ GET_USER_COURSES = text(
         course_id,
         name,
         owner,
-        status_id
+        status_id,
         coalesce(description, '')
     from course
     join course_user using(course_id)
@@ -0,0 +1,64 @@
+from sqlalchemy import text
+
+# Users of the course (course_user, as in GET_USERS_ON_COURSE) against its
+# assignments, with their journal entries where they exist. Assignments
+# come with a null user when nobody is on the course.
+GET_COURSE_JOURNAL = text(
+    """
+    select
+        a.assignment_id,
+        a.name as assignment_name,
+        cu.user_login,
+        j.attempts,
+        j.solved,
+        j.best_steps,
+        j.last_outcome,
+        j.last_attempt_at
+    from assignment a
+    left join course_user cu on cu.course_id = a.course_id
+    left join journal j
+        on j.course_id = a.course_id
+        and j.user_login = cu.user_login
+        and j.assignment_id = a.assignment_id
+    where a.course_id = :course_id
+    order by cu.user_login nulls first, a.name, a.assignment_id
+    """
+)
+
+GET_USER_JOURNAL = text(
+    """
+    select
+        a.assignment_id,
+        a.name as assignment_name,
+        cast(:user_login as varchar) as user_login,
+        j.attempts,
+        j.solved,
+        j.best_steps,
+        j.last_outcome,
+        j.last_attempt_at
+    from assignment a
+    left join journal j
+        on j.course_id = a.course_id
+        and j.user_login = :user_login
+        and j.assignment_id = a.assignment_id
+    where a.course_id = :course_id
+    order by a.name, a.assignment_id
+    """
+)
+
+# solved entries of all courses, the leaderboards are built from them;
+# users who left a course aren't placed on its board
+GET_SOLVED_ENTRIES = text(
+    """
+    select
+        course_id,
+        user_login,
+        assignment_id,
+        solved,
+        best_steps,
+        best_at
+    from journal
+    join course_user using (course_id, user_login)
+    where solved
+    """
+)
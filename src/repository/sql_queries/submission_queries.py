@@ -0,0 +1,298 @@
+from sqlalchemy import text
+
+# Rows of assignments or users deleted while the rows waited in the buffer
+# are skipped, so they can't fail the batch; on conflict makes a retried batch
+# harmless. Journal entries are updated from the rows actually inserted, in
+# the same statement. Returns the number of inserted rows with the new state
+# of every touched journal entry (one row with nulls when there is none).
+INSERT_SUBMISSIONS = text(
+    """
+    with inserted as (
+        insert into submission(
+            submission_id,
+            user_login,
+            assignment_id,
+            program,
+            outcome,
+            x,
+            y,
+            steps,
+            created_at
+        )
+        select
+            s.submission_id,
+            s.user_login,
+            s.assignment_id,
+            cast(s.program as jsonb),
+            s.outcome,
+            s.x,
+            s.y,
+            s.steps,
+            s.created_at
+        from unnest(
+            cast(:submission_ids as uuid[]),
+            cast(:user_logins as varchar[]),
+            cast(:assignment_ids as uuid[]),
+            cast(:programs as text[]),
+            cast(:outcomes as varchar[]),
+            cast(:xs as smallint[]),
+            cast(:ys as smallint[]),
+            cast(:steps as integer[]),
+            cast(:created_ats as timestamptz[])
+        ) as s(
+            submission_id,
+            user_login,
+            assignment_id,
+            program,
+            outcome,
+            x,
+            y,
+            steps,
+            created_at
+        )
+        where exists (
+            select 1
+            from game_field_assignment gfa
+            where gfa.assignment_id = s.assignment_id
+        )
+        and exists (
+            select 1
+            from "user" u
+            where u.user_login = s.user_login
+        )
+        on conflict (submission_id) do nothing
+        returning user_login, assignment_id, outcome, steps, created_at
+    ),
+    batch as (
+        select
+            user_login,
+            assignment_id,
+            count(*) as attempts,
+            bool_or(outcome = :solved_outcome) as solved,
+            min(steps) filter (where outcome = :solved_outcome) as best_steps,
+            (
+                array_agg(created_at order by steps, created_at)
+                filter (where outcome = :solved_outcome)
+            )[1] as best_at,
+            (array_agg(outcome order by created_at desc))[1] as last_outcome,
+            max(created_at) as last_attempt_at
+        from inserted
+        group by user_login, assignment_id
+    ),
+    journal_upsert as (
+        insert into journal(
+            course_id,
+            user_login,
+            assignment_id,
+            attempts,
+            solved,
+            best_steps,
+            best_at,
+            last_outcome,
+            last_attempt_at
+        )
+        select
+            a.course_id,
+            b.user_login,
+            b.assignment_id,
+            b.attempts,
+            b.solved,
+            b.best_steps,
+            b.best_at,
+            b.last_outcome,
+            b.last_attempt_at
+        from batch b
+        join assignment a using(assignment_id)
+        on conflict (course_id, user_login, assignment_id) do update set
+            attempts = journal.attempts + excluded.attempts,
+            solved = journal.solved or excluded.solved,
+            best_steps = least(journal.best_steps, excluded.best_steps),
+            best_at = case
+                when journal.best_steps is null
+                    or excluded.best_steps < journal.best_steps
+                then excluded.best_at
+                else journal.best_at
+            end,
+            last_outcome = case
+                when excluded.last_attempt_at >= journal.last_attempt_at
+                then excluded.last_outcome
+                else journal.last_outcome
+            end,
+            last_attempt_at = greatest(
+                journal.last_attempt_at, excluded.last_attempt_at
+            )
+        returning
+            course_id,
+            user_login,
+            assignment_id,
+            attempts,
+            solved,
+            best_steps,
+            best_at,
+            last_outcome,
+            last_attempt_at
+    )
+    select
+        c.inserted,
+        j.course_id,
+        j.user_login,
+        j.assignment_id,
+        j.attempts,
+        j.solved,
+        j.best_steps,
+        j.best_at,
+        j.last_outcome,
+        j.last_attempt_at
+    from (select count(*) as inserted from inserted) c
+    left join journal_upsert j on true
+    """
+)
+
+GET_SUBMISSION = text(
+    """
+    select
+        submission_id,
+        user_login,
+        assignment_id,
+        program,
+        outcome,
+        x,
+        y,
+        steps,
+        created_at
+    from submission
+    where submission_id = :submission_id
+    """
+)
+
+# keyset pagination: rows after (assignment_id, created_at, submission_id)
+# of the last row of the previous page, read from
+# ix_submission_user_assignment_created
+GET_USER_SUBMISSIONS = text(
+    """
+    select
+        submission_id,
+        user_login,
+        assignment_id,
+        program,
+        outcome,
+        x,
+        y,
+        steps,
+        created_at
+    from submission
+    where user_login = :user_login
+        and (assignment_id, created_at, submission_id) > (
+            cast(:after_assignment_id as uuid),
+            cast(:after_created_at as timestamptz),
+            cast(:after_submission_id as uuid)
+        )
+    order by assignment_id, created_at, submission_id
+    limit :limit
+    """
+)
+
+GET_USER_ASSIGNMENT_SUBMISSIONS = text(
+    """
+    select
+        submission_id,
+        user_login,
+        assignment_id,
+        program,
+        outcome,
+        x,
+        y,
+        steps,
+        created_at
+    from submission
+    where user_login = :user_login
+        and assignment_id = :assignment_id
+        and (created_at, submission_id) > (
+            cast(:after_created_at as timestamptz),
+            cast(:after_submission_id as uuid)
+        )
+    order by created_at, submission_id
+    limit :limit
+    """
+)
+
+DELETE_SUBMISSION = text(
+    """
+    delete from submission
+    where submission_id = :submission_id
+    returning submission_id, user_login, assignment_id
+    """
+)
+
+# journal entry of the user and the assignment counted again from the
+# submissions, after some of them were deleted; dropped when none is left.
+# Returns the new state of the entry as INSERT_SUBMISSIONS does.
+RECOUNT_JOURNAL_ENTRY = text(
+    """
+    with entry as (
+        select course_id
+        from assignment
+        where assignment_id = :assignment_id
+    ),
+    recount as (
+        select
+            count(*) as attempts,
+            coalesce(bool_or(outcome = :solved_outcome), false) as solved,
+            min(steps) filter (where outcome = :solved_outcome) as best_steps,
+            (
+                array_agg(created_at order by steps, created_at)
+                filter (where outcome = :solved_outcome)
+            )[1] as best_at,
+            (array_agg(outcome order by created_at desc))[1] as last_outcome,
+            max(created_at) as last_attempt_at
+        from submission
+        where user_login = :user_login
+            and assignment_id = :assignment_id
+    ),
+    updated as (
+        update journal j
+        set
+            attempts = r.attempts,
+            solved = r.solved,
+            best_steps = r.best_steps,
+            best_at = r.best_at,
+            last_outcome = r.last_outcome,
+            last_attempt_at = r.last_attempt_at
+        from recount r
+        where j.course_id = (select course_id from entry)
+            and j.user_login = :user_login
+            and j.assignment_id = :assignment_id
+            and r.attempts > 0
+        returning
+            j.course_id,
+            j.user_login,
+            j.assignment_id,
+            j.attempts,
+            j.solved,
+            j.best_steps,
+            j.best_at,
+            j.last_outcome,
+            j.last_attempt_at
+    ),
+    deleted as (
+        delete from journal
+        where course_id = (select course_id from entry)
+            and user_login = :user_login
+            and assignment_id = :assignment_id
+            and (select attempts from recount) = 0
+        returning
+            course_id,
+            user_login,
+            assignment_id,
+            0 as attempts,
+            false as solved,
+            cast(null as integer) as best_steps,
+            cast(null as timestamptz) as best_at,
+            cast(null as varchar) as last_outcome,
+            cast(null as timestamptz) as last_attempt_at
+    )
+    select * from updated
+    union all
+    select * from deleted
+    """
+)
@@ -29,12 +29,21 @@ GET_USER_CREDENTIALS = text(
     """
     select
         user_login,
-        password
+        password,
+        role_id
     from "user"
     where user_login=:user_login
     """
 )
 
+UPDATE_USER_PASSWORD = text(
+    """
+    update "user"
+    set password=:password
+    where user_login=:user_login
+    """
+)
+
 GET_BASE_USER_INFO_BY_LOGIN = text(
     """
     select
@@ -0,0 +1,131 @@
+# module for work with db in asyncio mod
+import json
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import repository.sql_queries.submission_queries as submission_queries
+from engine.simulator import Outcome
+from logger.logger_module import ModuleLoger
+from schemas.submission_schema import SubmissionDelete, SubmissionGet
+
+logger = ModuleLoger(Path(__file__).stem)
+
+# lower bound of the keyset for the first page
+FIRST_PAGE = (
+    "00000000-0000-0000-0000-000000000000",
+    datetime.fromisoformat("0001-01-01T00:00:00+00:00"),
+    "00000000-0000-0000-0000-000000000000",
+)
+
+
+class SubmissionRepo:
+
+    @staticmethod
+    async def insert_submissions(
+        rows: list[dict], session: AsyncSession
+    ) -> tuple[int, list[dict]]:
+        """
+        Insert submissions and update their journal entries with one
+        statement. Rows of deleted assignments or users and rows that are
+        already in the table are skipped.
+
+        :param rows: dicts with the columns of the submission table,
+            program as a JSON-able value
+        :return: number of inserted rows and the new state of the updated
+            journal entries: rows of the journal table
+        """
+        result = await session.execute(
+            submission_queries.INSERT_SUBMISSIONS,
+            params={
+                "submission_ids": [row["submission_id"] for row in rows],
+                "user_logins": [row["user_login"] for row in rows],
+                "assignment_ids": [row["assignment_id"] for row in rows],
+                "programs": [json.dumps(row["program"]) for row in rows],
+                "outcomes": [row["outcome"] for row in rows],
+                "xs": [row["x"] for row in rows],
+                "ys": [row["y"] for row in rows],
+                "steps": [row["steps"] for row in rows],
+                "created_ats": [row["created_at"] for row in rows],
+                "solved_outcome": Outcome.REACHED_GOAL.value,
+            },
+        )
+        result_rows = result.mappings().all()
+        return result_rows[0]["inserted"], [
+            dict(row) for row in result_rows if row["course_id"] is not None
+        ]
+
+    @staticmethod
+    async def get_submission(
+        submission_id: str, session: AsyncSession
+    ) -> SubmissionGet | None:
+        result = await session.execute(
+            submission_queries.GET_SUBMISSION,
+            params={"submission_id": submission_id},
+        )
+        row = result.mappings().first()
+        return SubmissionGet.model_validate(row) if row else None
+
+    @staticmethod
+    async def get_user_submissions(
+        user_login: str,
+        assignment_id: str | None,
+        after: tuple[str, datetime, str] | None,
+        limit: int,
+        session: AsyncSession,
+    ) -> list[SubmissionGet]:
+        """
+        Submissions of the user in (assignment_id, created_at,
+        submission_id) order, starting after the given key.
+
+        :param assignment_id: only submissions of this assignment
+        :param after: key of the last row of the previous page, None for
+            the first page
+        """
+        after_assignment_id, after_created_at, after_submission_id = (
+            after or FIRST_PAGE
+        )
+        params = {
+            "user_login": user_login,
+            "after_created_at": after_created_at,
+            "after_submission_id": after_submission_id,
+            "limit": limit,
+        }
+        if assignment_id is None:
+            statement = submission_queries.GET_USER_SUBMISSIONS
+            params["after_assignment_id"] = after_assignment_id
+        else:
+            statement = submission_queries.GET_USER_ASSIGNMENT_SUBMISSIONS
+            params["assignment_id"] = assignment_id
+        result = await session.execute(statement, params=params)
+        return [SubmissionGet.model_validate(row) for row in result.mappings()]
+
+    @staticmethod
+    async def delete_submission(
+        submission_id: str, session: AsyncSession
+    ) -> tuple[SubmissionDelete | None, list[dict]]:
+        """
+        Delete the submission and count its journal entry again.
+
+        :return: the deleted submission, None if there is no such one, and
+            the new state of the journal entry as insert_submissions does
+        """
+        result = await session.execute(
+            submission_queries.DELETE_SUBMISSION,
+            params={"submission_id": submission_id},
+        )
+        row = result.mappings().first()
+        if row is None:
+            return None, []
+        recount = await session.execute(
+            submission_queries.RECOUNT_JOURNAL_ENTRY,
+            params={
+                "user_login": row["user_login"],
+                "assignment_id": row["assignment_id"],
+                "solved_outcome": Outcome.REACHED_GOAL.value,
+            },
+        )
+        return SubmissionDelete.model_validate(row), [
+            dict(entry) for entry in recount.mappings()
+        ]
@@ -26,6 +26,7 @@ from repository.sql_queries.user_queries import (
     GET_USER_BY_EMAIL,
     GET_USER_BY_PHONE,
     GET_USER_CREDENTIALS,
+    UPDATE_USER_PASSWORD,
     INSERT_USER,
     INSERT_MD_USER,
 )
@@ -58,31 +59,30 @@ class UserRepository:
             )
 
         try:
-            async with session:
-                if login:
-                    result = await session.execute(
-                        GET_USER_BY_LOGIN, {"user_login": login}
-                    )
-                elif email:
-                    result = await session.execute(
-                        GET_USER_BY_EMAIL, {"user_email": email}
-                    )
-                else:
-                    result = await session.execute(
-                        GET_USER_BY_PHONE, {"user_phone": phone}
-                    )
-
-                if result.mappings().fetchone():
-                    logger.info(
-                        "User found by %s (%s)"
-                        % ([login, email, phone], result.mappings().fetchone())
-                    )
-                    return True
-                else:
-                    logger.info(
-                        "User not found (%s)" % result.mappings().fetchone()
-                    )
-                    return False
+            if login:
+                result = await session.execute(
+                    GET_USER_BY_LOGIN, {"user_login": login}
+                )
+            elif email:
+                result = await session.execute(
+                    GET_USER_BY_EMAIL, {"user_email": email}
+                )
+            else:
+                result = await session.execute(
+                    GET_USER_BY_PHONE, {"user_phone": phone}
+                )
+
+            if result.mappings().fetchone():
+                logger.info(
+                    "User found by %s (%s)"
+                    % ([login, email, phone], result.mappings().fetchone())
+                )
+                return True
+            else:
+                logger.info(
+                    "User not found (%s)" % result.mappings().fetchone()
+                )
+                return False
 
         except SQLAlchemyError as e:
             logger.error("SQLAlchemyError: %s" % e)
@@ -93,14 +93,13 @@ class UserRepository:
         session: AsyncSession, user_login: str
     ) -> UserBase | None:
         try:
-            async with session:
-                result = await session.execute(
-                    GET_BASE_USER_INFO_BY_LOGIN, {"user_login": user_login}
-                )
-                user = result.mappings()
-                if user:
-                    return user
-                return None
+            result = await session.execute(
+                GET_BASE_USER_INFO_BY_LOGIN, {"user_login": user_login}
+            )
+            user = result.mappings()
+            if user:
+                return user
+            return None
 
         except SQLAlchemyError as e:
             logger.error("SQLAlchemyError: %s" % e)
@@ -120,15 +119,14 @@ class UserRepository:
         else:
             select_query = SELECT_ALL_USERS_INFO
         try:
-            async with session:
-                result = await session.execute(select_query)
-                logger.info(type(result))
-                users = [UserWithMD(**row) for row in result.mappings()]
-                logger.debug("Get list of users: %s" % users)
-
-                if users:
-                    return users
-                return None
+            result = await session.execute(select_query)
+            logger.info(type(result))
+            users = [UserWithMD(**row) for row in result.mappings()]
+            logger.debug("Get list of users: %s" % users)
+
+            if users:
+                return users
+            return None
         except SQLAlchemyError as e:
             logger.error("SQLAlchemyError: %s" % e)
             raise HTTPException(status_code=500, detail="Database error")
@@ -139,13 +137,12 @@ class UserRepository:
         user_login: str,
     ) -> UserWithMD | None:
         """Get user by login"""
-        async with session:
-            result = await session.execute(
-                GET_USER_BY_LOGIN, {"user_login": user_login}
-            )
-            result = result.mappings().fetchone()
-            user_md = UserWithMD(**result) if result else None
-            return user_md
+        result = await session.execute(
+            GET_USER_BY_LOGIN, {"user_login": user_login}
+        )
+        result = result.mappings().fetchone()
+        user_md = UserWithMD(**result) if result else None
+        return user_md
 
     @staticmethod
     async def get_user_by_email(
@@ -154,13 +151,12 @@ class UserRepository:
     ) -> UserWithMD | None:
         """Get user by login"""
         try:
-            async with session:
-                result = await session.execute(
-                    GET_USER_BY_EMAIL, {"user_email": user_email}
-                )
-                result = result.mappings().fetchone()
-                user_md = UserWithMD(**result) if result else None
-                return user_md
+            result = await session.execute(
+                GET_USER_BY_EMAIL, {"user_email": user_email}
+            )
+            result = result.mappings().fetchone()
+            user_md = UserWithMD(**result) if result else None
+            return user_md
         except SQLAlchemyError as e:
             # TODO: log exception
             raise HTTPException(status_code=500, detail="Database error")
@@ -172,13 +168,12 @@ class UserRepository:
     ) -> UserWithMD | None:
         """Get user by login"""
         try:
-            async with session:
-                result = await session.execute(
-                    GET_USER_BY_PHONE, {"user_phone": user_phone}
-                )
-                result = result.mappings().fetchone()
-                user_md = UserWithMD(**result) if result else None
-                return user_md
+            result = await session.execute(
+                GET_USER_BY_PHONE, {"user_phone": user_phone}
+            )
+            result = result.mappings().fetchone()
+            user_md = UserWithMD(**result) if result else None
+            return user_md
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail="Database error")
 
@@ -188,44 +183,41 @@ class UserRepository:
     ) -> UserWithMD | None:
         """Add user to database (in tables user and md_user)"""
         try:
-            async with session:
-                await session.execute(
-                    INSERT_USER,
-                    {
-                        "user_login": user_in.user_login,
-                        "email": user_in.email,
-                        "phone": user_in.phone,
-                        "password": user_in.password,
-                        "role_id": user_in.role_id,
-                    },
-                )
-                await session.execute(
-                    INSERT_MD_USER,
-                    {
-                        "user_login": user_in.user_login,
-                        "first_name": user_in.first_name,
-                        "second_name": user_in.second_name,
-                        "patronymic": user_in.patronymic,
-                        "additional_info": user_in.additional_info,
-                    },
-                )
-                user_md = UserWithMD(
-                    user_login=user_in.user_login,
-                    first_name=user_in.first_name,
-                    second_name=user_in.second_name,
-                    patronymic=user_in.patronymic,
-                    additional_info=user_in.additional_info,
-                    role_id=user_in.role_id,
-                    email=user_in.email,
-                    phone=user_in.phone,
-                    registration_date=datetime.now(),
-                )
-                await session.commit()
-                return user_md
+            await session.execute(
+                INSERT_USER,
+                {
+                    "user_login": user_in.user_login,
+                    "email": user_in.email,
+                    "phone": user_in.phone,
+                    "password": user_in.password,
+                    "role_id": user_in.role_id,
+                },
+            )
+            await session.execute(
+                INSERT_MD_USER,
+                {
+                    "user_login": user_in.user_login,
+                    "first_name": user_in.first_name,
+                    "second_name": user_in.second_name,
+                    "patronymic": user_in.patronymic,
+                    "additional_info": user_in.additional_info,
+                },
+            )
+            user_md = UserWithMD(
+                user_login=user_in.user_login,
+                first_name=user_in.first_name,
+                second_name=user_in.second_name,
+                patronymic=user_in.patronymic,
+                additional_info=user_in.additional_info,
+                role_id=user_in.role_id,
+                email=user_in.email,
+                phone=user_in.phone,
+                registration_date=datetime.now(),
+            )
+            return user_md
 
         except SQLAlchemyError as e:
             logger.error(e)
-            await session.rollback()
             raise HTTPException(status_code=500, detail="Database error")
 
     @staticmethod
@@ -233,12 +225,25 @@ class UserRepository:
         session: AsyncSession, user_login: str
     ) -> UserCreate | None:
         try:
-            async with session:
-                result = await session.execute(
-                    GET_USER_CREDENTIALS, {"user_login": user_login}
-                )
-                credentials = result.mappings().fetchone()
-                return credentials if credentials else None
+            result = await session.execute(
+                GET_USER_CREDENTIALS, {"user_login": user_login}
+            )
+            credentials = result.mappings().fetchone()
+            return credentials if credentials else None
+        except SQLAlchemyError as e:
+            logger.error(e)
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def update_password(
+        session: AsyncSession, user_login: str, password: str
+    ) -> None:
+        """Store a new password hash of the user."""
+        try:
+            await session.execute(
+                UPDATE_USER_PASSWORD,
+                {"user_login": user_login, "password": password},
+            )
         except SQLAlchemyError as e:
             logger.error(e)
             raise HTTPException(status_code=500, detail="Database error")
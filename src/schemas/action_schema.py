@@ -15,3 +15,9 @@ class ActionGet(BaseModel):
     action_name: str
     x_value_changed: int
     y_value_changed: int
+
+
+class AssignmentActionsChange(BaseModel):
+    assignment_id: str
+    added: list[int]
+    removed: list[int] = []
@@ -1,10 +1,14 @@
 from typing import Any, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 #
 # configuration objects
-from core.config import STATUS_OF_ELEMENTS_SETTINGS
+from core.config import (
+    GAME_SETTINGS,
+    STATUS_OF_ELEMENTS_SETTINGS,
+    VALIDATION_SETTINGS,
+)
 
 
 class AssignmentBase(BaseModel):
@@ -35,3 +39,48 @@ class AssignmentUpdate(AssignmentGet): ...
 class AssignmentDelete(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     assignment_id: Any | str
+
+
+class AssignmentsGeneration(BaseModel):
+    """Request for generated levels, see engine.generator."""
+
+    count: int = Field(ge=1, le=GAME_SETTINGS.generator_max_levels)
+    field_width: int = Field(
+        ge=VALIDATION_SETTINGS.min_width, le=VALIDATION_SETTINGS.max_width
+    )
+    field_height: int = Field(
+        ge=VALIDATION_SETTINGS.min_height, le=VALIDATION_SETTINGS.max_height
+    )
+    # actions attached to every level
+    action_ids: list[int] = Field(min_length=1)
+    # difficulty: length of the optimal program and obstacles
+    min_steps: int = Field(default=1, ge=1)
+    max_steps: int = Field(default=1000, ge=1)
+    obstacle_density: float = Field(default=0.2, ge=0, le=0.8)
+    pit_share: float = Field(default=0.5, ge=0, le=1)
+
+    name_prefix: str = "Level"
+    description: str | None = None
+    status_id: int = STATUS_OF_ELEMENTS_SETTINGS.draft
+    # same seed and settings give the same levels
+    seed: int | None = None
+
+    @model_validator(mode="after")
+    def check_steps(self):
+        if self.min_steps > self.max_steps:
+            raise ValueError("min_steps can't be larger than max_steps.")
+        return self
+
+
+class GeneratedAssignmentGet(BaseModel):
+    assignment_id: Any | str
+    name: str
+    optimal_steps: int
+
+
+class GeneratedAssignments(BaseModel):
+    course_id: Any | str
+    requested: int
+    assignments: list[GeneratedAssignmentGet]
+    # levels dropped as rotations or reflections of other levels
+    duplicates: int
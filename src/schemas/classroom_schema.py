@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ClassroomUpdate(BaseModel):
+    """New state of the journal entry of a student, see journal_schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+    user_login: str
+    assignment_id: Any | str
+    # 0 when the submissions of the entry were deleted
+    attempts: int
+    solved: bool
+    best_steps: int | None = None
+    # when best_steps was reached, for the leaderboards
+    best_at: datetime | None = None
+    last_outcome: str | None = None
+    last_attempt_at: datetime | None = None
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+
+from schemas.program_schema import ActionList, StructuredProgram
+
+
+class SubmissionGrade(BaseModel):
+    assignment_id: str
+    # action ids in execution order or a program with repeats and procedures
+    program: ActionList | StructuredProgram
+
+    def engine_program(self) -> list[int] | dict:
+        if isinstance(self.program, StructuredProgram):
+            return self.program.to_engine()
+        return self.program
+
+
+class GradeResult(BaseModel):
+    # position of the submission in the batch, results come out of order
+    index: int
+    assignment_id: str
+    outcome: str | None = None
+    x: int | None = None
+    y: int | None = None
+    steps: int | None = None
+    # length of the shortest solution, None when the goal is unreachable
+    optimal_steps: int | None = None
+    error: str | None = None
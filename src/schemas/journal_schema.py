@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JournalAssignment(BaseModel):
+    assignment_id: Any | str
+    name: str
+
+
+class JournalCell(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    attempts: int = 0
+    solved: bool = False
+    # fewest steps of a solution, None until solved
+    best_steps: int | None = None
+    last_outcome: str | None = None
+    last_attempt_at: datetime | None = None
+
+
+class JournalRow(BaseModel):
+    user_login: str
+    # in the order of CourseJournal.assignments
+    cells: list[JournalCell]
+
+
+class CourseJournal(BaseModel):
+    course_id: Any | str
+    assignments: list[JournalAssignment]
+    rows: list[JournalRow]
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class LeaderboardPlace(BaseModel):
+    place: int
+    user_login: str
+    solved: int
+    # sum of the fewest steps of the solved assignments
+    total_steps: int
+    # when the user reached this score
+    reached_at: datetime
+
+
+class Leaderboard(BaseModel):
+    course_id: Any | str
+    # digest of the board, the same in every worker, also sent as ETag
+    version: str
+    places: list[LeaderboardPlace]
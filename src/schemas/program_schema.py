@@ -0,0 +1,50 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field, model_validator
+
+from core.config import PROGRAM_SETTINGS
+
+# action ids go to bytecode as signed 32-bit ints, see engine/program.py
+ActionId = Annotated[int, Field(ge=0, le=2**31 - 1)]
+
+# plain program: action ids in execution order
+ActionList = Annotated[
+    list[ActionId], Field(max_length=PROGRAM_SETTINGS.max_length)
+]
+
+
+class ProgramBlock(BaseModel):
+    """
+    One of: an action, a repeat of the body or a call of a procedure.
+    """
+
+    action: ActionId | None = None
+    repeat: int | None = Field(
+        default=None, ge=0, le=PROGRAM_SETTINGS.max_repeat
+    )
+    body: list["ProgramBlock"] | None = None
+    call: str | None = None
+
+    @model_validator(mode="after")
+    def check_kind(self) -> "ProgramBlock":
+        kinds = [
+            kind
+            for kind in (self.action, self.repeat, self.call)
+            if kind is not None
+        ]
+        if len(kinds) != 1:
+            raise ValueError(
+                "Block must have exactly one of action, repeat and call."
+            )
+        if (self.body is not None) != (self.repeat is not None):
+            raise ValueError("Body goes with repeat only.")
+        return self
+
+
+class StructuredProgram(BaseModel):
+    main: list[ProgramBlock]
+    procedures: dict[str, list[ProgramBlock]] = {}
+
+    def to_engine(self) -> dict:
+        """Plain form for engine/program.py."""
+        return self.model_dump(exclude_none=True)
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, ConfigDict
+
+from schemas.program_schema import ActionList, StructuredProgram
+
+
+class ProgramRun(BaseModel):
+    # action ids in execution order or a program with repeats and procedures
+    program: ActionList | StructuredProgram
+    with_trace: bool = True
+
+
+class SimulationResultGet(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    outcome: str
+    x: int
+    y: int
+    steps: int
+    trace: list[tuple[int, int]] | None = None
+
+
+class SolutionGet(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    reachable: bool
+    optimal_steps: int | None = None
+    program: list[int] | None = None
+
+
+class HintGet(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    # steps left to the goal, None when it can't be reached from the cell
+    distance: int | None = None
+    action_id: int | None = None
+    next_x: int | None = None
+    next_y: int | None = None
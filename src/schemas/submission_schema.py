@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+from schemas.grading_schema import SubmissionGrade
+
+
+class SubmissionCreate(SubmissionGrade): ...
+
+
+class SubmissionGet(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    submission_id: Any | str
+    user_login: str
+    assignment_id: Any | str
+    program: list[int] | dict
+    outcome: str
+    x: int
+    y: int
+    steps: int
+    created_at: datetime
+
+
+class SubmissionPage(BaseModel):
+    items: list[SubmissionGet]
+    # pass as cursor to get the next page, None on the last page
+    next_cursor: str | None = None
+
+
+class SubmissionDelete(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    submission_id: Any | str
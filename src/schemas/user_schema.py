@@ -32,4 +32,3 @@ class UserCreate(UserWithMD):
 class UserLogin(BaseModel):
     user_login: str
     password: str
-    role_id: int = ROLE_SETTING.user_role_id
@@ -4,25 +4,39 @@ from exceptions.AssignmentException import (
     AssignmentNotFoundException,
     AssignmentException,
     AssignmentGameFieldException,
+    AssignmentElementFieldError,
+    AssignmentPositionError,
+    AssignmentActionError,
+    AssignmentGenerationError,
+    AssignmentProgramError,
+    AssignmentFieldEncodingError,
 )
 from exceptions.CourseException import CourseNotFoundException
 
 from exceptions.ValidationException import UUIDValidationException
 from repository.assignment_repo import AssignmentRepo
+from repository.course_repo import CourseRepository
 from asyncpg.exceptions import ForeignKeyViolationError, DataError
 from sqlalchemy.exc import IntegrityError, DatabaseError
 
 from schemas.assignment_schema import (
+    AssignmentsGeneration,
+    GeneratedAssignments,
     AssignmentGet,
     AssignmentCreate,
     AssignmentDelete,
     AssignmentUpdate,
 )
 from schemas.game_element_schema import GameElementGet, GameElementCreate
-from services.course_services import CourseServices
+from schemas.action_schema import AssignmentActionsChange
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event
 from fastapi import HTTPException
 from typing import List
+from collections import defaultdict
+from random import randrange
+from uuid import UUID
+import asyncio
 
 # lib for working with paths
 from pathlib import Path
@@ -32,13 +46,144 @@ from logger.logger_module import ModuleLoger
 from utils.assignment_utils.assignment_validator import (
     validate_game_field,
     position_validator,
+    elements_placement_validator,
 )
 
-from utils.uuid_checker import validate_uuid
+from utils.uuid_checker import normalize_uuid, validate_uuid
+from core.config import GAME_SETTINGS, PROGRAM_SETTINGS
+from services.process_pool import get_executor
+from services.classroom_hub import CLASSROOM_HUB
+
+# game engine
+from engine.game_field import GameField
+from engine.field_codec import FieldCodecError, decode_field, encode_field
+from engine.cache import GRADE_CACHE
+from engine.simulator import SimulationResult
+from engine.program import Bytecode, ProgramCompileError, compile_program
+from engine.interpreter import execute
+from engine.solver import Solution, get_solution
+from engine.generator import Level, LevelSpec, generate_batch
+from engine.distance_map import (
+    Hint,
+    get_distance_map,
+    invalidate_assignment,
+    put_distance_map,
+)
 
 logger = ModuleLoger(Path(__file__).stem)
 
 
+# foreign key of assignment.course_id, as Postgres names it
+ASSIGNMENT_COURSE_FOREIGN_KEY = "assignment_course_id_fkey"
+
+
+def violated_foreign_key(error: IntegrityError) -> str | None:
+    """Name of the foreign key the error is about, None for other errors."""
+    # sqlalchemy wraps the asyncpg exception, the original one is the cause
+    cause = error.orig.__cause__
+    if isinstance(cause, ForeignKeyViolationError):
+        return cause.constraint_name
+    return None
+
+
+async def generate_levels(
+    spec: LevelSpec, count: int, seed: int
+) -> tuple[list[Level], int]:
+    """
+    Generate up to count distinct levels on the process pool.
+
+    The attempt budget is split into tasks that all start at once; their
+    results are taken in submission order, which keeps the output the same
+    for the same seed, and the rest is cancelled once there are enough.
+    :return: levels, easiest first, and the number of dropped duplicates
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    budget = count * GAME_SETTINGS.generator_attempts_per_level
+    task_attempts = GAME_SETTINGS.generator_task_attempts
+    futures = [
+        loop.run_in_executor(
+            executor,
+            generate_batch,
+            spec,
+            min(task_attempts, budget - start),
+            seed + number,
+        )
+        for number, start in enumerate(range(0, budget, task_attempts))
+    ]
+
+    levels = {}
+    duplicates = 0
+    try:
+        for future in futures:
+            for level in await future:
+                if level.canonical_hash in levels:
+                    duplicates += 1
+                else:
+                    levels[level.canonical_hash] = level
+            if len(levels) >= count:
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+
+    selected = list(levels.values())[:count]
+    selected.sort(key=lambda level: level.optimal_steps)
+    return selected, duplicates
+
+
+async def on_fields_changed(session: AsyncSession, assignment_ids) -> None:
+    """
+    Call after any write to game fields, elements or actions: encodes the
+    fields again into field_blob in the same transaction and drops them from
+    the caches. A field the format can't hold (more than 255 actions, moves
+    outside -128..127) gets a null blob and is read from its rows.
+    """
+    assignment_ids = [str(assignment_id) for assignment_id in assignment_ids]
+    fields_data = await AssignmentRepo.get_fields_data(
+        assignment_ids=assignment_ids, session=session
+    )
+    field_blobs = {}
+    for assignment_id, data in fields_data.items():
+        try:
+            field_blobs[assignment_id] = encode_field(
+                GameField.from_field_data(data)
+            )
+        except FieldCodecError as e:
+            logger.warning(f"Field of {assignment_id} isn't encoded: {e}")
+            field_blobs[assignment_id] = None
+    await AssignmentRepo.update_field_blobs(
+        field_blobs=field_blobs, session=session
+    )
+    invalidate_field_caches(session, assignment_ids)
+
+
+def invalidate_field_caches(session: AsyncSession, assignment_ids) -> None:
+    """
+    Drop cached data of changed fields now and once more after commit, so
+    a read that runs before the commit can't put the old field back.
+    """
+    assignment_ids = [
+        str(UUID(str(assignment_id))) for assignment_id in assignment_ids
+    ]
+
+    def invalidate(*_) -> None:
+        for assignment_id in assignment_ids:
+            invalidate_assignment(assignment_id)
+            GRADE_CACHE.invalidate(assignment_id)
+
+    invalidate()
+    event.listen(session.sync_session, "after_commit", invalidate, once=True)
+
+
+def runs_inline(program: list[int] | dict) -> bool:
+    """Tell whether the program is short enough to run on the event loop."""
+    return (
+        not isinstance(program, dict)
+        and len(program) <= PROGRAM_SETTINGS.inline_length
+    )
+
+
 class AssignmentsService:
 
     @staticmethod
@@ -56,10 +201,11 @@ class AssignmentsService:
         assignment_in: AssignmentCreate, session: AsyncSession
     ) -> AssignmentGet | None:
         """
-        TODO
-        :param assignment_in:
-        :param session:
-        :return:
+        Validate the game field and create the assignment.
+
+        :param assignment_in: data of the new assignment
+        :param session: async session to database
+        :return: created assignment
         """
         if not validate_uuid(assignment_in.course_id):
             raise UUIDValidationException()
@@ -78,24 +224,21 @@ class AssignmentsService:
             )
             raise AssignmentException("Position is invalid.")
 
-        logger.info(
-            "Start checking course assignment %s" % assignment_in.course_id
-        )
-        if not await CourseServices.is_course_exists(
-            assignment_in.course_id, session
-        ):
-            raise CourseNotFoundException()
-
+        # The course is checked by the foreign key of the insert itself,
+        # so creation costs a single round trip.
         try:
             return await AssignmentRepo.create_assignment(
                 assignment_in=assignment_in, session=session
             )
-        except ForeignKeyViolationError as e:
-            logger.error(e)
-            raise AssignmentNotFoundException()
         except IntegrityError as e:
+            if violated_foreign_key(e) == ASSIGNMENT_COURSE_FOREIGN_KEY:
+                logger.info(
+                    "Course %s of new assignment doesn't exist"
+                    % assignment_in.course_id
+                )
+                raise CourseNotFoundException()
             logger.error(e)
-            raise AssignmentNotFoundException()
+            raise AssignmentException()
         except DataError as e:
             logger.error(e)
             raise UUIDValidationException()
@@ -107,9 +250,17 @@ class AssignmentsService:
         if not validate_uuid(assignment_uuid):
             raise UUIDValidationException()
         try:
-            return await AssignmentRepo.delete_assignment(
+            deleted = await AssignmentRepo.delete_assignment(
                 assignment_id=assignment_uuid, session=session
             )
+            invalidate_field_caches(session, [assignment_uuid])
+            event.listen(
+                session.sync_session,
+                "after_commit",
+                lambda *_: CLASSROOM_HUB.forget_assignment(assignment_uuid),
+                once=True,
+            )
+            return deleted
         except ForeignKeyViolationError as e:
             logger.error(e)
             raise AssignmentNotFoundException()
@@ -151,7 +302,312 @@ class AssignmentsService:
     async def add_elements(
         element_list: list[GameElementCreate, ...],
         session: AsyncSession,
-    ) -> tuple[AssignmentGet, tuple[GameElementGet, ...] | None]:
-        return await AssignmentRepo.add_elements(
+    ) -> list[GameElementCreate]:
+        """
+        Check the elements against their game fields in memory and insert
+        them all with one statement. A bad element costs one read and no
+        failed insert.
+        """
+        if not element_list:
+            return []
+
+        elements_by_assignment = defaultdict(list)
+        for element in element_list:
+            assignment_uuid = str(element.assignment_id)
+            if not validate_uuid(assignment_uuid):
+                raise UUIDValidationException()
+            elements_by_assignment[assignment_uuid].append(element)
+
+        game_fields = await AssignmentRepo.get_game_fields(
+            assignment_ids=list(elements_by_assignment), session=session
+        )
+        for assignment_uuid, elements in elements_by_assignment.items():
+            if assignment_uuid not in game_fields:
+                raise AssignmentElementFieldError(
+                    f"Assignment {assignment_uuid} doesn't exist."
+                )
+            elements_placement_validator(
+                game_fields[assignment_uuid], elements
+            )
+
+        added = await AssignmentRepo.add_elements(
             element_list=element_list, session=session
         )
+        await on_fields_changed(session, elements_by_assignment)
+        return added
+
+    @staticmethod
+    async def add_actions(
+        actions_id: list[int],
+        assignment_uuid: str,
+        session: AsyncSession,
+    ) -> AssignmentActionsChange:
+        if not validate_uuid(assignment_uuid):
+            raise UUIDValidationException()
+        change = await AssignmentRepo.add_actions(
+            actions_id=actions_id,
+            assignment_uuid=assignment_uuid,
+            session=session,
+        )
+        if change.added or change.removed:
+            await on_fields_changed(session, [assignment_uuid])
+        return change
+
+    @staticmethod
+    async def set_actions(
+        actions_id: list[int],
+        assignment_uuid: str,
+        session: AsyncSession,
+    ) -> AssignmentActionsChange:
+        if not validate_uuid(assignment_uuid):
+            raise UUIDValidationException()
+        change = await AssignmentRepo.set_actions(
+            actions_id=actions_id,
+            assignment_uuid=assignment_uuid,
+            session=session,
+        )
+        if change.added or change.removed:
+            await on_fields_changed(session, [assignment_uuid])
+        return change
+
+    @staticmethod
+    async def load_game_fields(
+        assignment_ids: list[str],
+        session: AsyncSession,
+    ) -> dict[str, GameField]:
+        """
+        Game fields keyed by the ids as given. Fields are decoded from
+        field_blob without joins, fields that were never encoded are
+        assembled from their rows. Invalid ids and assignments without a
+        field are left out.
+        """
+        normalized = {}
+        for assignment_id in set(assignment_ids):
+            if validate_uuid(assignment_id):
+                try:
+                    normalized[assignment_id] = str(UUID(assignment_id))
+                except ValueError:
+                    continue
+        if not normalized:
+            return {}
+
+        blobs = await AssignmentRepo.get_field_blobs(
+            assignment_ids=list(set(normalized.values())), session=session
+        )
+        fields = {
+            assignment_id: decode_field(blob)
+            for assignment_id, blob in blobs.items()
+            if blob is not None
+        }
+        not_encoded = [
+            assignment_id
+            for assignment_id, blob in blobs.items()
+            if blob is None
+        ]
+        if not_encoded:
+            fields_data = await AssignmentRepo.get_fields_data(
+                assignment_ids=not_encoded, session=session
+            )
+            for assignment_id, data in fields_data.items():
+                fields[assignment_id] = GameField.from_field_data(data)
+
+        return {
+            assignment_id: fields[uuid]
+            for assignment_id, uuid in normalized.items()
+            if uuid in fields
+        }
+
+    @staticmethod
+    async def load_game_field(
+        assignment_uuid: str,
+        session: AsyncSession,
+    ) -> GameField:
+        if not validate_uuid(assignment_uuid):
+            raise UUIDValidationException()
+        fields = await AssignmentsService.load_game_fields(
+            assignment_ids=[assignment_uuid], session=session
+        )
+        if assignment_uuid not in fields:
+            raise AssignmentNotFoundException()
+        return fields[assignment_uuid]
+
+    @staticmethod
+    async def get_field_blob(
+        assignment_uuid: str,
+        session: AsyncSession,
+    ) -> bytes:
+        """
+        Return the encoded field of the assignment, see field_codec.
+
+        :raise AssignmentFieldEncodingError: the field doesn't fit the
+            format
+        """
+        if not validate_uuid(assignment_uuid):
+            raise UUIDValidationException()
+        blobs = await AssignmentRepo.get_field_blobs(
+            assignment_ids=[assignment_uuid], session=session
+        )
+        if not blobs:
+            raise AssignmentNotFoundException()
+        blob = next(iter(blobs.values()))
+        if blob is None:
+            # written before field_blob existed, or doesn't fit the format
+            field = await AssignmentsService.load_game_field(
+                assignment_uuid=assignment_uuid, session=session
+            )
+            try:
+                blob = encode_field(field)
+            except FieldCodecError as e:
+                raise AssignmentFieldEncodingError(str(e)) from e
+        return blob
+
+    @staticmethod
+    async def run_program(
+        assignment_uuid: str,
+        program: list[int] | dict,
+        session: AsyncSession,
+        with_trace: bool = True,
+    ) -> SimulationResult:
+        """
+        Run a child's program on the assignment's field: action ids, or
+        a program with repeats and procedures (see engine/program.py),
+        under the step and time limits of PROGRAM_SETTINGS. Programs with
+        repeats and long action lists are executed on the process pool.
+        """
+        try:
+            bytecode = compile_program(program)
+        except ProgramCompileError as e:
+            raise AssignmentProgramError(str(e)) from e
+        field = await AssignmentsService.load_game_field(
+            assignment_uuid=assignment_uuid, session=session
+        )
+        if runs_inline(program):
+            result = execute(field, bytecode, with_trace=with_trace)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                get_executor(), execute, field, bytecode, with_trace
+            )
+        logger.info(
+            "Program of %s steps on assignment %s: %s"
+            % (result.steps, assignment_uuid, result.outcome)
+        )
+        return result
+
+    @staticmethod
+    async def prepare_trace(
+        assignment_uuid: str,
+        program: list[int] | dict,
+        session: AsyncSession,
+    ) -> tuple[GameField, Bytecode]:
+        """
+        Compile the program and load the field of the assignment, for
+        streaming the run as it is made (see services/trace_stream.py).
+        """
+        try:
+            bytecode = compile_program(program)
+        except ProgramCompileError as e:
+            raise AssignmentProgramError(str(e)) from e
+        field = await AssignmentsService.load_game_field(
+            assignment_uuid=assignment_uuid, session=session
+        )
+        return field, bytecode
+
+    @staticmethod
+    async def solve(
+        assignment_uuid: str,
+        session: AsyncSession,
+    ) -> Solution:
+        """Whether the goal is reachable and the length of the optimum."""
+        field = await AssignmentsService.load_game_field(
+            assignment_uuid=assignment_uuid, session=session
+        )
+        return get_solution(field)
+
+    @staticmethod
+    async def get_hint(
+        assignment_uuid: str,
+        x: int,
+        y: int,
+        session: AsyncSession,
+    ) -> Hint:
+        """
+        Next move from (x, y) towards the goal. The distance map of the
+        assignment is built on the first hint and then answered from memory.
+        """
+        assignment_id = normalize_uuid(assignment_uuid)
+        distance_map = get_distance_map(assignment_id)
+        if distance_map is None:
+            field = await AssignmentsService.load_game_field(
+                assignment_uuid=assignment_id, session=session
+            )
+            distance_map = put_distance_map(assignment_id, field)
+        if not distance_map.contains(x, y):
+            raise AssignmentPositionError()
+        return distance_map.hint(x, y)
+
+    @staticmethod
+    async def generate_assignments(
+        course_uuid: str,
+        generation: AssignmentsGeneration,
+        session: AsyncSession,
+    ) -> GeneratedAssignments:
+        """
+        Generate solvable levels for the course and insert them in one
+        transaction. Fewer levels than requested are created when the
+        attempt budget runs out first.
+        """
+        if not validate_uuid(course_uuid):
+            raise UUIDValidationException()
+        if not await CourseRepository.is_course_exists(session, course_uuid):
+            raise CourseNotFoundException()
+
+        action_ids = sorted(set(generation.action_ids))
+        actions = await AssignmentRepo.get_action_vectors(
+            action_ids=action_ids, session=session
+        )
+        if len(actions) != len(action_ids):
+            raise AssignmentActionError(
+                "Actions %s don't exist."
+                % sorted(set(action_ids) - set(actions))
+            )
+
+        spec = LevelSpec(
+            width=generation.field_width,
+            height=generation.field_height,
+            actions=actions,
+            min_steps=generation.min_steps,
+            max_steps=generation.max_steps,
+            obstacle_density=generation.obstacle_density,
+            pit_share=generation.pit_share,
+        )
+        seed = generation.seed
+        if seed is None:
+            seed = randrange(2**32)
+        levels, duplicates = await generate_levels(
+            spec=spec, count=generation.count, seed=seed
+        )
+        logger.info(
+            "Generated %s of %s levels for course %s (%s duplicates)"
+            % (len(levels), generation.count, course_uuid, duplicates)
+        )
+        if not levels:
+            raise AssignmentGenerationError(
+                "No level matches the settings, try another density or "
+                "step range."
+            )
+
+        assignments = await AssignmentRepo.create_generated_assignments(
+            course_uuid=course_uuid,
+            levels=levels,
+            actions=actions,
+            name_prefix=generation.name_prefix,
+            description=generation.description,
+            status_id=generation.status_id,
+            session=session,
+        )
+        return GeneratedAssignments(
+            course_id=course_uuid,
+            requested=generation.count,
+            assignments=assignments,
+            duplicates=duplicates,
+        )
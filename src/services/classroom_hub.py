@@ -0,0 +1,295 @@
+"""
+Live progress of the students of a course for the teacher's screen.
+
+Every committed flush of the submission buffer publishes the new state of
+the journal entries it touched, grouped by course. With
+CLASSROOM_SETTINGS.listen the hub sends them with NOTIFY over its own
+connection and every worker, this one included, gets them with LISTEN on
+the same channel. Postgres delivers them after the commit and in commit
+order. Without the connection updates go straight to the subscribers of
+this process.
+
+Listeners added with add_listener() get every message the worker receives,
+its own included: {"course_id", "updates"} or {"forgotten_assignment"} for
+a deleted assignment. LEADERBOARDS follows the journal this way in every
+worker.
+
+A subscriber (a teacher's socket) keeps only the last update of every
+student and assignment, and is sent at most one message per coalesce_ms.
+What it holds is bounded by the size of the course, however slow the
+socket is.
+"""
+
+import asyncio
+import json
+from collections.abc import Callable
+from contextlib import suppress
+from pathlib import Path
+
+import asyncpg
+from fastapi import WebSocket
+from sqlalchemy.engine import make_url
+
+from core.config import CLASSROOM_SETTINGS, DB_SETTINGS
+from logger.logger_module import ModuleLoger
+from schemas.classroom_schema import ClassroomUpdate
+
+logger = ModuleLoger(Path(__file__).stem)
+
+# NOTIFY payloads must be shorter than 8000 bytes
+MAX_PAYLOAD = 7800
+
+
+class Subscriber:
+    def __init__(self):
+        # (user_login, assignment_id) -> last update
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, updates: list[dict]) -> None:
+        for update in updates:
+            key = (update["user_login"], update["assignment_id"])
+            self._pending[key] = update
+        self._ready.set()
+
+    async def next_batch(self) -> list[dict]:
+        """Wait for at least one update and return all since the last batch."""
+        await self._ready.wait()
+        self._ready.clear()
+        batch, self._pending = list(self._pending.values()), {}
+        return batch
+
+
+def encode_payloads(course_id: str, updates: list[dict]) -> list[str]:
+    """NOTIFY payloads with the updates of a course, split by size."""
+    payloads = []
+    chunk: list[str] = []
+    size = 0
+    for update in updates:
+        encoded = json.dumps(update, separators=(",", ":"))
+        if chunk and size + len(encoded) > MAX_PAYLOAD:
+            payloads.append(_payload(course_id, chunk))
+            chunk, size = [], 0
+        chunk.append(encoded)
+        size += len(encoded) + 1
+    if chunk:
+        payloads.append(_payload(course_id, chunk))
+    return payloads
+
+
+def _payload(course_id: str, encoded_updates: list[str]) -> str:
+    updates = ",".join(encoded_updates)
+    return f'{{"course_id":"{course_id}","updates":[{updates}]}}'
+
+
+class ClassroomHub:
+    def __init__(self, channel: str, listen: bool, max_outbox: int):
+        self.channel = channel
+        self.listen = listen
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        self._listeners: list[Callable[[dict], None]] = []
+        self._connection: asyncpg.Connection | None = None
+        self._outbox: asyncio.Queue[str] = asyncio.Queue(max_outbox)
+        self._tasks: list[asyncio.Task] = []
+        self._connected = asyncio.Event()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, course_id: str) -> Subscriber:
+        subscriber = Subscriber()
+        self._subscribers.setdefault(course_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, course_id: str, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(course_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[course_id]
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """Call listener with every message this worker receives."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def dispatch(self, message: dict) -> None:
+        """Pass a message to the listeners and the subscribers."""
+        for listener in self._listeners:
+            try:
+                listener(message)
+            except Exception as e:
+                logger.error(
+                    f"Listener {listener!r} of classroom messages failed: {e}"
+                )
+        if "updates" in message:
+            self.deliver(message["course_id"], message["updates"])
+
+    def deliver(self, course_id: str, updates: list[dict]) -> None:
+        """Pass updates to the subscribers of this process."""
+        for subscriber in self._subscribers.get(course_id, ()):
+            subscriber.push(updates)
+            self.delivered += 1
+
+    def publish(self, entries: list[dict]) -> None:
+        """
+        Publish the new state of journal entries to the subscribers of their
+        courses in every worker, a listener of SUBMISSION_BUFFER.
+        """
+        by_course: dict[str, list[dict]] = {}
+        for entry in entries:
+            by_course.setdefault(str(entry["course_id"]), []).append(
+                ClassroomUpdate.model_validate(entry).model_dump(mode="json")
+            )
+        for course_id, updates in by_course.items():
+            self.published += 1
+            if self._connection is None:
+                self.dispatch({"course_id": course_id, "updates": updates})
+                continue
+            for payload in encode_payloads(course_id, updates):
+                if not self._send_later(payload):
+                    self.dispatch({"course_id": course_id, "updates": updates})
+                    break
+
+    def forget_assignment(self, assignment_id: str) -> None:
+        """Tell every worker that an assignment and its entries are gone."""
+        message = {"forgotten_assignment": str(assignment_id)}
+        if self._connection is None or not self._send_later(
+            json.dumps(message)
+        ):
+            self.dispatch(message)
+
+    def _send_later(self, payload: str) -> bool:
+        """Queue a payload for NOTIFY, False when the outbox is full."""
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning(
+                "Classroom outbox is full, a message is only delivered in "
+                "this worker"
+            )
+            return False
+        return True
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+            self.dispatch(message)
+        except (ValueError, KeyError) as e:
+            logger.error(f"Bad classroom notification: {e}")
+
+    def _on_termination(self, connection) -> None:
+        logger.warning("Classroom connection lost, updates stay local")
+        self._connection = None
+        self._connected.clear()
+
+    async def _listen(self) -> None:
+        """Keep the LISTEN connection open, reconnecting when it drops."""
+        dsn = make_url(DB_SETTINGS.url).set(drivername="postgresql")
+        while True:
+            try:
+                connection = await asyncpg.connect(
+                    dsn.render_as_string(hide_password=False)
+                )
+                await connection.add_listener(
+                    self.channel, self._on_notification
+                )
+                connection.add_termination_listener(self._on_termination)
+            except Exception as e:
+                logger.warning(
+                    f"Classroom LISTEN failed, updates stay local: {e}"
+                )
+            else:
+                self._connection = connection
+                self._connected.set()
+                logger.info(f"Classroom hub listens on {self.channel}")
+                while self._connection is connection:
+                    await asyncio.sleep(CLASSROOM_SETTINGS.reconnect_s)
+            await asyncio.sleep(CLASSROOM_SETTINGS.reconnect_s)
+
+    async def _send(self) -> None:
+        """Send queued payloads one by one over the LISTEN connection."""
+        while True:
+            payload = await self._outbox.get()
+            connection = self._connection
+            try:
+                if connection is None:
+                    raise ConnectionError("not connected")
+                await connection.execute(
+                    "select pg_notify($1, $2)", self.channel, payload
+                )
+            except Exception as e:
+                logger.warning(f"NOTIFY failed, delivered locally: {e}")
+                self.dispatch(json.loads(payload))
+
+    async def start(self) -> None:
+        if self._tasks or not self.listen:
+            return
+        # bound to the running event loop
+        self._outbox = asyncio.Queue(self._outbox.maxsize)
+        self._connected = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._send()),
+        ]
+        with suppress(TimeoutError):
+            await asyncio.wait_for(
+                self._connected.wait(), timeout=CLASSROOM_SETTINGS.reconnect_s
+            )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.remove_termination_listener(self._on_termination)
+            await connection.close()
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._connection is not None,
+            "courses": len(self._subscribers),
+            "subscribers": sum(map(len, self._subscribers.values())),
+            "published": self.published,
+            "delivered": self.delivered,
+            "outbox": self._outbox.qsize(),
+        }
+
+
+async def wait_closed(websocket: WebSocket) -> None:
+    """Read the socket until the client leaves, messages are ignored."""
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+async def serve_subscriber(
+    websocket: WebSocket, hub: ClassroomHub, course_id: str
+) -> None:
+    """
+    Send {"updates": [...]} batches of the course to an accepted socket
+    until it is closed, at most one per CLASSROOM_SETTINGS.coalesce_ms.
+    """
+    subscriber = hub.subscribe(course_id)
+    closed = asyncio.create_task(wait_closed(websocket))
+    try:
+        while True:
+            batch = asyncio.create_task(subscriber.next_batch())
+            await asyncio.wait(
+                (batch, closed), return_when=asyncio.FIRST_COMPLETED
+            )
+            if closed.done():
+                batch.cancel()
+                return
+            await websocket.send_json({"updates": batch.result()})
+            await asyncio.sleep(CLASSROOM_SETTINGS.coalesce_ms / 1000)
+    finally:
+        hub.unsubscribe(course_id, subscriber)
+        closed.cancel()
+
+
+CLASSROOM_HUB = ClassroomHub(
+    channel=CLASSROOM_SETTINGS.channel,
+    listen=CLASSROOM_SETTINGS.listen,
+    max_outbox=CLASSROOM_SETTINGS.max_outbox,
+)
@@ -0,0 +1,300 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import GRADING_SETTINGS
+from engine.cache import GRADE_CACHE, PROGRAM_FINGERPRINTS
+from engine.game_field import GameField
+from engine.interpreter import grade_programs, grade_submitted
+from engine.program import compile_program
+from engine.simulator import Outcome
+from logger.logger_module import ModuleLoger
+from schemas.grading_schema import GradeResult, SubmissionGrade
+from services.assignments_sevices import AssignmentsService
+from services.process_pool import get_executor
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+# results that are never cached: a time limit depends on the load, not the
+# program, and grade_one must see invalid programs to reject them
+UNCACHED_OUTCOMES = {Outcome.TIME_LIMIT.value, Outcome.INVALID_PROGRAM.value}
+
+
+def program_digest(program: list[int] | dict) -> bytes:
+    """
+    Return the digest of a program as submitted. Cheap enough to take on
+    the event loop for every submission of a batch; PROGRAM_FINGERPRINTS
+    maps it to the Bytecode.fingerprint of GRADE_CACHE keys, so that
+    equivalent programs (e.g. [1, 1, 1] and a repeat of 1 three times)
+    share results while compilation is left to the workers.
+    """
+    return blake2b(repr(program).encode(), digest_size=16).digest()
+
+
+@dataclass(slots=True)
+class AssignmentBatch:
+    """Submissions of one assignment in a grading batch."""
+
+    field: GameField
+    # normalized assignment id, the first part of cache keys
+    uuid: str
+    # program key -> indexes of the submissions with this program; the key
+    # is the bytecode fingerprint when it is known, the program digest
+    # otherwise
+    indexes_by_key: dict[str | bytes, list[int]]
+    # distinct programs that aren't cached: key -> (digest, program)
+    to_grade: dict[str | bytes, tuple[bytes, list[int] | dict]]
+    # (index, result) answered by GRADE_CACHE, yielded with the optimal
+    # steps that the first finished chunk brings
+    cached: list[tuple[int, tuple]]
+
+
+class GradingService:
+
+    @staticmethod
+    async def load_fields(
+        assignment_ids: list[str],
+        session: AsyncSession,
+    ) -> dict[str, GameField]:
+        """
+        Game fields of the assignments. Invalid ids and assignments without
+        a field are left out.
+        """
+        return await AssignmentsService.load_game_fields(
+            assignment_ids=assignment_ids, session=session
+        )
+
+    @staticmethod
+    async def grade_one(
+        assignment_id: str,
+        field: GameField,
+        program: list[int] | dict,
+    ) -> tuple[str, int, int, int]:
+        """
+        (outcome, x, y, steps) of one program, through GRADE_CACHE. Action
+        lists are run here, programs with repeats and procedures on the
+        process pool.
+
+        :raise ProgramCompileError: see compile_program
+        """
+        assignment_uuid = str(UUID(assignment_id))
+        digest = program_digest(program)
+        fingerprint = PROGRAM_FINGERPRINTS.get(digest)
+        if fingerprint is not None:
+            key = (assignment_uuid, field.fingerprint, fingerprint)
+            result = GRADE_CACHE.get(key)
+            if result is not None:
+                return result
+        bytecode = compile_program(program)
+        fingerprint = bytecode.fingerprint()
+        PROGRAM_FINGERPRINTS.put(digest, fingerprint)
+        key = (assignment_uuid, field.fingerprint, fingerprint)
+        result = GRADE_CACHE.get(key)
+        if result is not None:
+            return result
+        if isinstance(program, dict):
+            result = (
+                await asyncio.get_running_loop().run_in_executor(
+                    get_executor(), grade_programs, field, [bytecode]
+                )
+            )[0]
+        else:
+            result = grade_programs(field, [bytecode])[0]
+        if result[0] not in UNCACHED_OUTCOMES:
+            GRADE_CACHE.put(key, result)
+        return result
+
+    @staticmethod
+    def _result(
+        index: int,
+        assignment_id: str,
+        result: tuple[str, int, int, int],
+        optimal_steps: int | None,
+    ) -> GradeResult:
+        outcome, x, y, steps = result
+        return GradeResult(
+            index=index,
+            assignment_id=assignment_id,
+            outcome=outcome,
+            x=x,
+            y=y,
+            steps=steps,
+            optimal_steps=optimal_steps,
+        )
+
+    @staticmethod
+    async def _group(
+        submissions: list[SubmissionGrade],
+        fields: dict[str, GameField],
+    ) -> tuple[dict[str, AssignmentBatch], list[GradeResult]]:
+        """
+        Batches by assignment with equal programs merged and cached results
+        looked up, and the errors of submissions to unknown assignments.
+        Lets other tasks run after every chunk_size submissions.
+        """
+        batches: dict[str, AssignmentBatch] = {}
+        errors = []
+        for index, submission in enumerate(submissions):
+            if index and index % GRADING_SETTINGS.chunk_size == 0:
+                await asyncio.sleep(0)
+            assignment_id = submission.assignment_id
+            batch = batches.get(assignment_id)
+            if batch is None:
+                field = fields.get(assignment_id)
+                if field is None:
+                    errors.append(
+                        GradeResult(
+                            index=index,
+                            assignment_id=assignment_id,
+                            error="Assignment not found",
+                        )
+                    )
+                    continue
+                batch = batches[assignment_id] = AssignmentBatch(
+                    field, str(UUID(assignment_id)), {}, {}, []
+                )
+
+            program = submission.engine_program()
+            digest = program_digest(program)
+            fingerprint = PROGRAM_FINGERPRINTS.get(digest)
+            key = digest if fingerprint is None else fingerprint
+            indexes = batch.indexes_by_key.get(key)
+            if indexes is not None:
+                indexes.append(index)
+                continue
+            if fingerprint is not None:
+                cached = GRADE_CACHE.get(
+                    (batch.uuid, batch.field.fingerprint, fingerprint)
+                )
+                if cached is not None:
+                    batch.cached.append((index, cached))
+                    continue
+            batch.indexes_by_key[key] = [index]
+            batch.to_grade[key] = (digest, program)
+        return batches, errors
+
+    @staticmethod
+    async def _submit(
+        batches: dict[str, AssignmentBatch],
+    ) -> dict[asyncio.Future, tuple[str, list[tuple]]]:
+        """
+        Send the programs to the pool in chunks of one assignment. Every
+        assignment gets at least one chunk, it brings the optimal steps.
+        Lets other tasks run after every chunk.
+
+        :return: future -> (assignment id, program keys of the chunk)
+        """
+        loop = asyncio.get_running_loop()
+        chunks = {}
+        for assignment_id, batch in batches.items():
+            keys = list(batch.to_grade)
+            size = GRADING_SETTINGS.chunk_size
+            for start in range(0, max(len(keys), 1), size):
+                chunk = keys[start : start + size]
+                future = loop.run_in_executor(
+                    get_executor(),
+                    grade_submitted,
+                    batch.field,
+                    [batch.to_grade[key][1] for key in chunk],
+                )
+                chunks[future] = (assignment_id, chunk)
+                await asyncio.sleep(0)
+        return chunks
+
+    @staticmethod
+    def _chunk_results(
+        future: asyncio.Future,
+        assignment_id: str,
+        chunk: list[str | bytes],
+        batch: AssignmentBatch,
+    ) -> Iterator[GradeResult]:
+        """Results of a finished chunk, and the cached ones not sent yet."""
+        try:
+            optimal_steps, fingerprints, results = future.result()
+        except Exception as e:
+            logger.error(
+                f"Grading chunk of assignment {assignment_id} failed: {e}"
+            )
+            optimal_steps, fingerprints, results = None, None, None
+            for key in chunk:
+                for index in batch.indexes_by_key[key]:
+                    yield GradeResult(
+                        index=index,
+                        assignment_id=assignment_id,
+                        error="Grading failed",
+                    )
+
+        cached, batch.cached = batch.cached, []
+        for index, result in cached:
+            yield GradingService._result(
+                index, assignment_id, result, optimal_steps
+            )
+        if results is None:
+            return
+        for key, fingerprint, result in zip(
+            chunk, fingerprints, results, strict=True
+        ):
+            if fingerprint is not None:
+                PROGRAM_FINGERPRINTS.put(batch.to_grade[key][0], fingerprint)
+                if result[0] not in UNCACHED_OUTCOMES:
+                    GRADE_CACHE.put(
+                        (batch.uuid, batch.field.fingerprint, fingerprint),
+                        result,
+                    )
+            for index in batch.indexes_by_key[key]:
+                yield GradingService._result(
+                    index, assignment_id, result, optimal_steps
+                )
+
+    @staticmethod
+    async def grade_batch(
+        submissions: list[SubmissionGrade],
+        fields: dict[str, GameField],
+    ) -> AsyncIterator[GradeResult]:
+        """
+        Grade the submissions on the process pool and yield results as the
+        chunks complete. Submissions are grouped by assignment, so a field
+        is sent to a worker once per chunk of programs. Equal programs are
+        run once per batch and results already in GRADE_CACHE aren't run at
+        all; the event loop only hashes the programs, compilation and the
+        solver run in the workers. Results are cached by bytecode
+        fingerprint, so equivalent programs share them once a worker has
+        compiled either.
+
+        :param submissions: (assignment_id, program) pairs
+        :param fields: see load_fields
+        """
+        batches, errors = await GradingService._group(submissions, fields)
+        chunks = await GradingService._submit(batches)
+        assignments = len(batches) + len({e.assignment_id for e in errors})
+        distinct = sum(len(batch.to_grade) for batch in batches.values())
+        cached = sum(len(batch.cached) for batch in batches.values())
+        logger.info(
+            f"Grading {len(submissions)} submissions of {assignments} "
+            f"assignments: {distinct} distinct programs in {len(chunks)} "
+            f"chunks, {cached} answered from the cache"
+        )
+        pending = set(chunks)
+        try:
+            for result in errors:
+                yield result
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    assignment_id, chunk = chunks[future]
+                    for result in GradingService._chunk_results(
+                        future, assignment_id, chunk, batches[assignment_id]
+                    ):
+                        yield result
+        finally:
+            # the client went away: drop chunks that didn't start yet
+            for future in pending:
+                future.cancel()
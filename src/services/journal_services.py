@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from exceptions.CourseException import CourseNotFoundException
+from exceptions.ValidationException import UUIDValidationException
+from logger.logger_module import ModuleLoger
+from repository.course_repo import CourseRepository
+from repository.journal_repo import JournalRepo
+from schemas.journal_schema import CourseJournal
+from utils.uuid_checker import validate_uuid
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+class JournalService:
+
+    @staticmethod
+    async def get_course_journal(
+        course_uuid: str, session: AsyncSession
+    ) -> CourseJournal:
+        """
+        Results of every user of the course on every assignment. Entries
+        are maintained by the submission writes, nothing is aggregated
+        here.
+        """
+        if not validate_uuid(course_uuid):
+            raise UUIDValidationException()
+        if not await CourseRepository.is_course_exists(session, course_uuid):
+            raise CourseNotFoundException()
+        return await JournalRepo.get_course_journal(
+            course_id=course_uuid, session=session
+        )
+
+    @staticmethod
+    async def get_user_journal(
+        course_uuid: str, user_login: str, session: AsyncSession
+    ) -> CourseJournal:
+        if not validate_uuid(course_uuid):
+            raise UUIDValidationException()
+        if not await CourseRepository.is_course_exists(session, course_uuid):
+            raise CourseNotFoundException()
+        return await JournalRepo.get_user_journal(
+            course_id=course_uuid, user_login=user_login, session=session
+        )
@@ -0,0 +1,235 @@
+"""
+Leaderboards of the courses, kept in memory.
+
+A board is built from the journal once, on startup, and then follows it:
+every committed flush of the submission buffer publishes the new state of
+the journal entries it touched (see INSERT_SUBMISSIONS) through
+CLASSROOM_HUB, which hands them to every worker, and each changed user is
+moved in the sorted list with two binary searches. Reading a board doesn't
+touch the database.
+
+The version of a board is a digest of its entries, not a count of changes:
+workers that hold the same entries give the same ETag, whenever they were
+started, so clients skip unchanged boards with If-None-Match whichever
+worker answers.
+
+A user is ranked by solved assignments, then by the sum of their fewest
+steps, then by the time the score was reached: who got there first stays
+higher. Only users with a solved assignment are on the board.
+"""
+
+from bisect import bisect_left, insort
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from hashlib import blake2b
+from pathlib import Path
+from uuid import UUID
+
+from logger.logger_module import ModuleLoger
+
+logger = ModuleLoger(Path(__file__).stem)
+
+# (-solved, total_steps, reached_at timestamp, user_login)
+BoardKey = tuple[int, int, float, str]
+
+# version of a board without entries
+EMPTY_VERSION = f"{0:016x}"
+
+
+def entry_digest(
+    user_login: str, assignment_id: str, best_steps: int, best_at: datetime
+) -> int:
+    """Digest of a solved entry, the same in every process."""
+    key = "\0".join(
+        (user_login, assignment_id, str(best_steps), str(best_at.timestamp()))
+    )
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest())
+
+
+class CourseLeaderboard:
+    def __init__(self):
+        # user_login -> assignment_id -> (best_steps, best_at), solved only
+        self._solved: dict[str, dict[str, tuple[int, datetime]]] = {}
+        self._keys: dict[str, BoardKey] = {}
+        # user_login -> when the current score was reached
+        self._reached_at: dict[str, datetime] = {}
+        self._order: list[BoardKey] = []
+        # xor of the digests of the solved entries
+        self._state = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def version(self) -> str:
+        """Digest of the entries, the ETag of the board."""
+        return f"{self._state:016x}"
+
+    def _place(self, user_login: str) -> None:
+        """Move the user to the place of their current results."""
+        old_key = self._keys.pop(user_login, None)
+        if old_key is not None:
+            del self._order[bisect_left(self._order, old_key)]
+        solved = self._solved.get(user_login)
+        if solved:
+            reached_at = max(best_at for _, best_at in solved.values())
+            key = (
+                -len(solved),
+                sum(steps for steps, _ in solved.values()),
+                reached_at.timestamp(),
+                user_login,
+            )
+            self._keys[user_login] = key
+            self._reached_at[user_login] = reached_at
+            insort(self._order, key)
+        else:
+            self._solved.pop(user_login, None)
+            self._reached_at.pop(user_login, None)
+
+    def apply(
+        self,
+        user_login: str,
+        assignment_id: str,
+        solved: bool,
+        best_steps: int | None,
+        best_at: datetime | None,
+    ) -> bool:
+        """
+        Take the new state of a journal entry.
+
+        :return: whether the board changed
+        """
+        entries = self._solved.setdefault(user_login, {})
+        result = (best_steps, best_at) if solved and best_at else None
+        if entries.get(assignment_id) == result:
+            if not entries:
+                del self._solved[user_login]
+            return False
+        old = entries.pop(assignment_id, None)
+        if old is not None:
+            self._state ^= entry_digest(user_login, assignment_id, *old)
+        if result is not None:
+            entries[assignment_id] = result
+            self._state ^= entry_digest(user_login, assignment_id, *result)
+        self._place(user_login)
+        return True
+
+    def forget_assignment(self, assignment_id: str) -> None:
+        for user_login, entries in list(self._solved.items()):
+            old = entries.pop(assignment_id, None)
+            if old is not None:
+                self._state ^= entry_digest(user_login, assignment_id, *old)
+                self._place(user_login)
+
+    def top(self, limit: int) -> list[dict]:
+        return [
+            {
+                "place": place,
+                "user_login": user_login,
+                "solved": -solved,
+                "total_steps": total_steps,
+                "reached_at": self._reached_at[user_login],
+            }
+            for place, (solved, total_steps, _, user_login) in enumerate(
+                self._order[:limit], start=1
+            )
+        ]
+
+
+class Leaderboards:
+    """Boards of all courses, see the module docstring."""
+
+    def __init__(self):
+        self._boards: dict[str, CourseLeaderboard] = {}
+        # messages received while the journal is read, see replaying()
+        self._received: list[dict] | None = None
+
+    def get(self, course_id: str) -> CourseLeaderboard:
+        course_id = str(UUID(str(course_id)))
+        board = self._boards.get(course_id)
+        if board is None:
+            board = self._boards[course_id] = CourseLeaderboard()
+        return board
+
+    def find(self, course_id: str) -> CourseLeaderboard | None:
+        """Board of the course, None while nobody has solved anything."""
+        return self._boards.get(str(UUID(str(course_id))))
+
+    def etag(self, course_id: str) -> str:
+        board = self.find(course_id)
+        return f'"{board.version if board else EMPTY_VERSION}"'
+
+    def apply_entries(self, entries: list[dict]) -> int:
+        """
+        Take the new state of journal entries: rows with course_id,
+        user_login, assignment_id, solved, best_steps and best_at.
+
+        :return: number of entries that changed a board
+        """
+        changed = 0
+        for entry in entries:
+            changed += self.get(entry["course_id"]).apply(
+                user_login=entry["user_login"],
+                assignment_id=str(entry["assignment_id"]),
+                solved=entry["solved"],
+                best_steps=entry["best_steps"],
+                best_at=entry["best_at"],
+            )
+        return changed
+
+    def apply_message(self, message: dict) -> None:
+        """
+        Take a message of CLASSROOM_HUB, a listener of it: updates of the
+        journal entries of a course or a deleted assignment.
+        """
+        if self._received is not None:
+            self._received.append(message)
+        if "forgotten_assignment" in message:
+            self.forget_assignment(message["forgotten_assignment"])
+            return
+        self.apply_entries(
+            [
+                update
+                | {
+                    "course_id": message["course_id"],
+                    "best_at": update["best_at"]
+                    and datetime.fromisoformat(update["best_at"]),
+                }
+                for update in message["updates"]
+            ]
+        )
+
+    @contextmanager
+    def replaying(self) -> Iterator[None]:
+        """
+        Apply the messages received inside the block again at its end: a
+        journal read inside it may not hold their entries yet, and rebuild()
+        would drop them. They come in commit order, so the last state of an
+        entry wins.
+        """
+        self._received = []
+        try:
+            yield
+        finally:
+            received, self._received = self._received, None
+            for message in received:
+                self.apply_message(message)
+
+    def rebuild(self, entries) -> None:
+        """Replace all boards with ones built from journal entries."""
+        self._boards = {}
+        self.apply_entries(entries)
+        placed = sum(len(board) for board in self._boards.values())
+        logger.info(
+            f"Leaderboards of {len(self._boards)} courses rebuilt, {placed} "
+            "users placed"
+        )
+
+    def forget_assignment(self, assignment_id: str) -> None:
+        assignment_id = str(UUID(str(assignment_id)))
+        for board in self._boards.values():
+            board.forget_assignment(assignment_id)
+
+
+LEADERBOARDS = Leaderboards()
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.db_helper import db_helper
+from db.unit_of_work import UnitOfWork
+from exceptions.CourseException import CourseNotFoundException
+from logger.logger_module import ModuleLoger
+from repository.course_repo import CourseRepository
+from repository.journal_repo import JournalRepo
+from schemas.leaderboard_schema import Leaderboard
+from services.leaderboard import EMPTY_VERSION, LEADERBOARDS
+from utils.uuid_checker import normalize_uuid
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+class LeaderboardService:
+
+    @staticmethod
+    async def rebuild() -> None:
+        """
+        Build the boards from the journal, on startup, once CLASSROOM_HUB
+        passes the messages of the other workers to LEADERBOARDS.
+        """
+        with LEADERBOARDS.replaying():
+            async with UnitOfWork(db_helper.session_factory) as session:
+                entries = await JournalRepo.get_solved_entries(session)
+            LEADERBOARDS.rebuild(entries)
+
+    @staticmethod
+    def etag(course_uuid: str) -> str:
+        """ETag of the current board, without touching the database."""
+        return LEADERBOARDS.etag(normalize_uuid(course_uuid))
+
+    @staticmethod
+    async def get_leaderboard(
+        course_uuid: str, limit: int, session: AsyncSession
+    ) -> Leaderboard:
+        """
+        Best users of the course from the in-memory board. The database is
+        only asked whether the course exists when nobody is on the board.
+        """
+        course_id = normalize_uuid(course_uuid)
+        board = LEADERBOARDS.find(course_id)
+        if (board is None or not len(board)) and (
+            not await CourseRepository.is_course_exists(session, course_id)
+        ):
+            raise CourseNotFoundException()
+        if board is None:
+            return Leaderboard(course_id=course_id, version=EMPTY_VERSION, places=[])
+        return Leaderboard(
+            course_id=course_id,
+            version=board.version,
+            places=board.top(limit),
+        )
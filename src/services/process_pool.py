@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from core.config import GRADING_SETTINGS
+from logger.logger_module import ModuleLoger
+
+logger = ModuleLoger(Path(__file__).stem)
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Worker processes of grading and level generation, started on first
+    use and stopped with the application.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=GRADING_SETTINGS.workers,
+            mp_context=get_context(GRADING_SETTINGS.start_method),
+        )
+        logger.info(
+            f"Process pool started with {GRADING_SETTINGS.workers} workers"
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        logger.info("Process pool stopped")
@@ -0,0 +1,255 @@
+"""
+Buffered writes of submissions.
+
+Every run of a program is a submission, so rows arrive much faster than
+single-row transactions could be committed. They are kept in memory and
+written by a background task with one multi-row insert per flush: after
+SUBMISSION_SETTINGS.flush_interval_ms, or sooner when flush_rows rows are
+waiting. The same statement upserts the journal entries of the rows, so
+the journal is exactly as durable as the submissions.
+
+Durability: a submission is acknowledged to the client once it is in the
+buffer, before it is committed. What the process holds at a given moment
+(at most about one interval of submissions) is lost if it dies without a
+shutdown: SIGKILL, OOM, a power cut. A normal shutdown flushes the buffer
+(lifespan of app.py). A failed flush keeps its rows and retries them with
+the next one; the insert ignores rows that are already written, so a retry
+after a commit whose answer was lost doesn't duplicate them. While the
+database is unavailable rows pile up to max_pending_rows, then new
+submissions are refused with SubmissionBufferFullError. A flush that fails
+on its data (a row the database refuses) isn't retried as a whole: the
+batch is split until the refused rows are alone, those are logged and
+dropped, the rest is written.
+
+Listeners added with add_listener() get the new state of the journal
+entries of every committed flush, see services/leaderboard.py and
+services/classroom_hub.py.
+"""
+
+import asyncio
+from collections.abc import Callable
+from contextlib import suppress
+from pathlib import Path
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from core.config import SUBMISSION_SETTINGS
+from db.db_helper import db_helper
+from db.unit_of_work import UnitOfWork
+from exceptions.SubmissionException import SubmissionBufferFullError
+from logger.logger_module import ModuleLoger
+from repository.submission_repo import SubmissionRepo
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+class SubmissionBuffer:
+    def __init__(
+        self, flush_interval: float, flush_rows: int, max_pending_rows: int
+    ):
+        """
+        :param flush_interval: seconds between flushes
+        :param flush_rows: rows that start a flush before the interval ends
+        :param max_pending_rows: rows kept before add() refuses new ones
+        """
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.max_pending_rows = max_pending_rows
+        # submission_id -> row, waiting for the next flush
+        self._rows: dict[str, dict] = {}
+        # rows of the flush in progress
+        self._flushing: dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._listeners: list[Callable[[list[dict]], None]] = []
+        self.written = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    def add_listener(self, listener: Callable[[list[dict]], None]) -> None:
+        """
+        Call listener with the journal entries updated by each committed
+        flush, see SubmissionRepo.insert_submissions.
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def notify(self, entries: list[dict]) -> None:
+        """
+        Pass journal entries to the listeners. Called after every flush,
+        and for journal changes made elsewhere (deleted submissions).
+        """
+        for listener in self._listeners:
+            try:
+                listener(entries)
+            except Exception as e:
+                logger.error(
+                    f"Listener {listener!r} of submission flushes failed: {e}"
+                )
+
+    def add(self, row: dict) -> None:
+        """
+        Queue a row of the submission table, see SubmissionRepo.
+
+        :raise SubmissionBufferFullError: max_pending_rows are waiting
+        """
+        if len(self._rows) + len(self._flushing) >= self.max_pending_rows:
+            raise SubmissionBufferFullError()
+        self._rows[str(row["submission_id"])] = row
+        if len(self._rows) >= self.flush_rows:
+            self._wakeup.set()
+
+    def get(self, submission_id: str) -> dict | None:
+        """Row that isn't written yet."""
+        return self._rows.get(submission_id) or self._flushing.get(
+            submission_id
+        )
+
+    async def discard(self, submission_id: str) -> bool:
+        """
+        Forget a row that isn't written yet. A row of the flush in progress
+        can't be taken back: waits for the flush, the row can be deleted
+        from the table then.
+
+        :return: whether the row was still in the buffer
+        """
+        if self._rows.pop(submission_id, None) is not None:
+            return True
+        if submission_id in self._flushing:
+            async with self._lock:
+                pass
+        return False
+
+    @staticmethod
+    async def _insert(rows: list[dict], entries: list[dict]) -> int:
+        """
+        Write rows in a transaction of their own.
+
+        :param entries: the updated journal entries are added to it
+        :return: number of inserted rows
+        """
+        async with UnitOfWork(db_helper.session_factory) as session:
+            inserted, new_entries = await SubmissionRepo.insert_submissions(
+                rows, session
+            )
+        entries.extend(new_entries)
+        return inserted
+
+    async def _insert_isolating(
+        self, rows: list[dict], entries: list[dict]
+    ) -> int:
+        """
+        Write rows of a batch that the database refused: both halves get
+        a transaction of their own, a row refused alone is dropped.
+        """
+        if len(rows) == 1:
+            try:
+                return await self._insert(rows, entries)
+            except (DataError, IntegrityError) as e:
+                self.dropped += 1
+                row = rows[0]
+                logger.error(
+                    f"Submission {row['submission_id']} of "
+                    f"{row['user_login']} to {row['assignment_id']} is "
+                    f"refused and dropped: {e}"
+                )
+                return 0
+        middle = len(rows) // 2
+        inserted = 0
+        for half in (rows[:middle], rows[middle:]):
+            try:
+                inserted += await self._insert(half, entries)
+            except (DataError, IntegrityError):
+                inserted += await self._insert_isolating(half, entries)
+        return inserted
+
+    async def flush(self) -> int:
+        """
+        Write the waiting rows in one transaction.
+
+        :return: number of inserted rows
+        """
+        async with self._lock:
+            if not self._rows:
+                return 0
+            self._flushing, self._rows = self._rows, {}
+            rows = list(self._flushing.values())
+            entries = []
+            try:
+                try:
+                    inserted = await self._insert(rows, entries)
+                except (DataError, IntegrityError) as e:
+                    logger.warning(
+                        f"Flush of {len(rows)} submissions is refused, "
+                        f"looking for the rows: {e}"
+                    )
+                    inserted = await self._insert_isolating(rows, entries)
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(
+                    f"Flush of {len(rows)} submissions failed, kept for the "
+                    f"next one: {e}"
+                )
+                # rows added in the meantime stay after the failed ones
+                self._rows = self._flushing | self._rows
+                return 0
+            finally:
+                self._flushing = {}
+                # committed before a failure, if any
+                if entries:
+                    self.notify(entries)
+            self.written += inserted
+            if inserted != len(rows):
+                logger.info(
+                    f"{len(rows) - inserted} of {len(rows)} submissions "
+                    "skipped: assignment or user deleted, already written or "
+                    "refused"
+                )
+            return inserted
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.flush_interval
+                )
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            # bound to the running event loop
+            self._lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write what is left."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._rows:
+            logger.error(
+                f"{len(self._rows)} submissions were not written on shutdown"
+            )
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._rows) + len(self._flushing),
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+        }
+
+
+SUBMISSION_BUFFER = SubmissionBuffer(
+    flush_interval=SUBMISSION_SETTINGS.flush_interval_ms / 1000,
+    flush_rows=SUBMISSION_SETTINGS.flush_rows,
+    max_pending_rows=SUBMISSION_SETTINGS.max_pending_rows,
+)
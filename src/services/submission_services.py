@@ -0,0 +1,173 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import UTC, datetime
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from engine.program import ProgramCompileError
+from exceptions.AssignmentException import AssignmentProgramError
+from exceptions.SubmissionException import (
+    SubmissionCursorError,
+    SubmissionForbiddenError,
+    SubmissionNotFoundException,
+)
+from logger.logger_module import ModuleLoger
+from repository.course_repo import CourseRepository
+from repository.submission_repo import SubmissionRepo
+from schemas.submission_schema import (
+    SubmissionCreate,
+    SubmissionDelete,
+    SubmissionGet,
+    SubmissionPage,
+)
+from services.assignments_sevices import AssignmentsService
+from services.grading_services import GradingService
+from services.submission_buffer import SUBMISSION_BUFFER
+from utils.uuid_checker import normalize_uuid
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+def encode_cursor(submission: SubmissionGet) -> str:
+    key = "|".join(
+        (
+            str(submission.assignment_id),
+            submission.created_at.isoformat(),
+            str(submission.submission_id),
+        )
+    )
+    return urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, datetime, str]:
+    try:
+        assignment_id, created_at, submission_id = (
+            urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return (
+            str(UUID(assignment_id)),
+            datetime.fromisoformat(created_at),
+            str(UUID(submission_id)),
+        )
+    except ValueError as e:
+        raise SubmissionCursorError() from e
+
+
+class SubmissionService:
+
+    @staticmethod
+    async def submit(
+        user_login: str,
+        submission_in: SubmissionCreate,
+        session: AsyncSession,
+    ) -> SubmissionGet:
+        """
+        Run the program and queue the submission for writing, see
+        services/submission_buffer.py. The answer doesn't wait for the
+        write.
+
+        :raise SubmissionForbiddenError: the user isn't on the course of
+            the assignment
+        """
+        assignment_id = normalize_uuid(submission_in.assignment_id)
+        field = await AssignmentsService.load_game_field(
+            assignment_uuid=assignment_id, session=session
+        )
+        if not await CourseRepository.is_user_on_assignment_course(
+            session, assignment_id, user_login
+        ):
+            logger.info(
+                f"{user_login} submits to {assignment_id} outside their "
+                "courses"
+            )
+            raise SubmissionForbiddenError()
+        program = submission_in.engine_program()
+        try:
+            outcome, x, y, steps = await GradingService.grade_one(
+                assignment_id, field, program
+            )
+        except ProgramCompileError as e:
+            raise AssignmentProgramError(str(e)) from e
+
+        row = {
+            "submission_id": str(uuid4()),
+            "user_login": user_login,
+            "assignment_id": assignment_id,
+            "program": program,
+            "outcome": outcome,
+            "x": x,
+            "y": y,
+            "steps": steps,
+            "created_at": datetime.now(UTC),
+        }
+        SUBMISSION_BUFFER.add(row)
+        return SubmissionGet.model_validate(row)
+
+    @staticmethod
+    async def get_submission(
+        submission_id: str, session: AsyncSession
+    ) -> SubmissionGet:
+        submission_id = normalize_uuid(submission_id)
+        # the submission may still wait in the buffer of this process
+        row = SUBMISSION_BUFFER.get(submission_id)
+        if row is not None:
+            return SubmissionGet.model_validate(row)
+        submission = await SubmissionRepo.get_submission(
+            submission_id=submission_id, session=session
+        )
+        if submission is None:
+            raise SubmissionNotFoundException()
+        return submission
+
+    @staticmethod
+    async def get_user_submissions(
+        user_login: str,
+        assignment_id: str | None,
+        cursor: str | None,
+        limit: int,
+        session: AsyncSession,
+    ) -> SubmissionPage:
+        """
+        One page of the user's written submissions, ordered by assignment
+        and time. Submissions still in the buffer aren't listed.
+        """
+        if assignment_id is not None:
+            assignment_id = normalize_uuid(assignment_id)
+        submissions = await SubmissionRepo.get_user_submissions(
+            user_login=user_login,
+            assignment_id=assignment_id,
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit,
+            session=session,
+        )
+        return SubmissionPage(
+            items=submissions,
+            next_cursor=(
+                encode_cursor(submissions[-1])
+                if len(submissions) == limit
+                else None
+            ),
+        )
+
+    @staticmethod
+    async def delete_submission(
+        submission_id: str, session: AsyncSession
+    ) -> SubmissionDelete:
+        submission_id = normalize_uuid(submission_id)
+        if await SUBMISSION_BUFFER.discard(submission_id):
+            return SubmissionDelete(submission_id=submission_id)
+        deleted, entries = await SubmissionRepo.delete_submission(
+            submission_id=submission_id, session=session
+        )
+        if deleted is None:
+            raise SubmissionNotFoundException()
+        event.listen(
+            session.sync_session,
+            "after_commit",
+            lambda *_: SUBMISSION_BUFFER.notify(entries),
+            once=True,
+        )
+        logger.info(f"Submission {submission_id} deleted")
+        return deleted
@@ -0,0 +1,86 @@
+"""
+Trace frames of a program run sent over a WebSocket with flow control.
+
+The program runs on a thread, which hands over MOVES frames as the
+interpreter produces them, so the first frames go out while it still runs.
+The client acknowledges MOVES frames with text messages {"ack": sequence}
+as it plays them. At most `window` frames are sent past the last
+acknowledged one, so a slow tablet holds the stream back instead of making
+the server queue the trace in its socket buffers. What the server keeps
+per stream is the frames not sent yet, 4 bytes per run of moves; the run
+itself is bounded by the step and time limits of PROGRAM_SETTINGS.
+"""
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator
+from pathlib import Path
+
+from fastapi import WebSocket
+
+from engine.game_field import GameField
+from engine.program import Bytecode
+from engine.trace_codec import MOVES, run_frames
+from exceptions.AssignmentException import TraceStreamError
+from logger.logger_module import ModuleLoger
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+async def receive_ack(websocket: WebSocket, timeout: float) -> int:
+    try:
+        message = await asyncio.wait_for(
+            websocket.receive_json(), timeout=timeout
+        )
+        return int(message["ack"])
+    except TimeoutError as e:
+        raise TraceStreamError("No acknowledgement in time.") from e
+    except (KeyError, TypeError, ValueError) as e:
+        raise TraceStreamError("Expected {\"ack\": sequence}.") from e
+
+
+async def produce_frames(
+    field: GameField, bytecode: Bytecode, frame_runs: int
+) -> AsyncIterator[bytes]:
+    """
+    Run the bytecode off the event loop and yield its frames (see
+    trace_codec.run_frames) as soon as they are made.
+    """
+    loop = asyncio.get_running_loop()
+    frames: asyncio.Queue[bytes | None] = asyncio.Queue()
+
+    def emit(frame: bytes | None) -> None:
+        loop.call_soon_threadsafe(frames.put_nowait, frame)
+
+    def run() -> None:
+        try:
+            run_frames(field, bytecode, frame_runs, emit)
+        finally:
+            emit(None)
+
+    running = loop.run_in_executor(None, run)
+    while (frame := await frames.get()) is not None:
+        yield frame
+    # raises what the run raised
+    await running
+
+
+async def send_frames(
+    websocket: WebSocket,
+    frames: AsyncIterable[bytes],
+    window: int,
+    timeout: float,
+) -> None:
+    """
+    Send START, MOVES and END frames of engine/trace_codec.py, waiting for
+    acknowledgements whenever `window` MOVES frames are unacknowledged.
+
+    :raise TraceStreamError: an acknowledgement is malformed or later than
+        timeout seconds
+    """
+    acked = -1
+    async for frame in frames:
+        if frame[0] == MOVES:
+            sequence = int.from_bytes(frame[1:5], "little")
+            while sequence - acked > window:
+                acked = max(acked, await receive_ack(websocket, timeout))
+        await websocket.send_bytes(frame)
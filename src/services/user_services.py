@@ -103,7 +103,7 @@ class UserService:
     async def create_user(session: AsyncSession, user_in: UserCreate) -> UserWithMD | None:
         # convert user phone in the right format (only digits)
         user_in.phone = UserService.phone_convertor(user_in.phone)
-        user_in.password = hash_password(user_in.password)
+        user_in.password = await hash_password(user_in.password)
         logger.info("Start creating user: %s" % user_in)
         await UserService.validate_user_data(session, user_in)
         return await UserRepository.create_user(session, user_in)
@@ -113,6 +113,12 @@ class UserService:
         credentials = await UserRepository.get_user_credentials(session, user_login)
         return credentials
 
+    @staticmethod
+    async def update_password_hash(
+        session: AsyncSession, user_login: str, password_hash: str
+    ) -> None:
+        await UserRepository.update_password(session, user_login, password_hash)
+
     @staticmethod
     async def get_base_user_info_by_login(
         session: AsyncSession, user_login: str
@@ -0,0 +1,69 @@
+"""
+Shared fixtures.
+
+Tests of the engine need nothing. Tests marked with the db fixture run
+against the database of the DB_* variables, with its schema and reference
+rows (roles, statuses, element types and elements, actions) in place. All
+they write is rolled back. Without a reachable database they are skipped.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from benchmarks.seed import seed_course, seed_user
+from core.config import ROLE_SETTING
+from db.db_helper import db_helper
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # one loop for the whole run: pooled connections are bound to it
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(db_helper.dispose())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def run(event_loop):
+    """Run a coroutine to completion on the loop of the session."""
+    return event_loop.run_until_complete
+
+
+@pytest.fixture(scope="session")
+def database(run):
+    async def reachable() -> bool:
+        try:
+            async with db_helper.session_factory() as session:
+                await session.execute(text("select 1"))
+        except Exception:
+            return False
+        return True
+
+    if not run(reachable()):
+        pytest.skip("database is not reachable")
+
+
+@pytest.fixture
+def db(database, run):
+    """Session in a transaction that is rolled back after the test."""
+    session = db_helper.session_factory()
+    run(session.begin())
+    yield session
+    run(session.rollback())
+    run(session.close())
+
+
+@pytest.fixture
+def course(db, run) -> str:
+    """Course of a new teacher, in the rolled back transaction."""
+
+    async def create() -> str:
+        teacher = await seed_user(
+            db, "test_teacher", "-", role_id=ROLE_SETTING.teacher_role_id
+        )
+        return str(await seed_course(db, teacher, "Test course"))
+
+    return run(create())
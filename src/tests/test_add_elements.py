@@ -0,0 +1,90 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import app
+from core.config import GAME_SETTINGS
+from exceptions.AssignmentException import (
+    AssignmentElementDuplicateError,
+    AssignmentFieldEncodingError,
+)
+from repository.assignment_repo import AssignmentRepo
+from schemas.assignment_schema import AssignmentCreate
+from schemas.game_element_schema import GameElementCreate
+from services.assignments_sevices import AssignmentsService
+
+PIT = GAME_SETTINGS.generated_pit_element_id
+
+
+def element(assignment_id: str, x: int, y: int) -> GameElementCreate:
+    return GameElementCreate(
+        element_id=PIT,
+        name="pit",
+        assignment_id=assignment_id,
+        pos_x=x,
+        pos_y=y,
+    )
+
+
+@pytest.fixture
+def assignment(db, run, course) -> str:
+    created = run(
+        AssignmentsService.create_assignment(
+            AssignmentCreate(
+                course_id=course,
+                name="Test",
+                field_width=5,
+                field_height=5,
+                start_x=1,
+                start_y=1,
+                end_x=5,
+                end_y=5,
+            ),
+            db,
+        )
+    )
+    return str(created.assignment_id)
+
+
+def test_an_element_twice_in_one_request_is_refused(db, run, assignment):
+    with pytest.raises(AssignmentElementDuplicateError):
+        run(
+            AssignmentsService.add_elements(
+                [element(assignment, 2, 2), element(assignment, 3, 3)], db
+            )
+        )
+
+
+def test_an_element_already_on_the_assignment_is_refused(db, run, assignment):
+    run(AssignmentsService.add_elements([element(assignment, 2, 2)], db))
+    with pytest.raises(AssignmentElementDuplicateError):
+        run(AssignmentsService.add_elements([element(assignment, 3, 3)], db))
+
+
+def test_only_teachers_add_elements():
+    response = TestClient(app).post("/add_elements/", json=[])
+    assert response.status_code == 403
+
+
+def test_fields_out_of_the_binary_format_are_read_from_rows(
+    db, run, assignment
+):
+    action_id = run(
+        db.execute(
+            text(
+                "insert into action "
+                "(action_id, name, x_value_changes, y_value_changes) "
+                "select max(action_id) + 1, 'far jump', 300, 0 from action "
+                "returning action_id"
+            )
+        )
+    ).scalar_one()
+    run(AssignmentsService.set_actions([1, action_id], assignment, db))
+
+    assert run(AssignmentRepo.get_field_blobs([assignment], db)) == {
+        assignment: None
+    }
+    field = run(AssignmentsService.load_game_fields([assignment], db))
+    assert field[assignment].actions[action_id] == (300, 0)
+    with pytest.raises(AssignmentFieldEncodingError):
+        run(AssignmentsService.get_field_blob(assignment, db))
@@ -0,0 +1,33 @@
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app import app
+from core.config import AUTH_CONFIG, ROLE_SETTING
+from core.security import security
+
+
+def token(role_id: int) -> str:
+    return security.create_access_token(uid=str(["someone", role_id]))
+
+
+@pytest.mark.parametrize(
+    "role_id, course_uuid, code",
+    [
+        (None, str(uuid4()), 4401),
+        (ROLE_SETTING.user_role_id, str(uuid4()), 4403),
+        (ROLE_SETTING.teacher_role_id, "not-a-uuid", 4400),
+    ],
+)
+def test_refusals_reach_the_client_as_close_codes(role_id, course_uuid, code):
+    client = TestClient(app)
+    if role_id is not None:
+        client.cookies[AUTH_CONFIG.JWT_ACCESS_COOKIE_NAME] = token(role_id)
+    with (
+        client.websocket_connect(f"/course/{course_uuid}/live/") as socket,
+        pytest.raises(WebSocketDisconnect) as closed,
+    ):
+        socket.receive_json()
+    assert closed.value.code == code
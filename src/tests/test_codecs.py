@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from engine.field_codec import FieldCodecError, decode_field, encode_field
+from engine.game_field import GameField
+from engine.generator import PIT_TYPE, WALL_TYPE
+from engine.program import compile_program
+from engine.simulator import simulate
+from engine.trace_codec import (
+    END,
+    END_FRAME,
+    MOVES,
+    MOVES_HEADER,
+    OUTCOMES,
+    RUN,
+    START,
+    START_FRAME,
+    run_frames,
+)
+from services.trace_stream import produce_frames
+
+ACTIONS = {1: (1, 0), 2: (-1, 0), 3: (0, 1), 4: (0, -1), 5: (0, 0), 7: (2, -1)}
+
+
+def random_field(rng: random.Random) -> GameField:
+    width, height = rng.randint(1, 12), rng.randint(1, 12)
+    cells = bytearray(
+        rng.choice((0, 0, 0, PIT_TYPE, WALL_TYPE))
+        for _ in range(width * height)
+    )
+    start = (rng.randint(1, width), rng.randint(1, height))
+    end = (rng.randint(1, width), rng.randint(1, height))
+    # obstacles are never placed on the start cell
+    cells[(start[1] - 1) * width + start[0] - 1] = 0
+    return GameField(width, height, start, end, cells, ACTIONS)
+
+
+def decode_frames(frames: list[bytes]) -> tuple:
+    """Trace and (outcome, x, y, steps) back from the frames of a run."""
+    kind, x, y, _ = START_FRAME.unpack(frames[0])
+    assert kind == START
+    trace = [(x, y)]
+    for sequence, frame in enumerate(frames[1:-1]):
+        assert MOVES_HEADER.unpack_from(frame) == (MOVES, sequence)
+        for dx, dy, run in RUN.iter_unpack(frame[MOVES_HEADER.size :]):
+            for _ in range(run):
+                x, y = x + dx, y + dy
+                trace.append((x, y))
+    kind, outcome, x, y, steps = END_FRAME.unpack(frames[-1])
+    assert kind == END
+    return trace, (OUTCOMES[outcome], x, y, steps)
+
+
+def test_field_round_trip():
+    rng = random.Random(4)
+    for _ in range(200):
+        field = random_field(rng)
+        decoded = decode_field(encode_field(field))
+        assert (decoded.width, decoded.height) == (field.width, field.height)
+        assert (decoded.start, decoded.end) == (field.start, field.end)
+        assert bytes(decoded.cells) == bytes(field.cells)
+        assert decoded.actions == field.actions
+        assert decoded.fingerprint == field.fingerprint
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda blob: blob[:5],
+        lambda blob: b"XXXX" + blob[4:],
+        lambda blob: blob[:4] + b"\x09" + blob[5:],
+        lambda blob: blob + b"\x00",
+        lambda blob: blob[:-1],
+    ],
+)
+def test_damaged_field_blobs_are_rejected(damage):
+    field = random_field(random.Random(5))
+    with pytest.raises(FieldCodecError):
+        decode_field(damage(encode_field(field)))
+
+
+def frames_of(field: GameField, program, frame_runs: int) -> list[bytes]:
+    frames = []
+    run_frames(field, compile_program(program), frame_runs, frames.append)
+    return frames
+
+
+def test_trace_frames_round_trip():
+    rng = random.Random(6)
+    for _ in range(200):
+        field = random_field(rng)
+        program = rng.choices(list(ACTIONS), k=rng.randint(0, 60))
+        # long runs of one move
+        program += [rng.choice(list(ACTIONS))] * rng.randint(0, 300)
+        expected = simulate(field, program)
+        frame_runs = rng.randint(1, 4)
+        frames = frames_of(field, program, frame_runs)
+        assert all(
+            len(frame) <= MOVES_HEADER.size + frame_runs * RUN.size
+            for frame in frames[1:-1]
+        )
+        trace, end = decode_frames(frames)
+        assert trace == expected.trace
+        assert end == (
+            expected.outcome,
+            expected.x,
+            expected.y,
+            expected.steps,
+        )
+
+
+def test_runs_longer_than_a_record_are_split():
+    field = GameField(2, 1, (1, 1), (2, 1), bytes(2), ACTIONS)
+    program = [5] * 70000 + [1]
+    frames = frames_of(field, program, 2)
+    # runs of 65535 and 4465 stays, then the move
+    assert len(frames) == 4
+    trace, end = decode_frames(frames)
+    assert trace == simulate(field, program).trace
+    assert end[1:] == (2, 1, 70001)
+
+
+def test_frames_are_produced_off_the_loop(run):
+    field = random_field(random.Random(7))
+    program = [1, 1, 3, 3, 5, 2] * 50
+
+    async def produce() -> list[bytes]:
+        bytecode = compile_program(program)
+        return [frame async for frame in produce_frames(field, bytecode, 3)]
+
+    assert run(produce()) == frames_of(field, program, 3)
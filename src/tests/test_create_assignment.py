@@ -0,0 +1,36 @@
+from uuid import uuid4
+
+import pytest
+
+from exceptions.AssignmentException import AssignmentException
+from exceptions.CourseException import CourseNotFoundException
+from schemas.assignment_schema import AssignmentCreate
+from services.assignments_sevices import AssignmentsService
+
+
+def assignment(course_id: str, **changes) -> AssignmentCreate:
+    return AssignmentCreate(
+        course_id=course_id,
+        name="Test",
+        field_width=5,
+        field_height=5,
+        start_x=1,
+        start_y=1,
+        end_x=5,
+        end_y=5,
+        **changes,
+    )
+
+
+def test_unknown_course_is_not_found(db, run):
+    with pytest.raises(CourseNotFoundException):
+        run(AssignmentsService.create_assignment(assignment(str(uuid4())), db))
+
+
+def test_other_foreign_keys_are_not_a_missing_course(db, run, course):
+    with pytest.raises(AssignmentException):
+        run(
+            AssignmentsService.create_assignment(
+                assignment(course, status_id=10_000), db
+            )
+        )
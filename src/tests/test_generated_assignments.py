@@ -0,0 +1,47 @@
+from core.config import STATUS_OF_ELEMENTS_SETTINGS
+from engine.field_codec import decode_field
+from engine.game_field import PIT, WALL, GameField
+from engine.generator import LevelSpec, generate_batch
+from repository.assignment_repo import AssignmentRepo
+
+
+def test_generated_levels_with_repeated_obstacles_persist(db, run, course):
+    actions = run(AssignmentRepo.get_action_vectors([1, 2, 3, 4], db))
+    spec = LevelSpec(
+        width=8,
+        height=8,
+        actions=actions,
+        min_steps=1,
+        max_steps=100,
+        obstacle_density=0.3,
+        pit_share=0.5,
+    )
+    levels = generate_batch(spec, attempts=50, seed=1)[:5]
+    assert levels
+    for level in levels:
+        kinds = GameField(
+            level.width, level.height, level.start, level.end, level.cells, {}
+        ).kinds
+        assert kinds.count(PIT) >= 2 and kinds.count(WALL) >= 2
+
+    created = run(
+        AssignmentRepo.create_generated_assignments(
+            course_uuid=course,
+            levels=levels,
+            actions=actions,
+            name_prefix="Generated",
+            description=None,
+            status_id=STATUS_OF_ELEMENTS_SETTINGS.draft,
+            session=db,
+        )
+    )
+
+    ids = [str(assignment.assignment_id) for assignment in created]
+    fields = run(AssignmentRepo.get_fields_data(ids, db))
+    blobs = run(AssignmentRepo.get_field_blobs(ids, db))
+    for assignment_id, level in zip(ids, levels, strict=True):
+        stored = GameField.from_field_data(fields[assignment_id])
+        assert (stored.start, stored.end) == (level.start, level.end)
+        assert stored.cells == level.cells
+        assert stored.actions == actions
+        assert decode_field(blobs[assignment_id]).cells == level.cells
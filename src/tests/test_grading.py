@@ -0,0 +1,34 @@
+from uuid import uuid4
+
+from engine.cache import GRADE_CACHE
+from engine.game_field import GameField
+from engine.interpreter import grade_submitted
+from services.grading_services import GradingService
+
+FIELD = GameField(4, 1, (1, 1), (4, 1), bytes(4), {1: (1, 0)})
+REPEAT = {"main": [{"repeat": 3, "body": [{"action": 1}]}]}
+PROCEDURE = {
+    "main": [{"call": "step"}, {"action": 1}, {"call": "step"}],
+    "procedures": {"step": [{"action": 1}]},
+}
+
+
+def test_equivalent_programs_share_a_fingerprint():
+    _, fingerprints, results = grade_submitted(
+        FIELD, [[1, 1, 1], REPEAT, PROCEDURE, {"main": [{"call": "x"}]}]
+    )
+    assert fingerprints[0] == fingerprints[1] == fingerprints[2]
+    assert fingerprints[3] is None
+    assert results[0] == results[1] == results[2]
+
+
+def test_equivalent_programs_share_cached_results(run):
+    assignment_id = str(uuid4())
+    result = run(GradingService.grade_one(assignment_id, FIELD, [1, 1, 1]))
+    hits = GRADE_CACHE.hits
+    for program in (REPEAT, PROCEDURE):
+        assert run(
+            GradingService.grade_one(assignment_id, FIELD, program)
+        ) == result
+    assert GRADE_CACHE.hits == hits + 2
+    assert GRADE_CACHE.invalidate(assignment_id) == 1
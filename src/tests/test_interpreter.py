@@ -0,0 +1,100 @@
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from core.config import PROGRAM_SETTINGS
+from engine.game_field import GameField
+from engine.generator import PIT_TYPE, WALL_TYPE
+from engine.interpreter import execute
+from engine.program import compile_program
+from engine.simulator import Outcome, simulate
+from schemas.simulation_schema import ProgramRun
+
+ACTIONS = {1: (1, 0), 2: (-1, 0), 3: (0, -1), 4: (0, 1), 5: (0, 0), 6: (2, 1)}
+
+
+def random_field(rng: random.Random) -> GameField:
+    cells = bytearray(
+        rng.choice((0, 0, 0, PIT_TYPE, WALL_TYPE)) for _ in range(64)
+    )
+    cells[0] = cells[63] = 0
+    return GameField(8, 8, (1, 1), (8, 8), cells, ACTIONS)
+
+
+def random_block(rng: random.Random, depth: int, calls=("a", "b")) -> dict:
+    if depth < 3 and rng.random() < 0.25:
+        return {
+            "repeat": rng.randint(0, 5),
+            "body": [
+                random_block(rng, depth + 1, calls)
+                for _ in range(rng.randint(1, 3))
+            ],
+        }
+    if calls and rng.random() < 0.3:
+        return {"call": rng.choice(calls)}
+    return {"action": rng.choice([1, 2, 3, 4, 5, 6, 9])}
+
+
+def flatten(blocks: list, procedures: dict) -> list[int]:
+    """Program of the blocks as the plain action list of simulate."""
+    program = []
+    for block in blocks:
+        if "action" in block:
+            program.append(block["action"])
+        elif "repeat" in block:
+            program += flatten(block["body"], procedures) * block["repeat"]
+        else:
+            program += flatten(procedures[block["call"]], procedures)
+    return program
+
+
+def assert_same_run(field: GameField, program, flat: list[int]) -> None:
+    bytecode = compile_program(program)
+    for with_trace in (True, False):
+        expected = simulate(field, flat, with_trace=with_trace)
+        result = execute(field, bytecode, with_trace=with_trace)
+        assert (result.outcome, result.x, result.y, result.steps) == (
+            expected.outcome,
+            expected.x,
+            expected.y,
+            expected.steps,
+        )
+        assert result.trace == expected.trace
+
+
+def test_flat_programs_run_like_the_simulator():
+    rng = random.Random(1)
+    for _ in range(500):
+        field = random_field(rng)
+        program = [rng.choice([1, 2, 3, 4, 5, 6, 9]) for _ in range(40)]
+        program = program[: rng.randint(0, 40)]
+        assert_same_run(field, program, program)
+
+
+def test_structured_programs_run_like_their_expansion():
+    rng = random.Random(2)
+    for _ in range(500):
+        field = random_field(rng)
+        procedures = {
+            "a": [random_block(rng, 1, calls=("b",)) for _ in range(2)],
+            "b": [random_block(rng, 2, calls=()) for _ in range(2)],
+        }
+        main = [random_block(rng, 0) for _ in range(rng.randint(1, 5))]
+        program = {"main": main, "procedures": procedures}
+        assert_same_run(field, program, flatten(main, procedures))
+
+
+def test_long_loops_end_with_the_step_limit():
+    field = GameField(2, 1, (1, 1), (2, 1), bytes(2), ACTIONS)
+    program = {"main": [{"repeat": 10000, "body": [{"action": 5}] * 2}]}
+    result = execute(field, compile_program(program), max_steps=1000)
+    assert result.outcome == Outcome.STEP_LIMIT
+    assert result.steps == 1000
+
+
+def test_plain_programs_are_bounded():
+    longest = [1] * PROGRAM_SETTINGS.max_length
+    assert ProgramRun(program=longest).program == longest
+    with pytest.raises(ValidationError):
+        ProgramRun(program=longest + [1])
@@ -0,0 +1,114 @@
+from datetime import UTC, datetime, timedelta
+
+from services.classroom_hub import ClassroomHub
+from services.leaderboard import EMPTY_VERSION, CourseLeaderboard, Leaderboards
+
+T0 = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def at(minutes: int) -> datetime:
+    return T0 + timedelta(minutes=minutes)
+
+
+def places(board: CourseLeaderboard) -> list[str]:
+    return [place["user_login"] for place in board.top(100)]
+
+
+def test_ranking_by_solved_then_steps_then_time():
+    board = CourseLeaderboard()
+    board.apply("slow", "a1", True, 10, at(1))
+    board.apply("slow", "a2", True, 10, at(1))
+    board.apply("late", "a1", True, 5, at(9))
+    board.apply("late", "a2", True, 5, at(9))
+    board.apply("early", "a1", True, 5, at(2))
+    board.apply("early", "a2", True, 5, at(3))
+    board.apply("one", "a1", True, 1, at(0))
+    board.apply("none", "a1", False, None, None)
+
+    assert places(board) == ["early", "late", "slow", "one"]
+    top = board.top(2)
+    assert [place["place"] for place in top] == [1, 2]
+    assert top[0] == {
+        "place": 1,
+        "user_login": "early",
+        "solved": 2,
+        "total_steps": 10,
+        "reached_at": at(3),
+    }
+
+
+def test_updates_move_users():
+    board = CourseLeaderboard()
+    board.apply("ann", "a1", True, 8, at(1))
+    board.apply("bob", "a1", True, 9, at(2))
+    assert places(board) == ["ann", "bob"]
+
+    version = board.version
+    assert board.apply("bob", "a1", True, 7, at(3))
+    assert places(board) == ["bob", "ann"]
+    assert board.version != version
+    version = board.version
+    # the same state again changes nothing
+    assert not board.apply("bob", "a1", True, 7, at(3))
+    assert board.version == version
+
+    board.apply("ann", "a2", True, 30, at(4))
+    assert places(board) == ["ann", "bob"]
+
+    board.apply("ann", "a2", False, None, None)
+    board.apply("ann", "a1", False, None, None)
+    assert places(board) == ["bob"] and len(board) == 1
+
+    board.forget_assignment("a1")
+    assert places(board) == [] and len(board) == 0
+    assert board.version == EMPTY_VERSION
+
+
+def test_boards_with_the_same_entries_have_the_same_version():
+    # a worker that saw every change and one started later
+    seen = CourseLeaderboard()
+    seen.apply("ann", "a1", True, 9, at(1))
+    seen.apply("ann", "a1", True, 8, at(2))
+    seen.apply("bob", "a2", True, 3, at(3))
+    seen.apply("bob", "a1", True, 4, at(4))
+    seen.forget_assignment("a2")
+    rebuilt = CourseLeaderboard()
+    rebuilt.apply("bob", "a1", True, 4, at(4))
+    rebuilt.apply("ann", "a1", True, 8, at(2))
+
+    assert seen.version == rebuilt.version
+    assert places(seen) == places(rebuilt)
+
+
+def test_hub_messages_reach_the_boards_of_the_worker():
+    course_id = "00000000-0000-0000-0000-000000000001"
+    assignment_id = "00000000-0000-0000-0000-0000000000a1"
+    boards = Leaderboards()
+    hub = ClassroomHub(channel="test", listen=False, max_outbox=10)
+    hub.add_listener(boards.apply_message)
+    entry = {
+        "course_id": course_id,
+        "user_login": "ann",
+        "assignment_id": assignment_id,
+        "attempts": 2,
+        "solved": True,
+        "best_steps": 8,
+        "best_at": at(1),
+        "last_outcome": "SOLVED",
+        "last_attempt_at": at(1),
+    }
+
+    # a flush committed while the journal was read is applied again
+    with boards.replaying():
+        hub.publish([entry])
+        boards.rebuild([])
+    board = boards.find(course_id)
+    assert places(board) == ["ann"]
+    assert board.top(1)[0]["reached_at"] == at(1)
+    rebuilt = CourseLeaderboard()
+    rebuilt.apply("ann", assignment_id, True, 8, at(1))
+    assert boards.etag(course_id) == f'"{rebuilt.version}"'
+
+    hub.forget_assignment(assignment_id)
+    assert places(board) == []
+    assert boards.etag(course_id) == f'"{EMPTY_VERSION}"'
@@ -0,0 +1,57 @@
+import pytest
+
+from commands.level_library import import_fields
+from core.config import STATUS_OF_ELEMENTS_SETTINGS
+from engine.field_codec import encode_field
+from engine.game_field import GameField
+from engine.generator import PIT_TYPE, WALL_TYPE
+from engine.level_library import (
+    LevelLibrary,
+    LevelLibraryError,
+    write_library,
+)
+from repository.assignment_repo import AssignmentRepo
+
+
+def make_field(shift: int, actions: dict) -> GameField:
+    cells = bytearray(36)
+    for index in (7, 8, 14):
+        cells[index + shift] = PIT_TYPE
+    for index in (20, 21, 27):
+        cells[index + shift] = WALL_TYPE
+    return GameField(6, 6, (1, 1), (6, 6), cells, actions)
+
+
+def test_library_import_round_trip(db, run, course, tmp_path):
+    actions = run(AssignmentRepo.get_action_vectors([1, 2, 3, 4], db))
+    fields = [make_field(shift, actions) for shift in range(3)]
+    path = tmp_path / "pack.lvl"
+    assert write_library(path, ((field, None) for field in fields)) == 3
+
+    with LevelLibrary(path) as library:
+        imported = list(library)
+    ids = run(
+        import_fields(
+            db,
+            course_uuid=course,
+            fields=imported,
+            names=[f"Level {number}" for number in range(1, 4)],
+            description="imported",
+            status_id=STATUS_OF_ELEMENTS_SETTINGS.draft,
+        )
+    )
+
+    assert len(ids) == 3
+    stored = run(AssignmentRepo.get_fields_data(ids, db))
+    blobs = run(AssignmentRepo.get_field_blobs(ids, db))
+    for assignment_id, field in zip(ids, fields, strict=True):
+        from_rows = GameField.from_field_data(stored[assignment_id])
+        assert from_rows.fingerprint == field.fingerprint
+        assert blobs[assignment_id] == encode_field(field)
+
+
+def test_empty_library_file_is_rejected(tmp_path):
+    path = tmp_path / "empty.lvl"
+    path.touch()
+    with pytest.raises(LevelLibraryError):
+        LevelLibrary(path)
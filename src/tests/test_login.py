@@ -0,0 +1,24 @@
+from benchmarks.seed import seed_user
+from core.config import ROLE_SETTING
+from schemas.user_schema import UserLogin
+from utils.user_utils.hash import hash_password
+from utils.user_utils.user_security import authentication
+
+
+def test_role_comes_from_the_stored_user(db, run):
+    run(seed_user(db, "test_student", run(hash_password("secret"))))
+    credentials = UserLogin.model_validate(
+        {
+            "user_login": "test_student",
+            "password": "secret",
+            "role_id": ROLE_SETTING.teacher_role_id,
+        }
+    )
+
+    assert not hasattr(credentials, "role_id")
+    assert (
+        run(authentication(db, credentials.user_login, credentials.password))
+        == ROLE_SETTING.user_role_id
+    )
+    assert run(authentication(db, "test_student", "wrong")) is None
+    assert run(authentication(db, "nobody", "secret")) is None
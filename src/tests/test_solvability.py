@@ -0,0 +1,13 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app import app
+
+
+def test_solutions_and_hints_need_a_login():
+    client = TestClient(app)
+    assignment = uuid4()
+    assert client.get(f"/solvability/{assignment}/").status_code == 401
+    response = client.get(f"/hint/{assignment}/", params={"x": 1, "y": 1})
+    assert response.status_code == 401
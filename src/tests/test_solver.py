@@ -0,0 +1,65 @@
+import random
+from itertools import product
+
+from engine.game_field import GameField
+from engine.generator import PIT_TYPE, WALL_TYPE
+from engine.simulator import simulate
+from engine.solver import solve
+
+ACTIONS = {1: (1, 0), 2: (-1, 0), 3: (0, 1), 4: (2, 1)}
+# longest programs tried by brute force
+MAX_LENGTH = 6
+
+
+def random_field(rng: random.Random) -> GameField:
+    cells = bytearray(
+        rng.choice((0, 0, PIT_TYPE, WALL_TYPE)) for _ in range(16)
+    )
+    start, end = rng.sample(list(product(range(1, 5), repeat=2)), 2)
+    for x, y in (start, end):
+        cells[(y - 1) * 4 + x - 1] = 0
+    return GameField(4, 4, start, end, cells, ACTIONS)
+
+
+def shortest_by_brute_force(field: GameField) -> int | None:
+    for length in range(MAX_LENGTH + 1):
+        for program in product(ACTIONS, repeat=length):
+            if simulate(field, program, with_trace=False).solved:
+                return length
+    return None
+
+
+def test_solutions_are_shortest_programs():
+    rng = random.Random(3)
+    reachable = unreachable = 0
+    for _ in range(60):
+        field = random_field(rng)
+        solution = solve(field)
+        expected = shortest_by_brute_force(field)
+        if solution.reachable:
+            reachable += 1
+            result = simulate(field, solution.program)
+            assert result.solved and result.steps == solution.optimal_steps
+            assert len(solution.program) == solution.optimal_steps
+            if solution.optimal_steps <= MAX_LENGTH:
+                assert expected == solution.optimal_steps
+            else:
+                assert expected is None
+        else:
+            unreachable += 1
+            assert solution.optimal_steps is None and solution.program is None
+            assert expected is None
+    assert reachable and unreachable
+
+
+def test_start_on_the_goal_needs_no_steps():
+    field = GameField(2, 2, (1, 1), (1, 1), bytes(4), ACTIONS)
+    solution = solve(field)
+    assert solution.reachable and solution.optimal_steps == 0
+    assert solution.program == ()
+
+
+def test_goal_behind_pits_is_unreachable():
+    cells = bytes([0, PIT_TYPE, 0])
+    field = GameField(3, 1, (1, 1), (3, 1), cells, {1: (1, 0)})
+    assert not solve(field).reachable
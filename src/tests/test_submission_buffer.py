@@ -0,0 +1,114 @@
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+import services.submission_buffer as submission_buffer
+from services.submission_buffer import SubmissionBuffer
+
+
+class FakeTable:
+    """SubmissionRepo.insert_submissions over a dict, failing on demand."""
+
+    def __init__(self):
+        self.rows = {}
+        self.refused: set[str] = set()
+        self.unavailable = False
+        self.calls = 0
+
+    async def insert_submissions(self, rows, session):
+        self.calls += 1
+        if self.unavailable:
+            raise OperationalError("insert", {}, ConnectionError("down"))
+        if any(row["user_login"] in self.refused for row in rows):
+            raise IntegrityError("insert", {}, Exception("foreign key"))
+        new = [row for row in rows if row["submission_id"] not in self.rows]
+        for row in new:
+            self.rows[row["submission_id"]] = row
+        return len(new), [{"user_login": row["user_login"]} for row in new]
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+
+    @asynccontextmanager
+    async def unit_of_work(session_factory):
+        yield None
+
+    monkeypatch.setattr(submission_buffer, "UnitOfWork", unit_of_work)
+    monkeypatch.setattr(
+        submission_buffer.SubmissionRepo,
+        "insert_submissions",
+        table.insert_submissions,
+    )
+    return table
+
+
+def row(user_login: str) -> dict:
+    return {
+        "submission_id": str(uuid4()),
+        "user_login": user_login,
+        "assignment_id": "a",
+    }
+
+
+def make_buffer(max_pending_rows: int = 100) -> SubmissionBuffer:
+    return SubmissionBuffer(
+        flush_interval=60, flush_rows=1000, max_pending_rows=max_pending_rows
+    )
+
+
+def test_refused_rows_are_dropped_and_the_rest_written(table, run):
+    buffer = make_buffer()
+    notified = []
+    buffer.add_listener(notified.extend)
+    table.refused = {"deleted"}
+    rows = [row("kid") for _ in range(10)]
+    rows[3] = row("deleted")
+    rows[7] = row("deleted")
+    for submission in rows:
+        buffer.add(submission)
+
+    assert run(buffer.flush()) == 8
+    assert set(table.rows) == {
+        r["submission_id"] for r in rows if r["user_login"] == "kid"
+    }
+    assert buffer.stats() == {
+        "pending": 0,
+        "written": 8,
+        "failed_flushes": 0,
+        "dropped": 2,
+    }
+    assert len(notified) == 8
+
+    # the next flush isn't affected
+    buffer.add(row("kid"))
+    assert run(buffer.flush()) == 1
+
+
+def test_unavailable_database_keeps_rows_until_it_is_back(table, run):
+    buffer = make_buffer(max_pending_rows=3)
+    table.unavailable = True
+    for _ in range(3):
+        buffer.add(row("kid"))
+    assert run(buffer.flush()) == 0
+    assert buffer.stats()["pending"] == 3
+    assert buffer.failed_flushes == 1
+    with pytest.raises(submission_buffer.SubmissionBufferFullError):
+        buffer.add(row("kid"))
+
+    table.unavailable = False
+    assert run(buffer.flush()) == 3
+    assert buffer.stats()["pending"] == 0
+    assert buffer.dropped == 0
+
+
+def test_retry_after_a_lost_commit_does_not_duplicate(table, run):
+    buffer = make_buffer()
+    submission = row("kid")
+    table.rows[submission["submission_id"]] = submission
+    buffer.add(submission)
+    assert run(buffer.flush()) == 0
+    assert buffer.written == 0 and len(table.rows) == 1
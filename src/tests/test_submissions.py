@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.seed import ADD_USER_TO_COURSE, seed_assignment, seed_user
+from exceptions.SubmissionException import SubmissionForbiddenError
+from schemas.submission_schema import SubmissionCreate
+from services.submission_buffer import SUBMISSION_BUFFER
+from services.submission_services import SubmissionService
+
+
+def test_only_users_on_the_course_submit(db, run, course):
+    assignment = run(seed_assignment(db, course, width=5, height=5))
+    for user_login in ("test_member", "test_outsider"):
+        run(seed_user(db, user_login, "-"))
+    run(
+        db.execute(
+            ADD_USER_TO_COURSE,
+            {"course_id": course, "user_login": "test_member"},
+        )
+    )
+    submission = SubmissionCreate(assignment_id=assignment, program=[1, 4])
+
+    with pytest.raises(SubmissionForbiddenError):
+        run(SubmissionService.submit("test_outsider", submission, db))
+
+    accepted = run(SubmissionService.submit("test_member", submission, db))
+    assert accepted.user_login == "test_member"
+    assert run(SUBMISSION_BUFFER.discard(str(accepted.submission_id)))
@@ -0,0 +1,23 @@
+import pytest
+
+from exceptions.ValidationException import UUIDValidationException
+from services.assignments_sevices import AssignmentsService
+from utils.uuid_checker import normalize_uuid
+
+UUID = "0b5e2a4c-7d1f-4e8a-9c3b-2f6d8e1a5b7c"
+
+
+def test_forms_of_one_uuid_normalize_to_one_key():
+    assert normalize_uuid(UUID.replace("-", "")) == UUID
+    assert normalize_uuid(UUID) == UUID
+
+
+@pytest.mark.parametrize("length", [33, 34, 35])
+def test_lengths_between_the_forms_are_rejected(length):
+    with pytest.raises(UUIDValidationException):
+        normalize_uuid("a" * length)
+
+
+def test_hint_for_a_malformed_uuid_is_a_validation_error(run):
+    with pytest.raises(UUIDValidationException):
+        run(AssignmentsService.get_hint("a" * 33, 1, 1, session=None))
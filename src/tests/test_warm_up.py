@@ -0,0 +1,16 @@
+from sqlalchemy import text
+
+from db.db_helper import db_helper
+
+STATEMENTS = {
+    "select": text("select count(*) from course where course_id = :id"),
+    # fails on the null, after it was prepared
+    "insert": text("insert into course (name) values (:name)"),
+    "broken": text("select nope from nowhere where x = :x"),
+}
+
+
+def test_only_statements_that_cannot_be_prepared_fail(database, run):
+    failed = run(db_helper.warm_up(STATEMENTS, connections=2))
+    assert set(failed) == {"broken"}
+    assert "nowhere" in failed["broken"]
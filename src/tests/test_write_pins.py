@@ -0,0 +1,32 @@
+from time import sleep, time
+
+from fastapi import Request, Response
+
+from db.db_helper import WritePins
+
+
+def request_with(cookie: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(b"cookie", cookie.encode())],
+        }
+    )
+
+
+def test_pin_is_a_cookie_that_runs_out():
+    pins = WritePins(window=0.05, cookie_name="pin")
+    response = Response()
+    pins.pin(response)
+    cookie = response.headers["set-cookie"].split(";")[0]
+    assert pins.is_pinned(request_with(cookie))
+
+    sleep(0.06)
+    assert not pins.is_pinned(request_with(cookie))
+
+
+def test_foreign_pin_values_are_ignored():
+    pins = WritePins(window=0.05, cookie_name="pin")
+    assert not pins.is_pinned(request_with(""))
+    assert not pins.is_pinned(request_with("pin=soon"))
+    assert not pins.is_pinned(request_with("pin=%.3f" % (time() + 3600)))
@@ -1,6 +1,11 @@
 from core.config import VALIDATION_SETTINGS
-from exceptions.AssignmentException import AssignmentPositionError
+from exceptions.AssignmentException import (
+    AssignmentPositionError,
+    AssignmentElementDuplicateError,
+    AssignmentElementFieldError,
+)
 from schemas.assignment_schema import AssignmentCreate
+from schemas.game_element_schema import GameElementCreate
 
 MIN_FIELD_VALUE = VALIDATION_SETTINGS.counting_field_from
 
@@ -60,3 +65,62 @@ def position_validator(assignment_in: AssignmentCreate) -> bool:
         )
 
     return True
+
+
+def elements_placement_validator(
+    game_field: dict, elements: list[GameElementCreate]
+) -> bool:
+    """
+    Check new elements of one assignment in memory, before any insert.
+    Every element must be inside the field and on a free cell: not on the
+    start or end position, not on an element that is already placed and
+    not on another new element. An element can be placed on an assignment
+    once (primary key element_id, assignment_id).
+
+    :param game_field: field size, start/end, occupied cells and placed
+        elements (see AssignmentRepo.get_game_fields)
+    :param elements: new elements of this field
+    :return: True, raises AssignmentElementFieldError for a bad cell and
+        AssignmentElementDuplicateError for an element placed twice
+    """
+    width = game_field["field_width"]
+    height = game_field["field_height"]
+
+    # occupancy grid, one byte per cell, row by row
+    occupied = bytearray(width * height)
+    taken = zip(
+        game_field["occupied_x"], game_field["occupied_y"], strict=True
+    )
+    for x, y in (
+        *taken,
+        (game_field["start_x"], game_field["start_y"]),
+        (game_field["end_x"], game_field["end_y"]),
+    ):
+        if MIN_FIELD_VALUE <= x <= width and MIN_FIELD_VALUE <= y <= height:
+            occupied[(y - MIN_FIELD_VALUE) * width + x - MIN_FIELD_VALUE] = 1
+
+    placed = set(game_field["placed_element_ids"])
+    for element in elements:
+        if element.element_id in placed:
+            raise AssignmentElementDuplicateError(
+                f"Element {element.element_id} is placed on assignment "
+                f"{element.assignment_id} more than once."
+            )
+        placed.add(element.element_id)
+
+        x, y = element.pos_x, element.pos_y
+        if not (
+            MIN_FIELD_VALUE <= x <= width and MIN_FIELD_VALUE <= y <= height
+        ):
+            raise AssignmentElementFieldError(
+                f"Element at ({x}, {y}) is outside of the {width}x{height} "
+                "field."
+            )
+        cell = (y - MIN_FIELD_VALUE) * width + x - MIN_FIELD_VALUE
+        if occupied[cell]:
+            raise AssignmentElementFieldError(
+                f"Cell ({x}, {y}) is already occupied."
+            )
+        occupied[cell] = 1
+
+    return True
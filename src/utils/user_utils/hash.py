@@ -1,11 +1,126 @@
+"""
+Password hashing with scrypt (hashlib, OpenSSL) in a thread pool.
+
+scrypt releases the GIL, so a few threads hash in parallel while the event
+loop keeps serving requests; the pool bounds how many hashes (16 MiB of
+memory each with the default parameters) run at once, the rest wait in its
+queue.
+
+Stored format: scrypt$<n>$<r>$<p>$<salt, base64>$<hash, base64>. Digests of
+the old scheme, hex sha3-256 of password + SALT + a new line (what
+`echo "..." | sha3-256sum` printed), are still accepted and replaced on the
+next successful login, see verify_password().
+"""
+
+import asyncio
+import hashlib
+from base64 import b64decode, b64encode
+from concurrent.futures import ThreadPoolExecutor
+from hmac import compare_digest
+from os import urandom
+
 from core.config import CREDENTIALS_CONFIG
-from subprocess import getoutput
 
 from logger.logger_module import ModuleLoger
 from pathlib import Path
 
+logger = ModuleLoger(Path(__file__).stem)
+
+SCHEME = "scrypt"
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """Threads of password hashing, started on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=CREDENTIALS_CONFIG.hash_workers,
+            thread_name_prefix="password-hash",
+        )
+    return _executor
+
+
+def shutdown_hash_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def _peppered(password: str) -> bytes:
+    return (password + (CREDENTIALS_CONFIG.salt or "")).encode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        _peppered(password),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=CREDENTIALS_CONFIG.scrypt_maxmem,
+        dklen=CREDENTIALS_CONFIG.scrypt_dklen,
+    )
+
+
+def legacy_hash(password: str) -> str:
+    """Digest of the old scheme, only used to check stored ones."""
+    return hashlib.sha3_256(
+        (password + (CREDENTIALS_CONFIG.salt or "") + "\n").encode()
+    ).hexdigest()
+
+
+def hash_password_sync(password: str) -> str:
+    n = CREDENTIALS_CONFIG.scrypt_n
+    r = CREDENTIALS_CONFIG.scrypt_r
+    p = CREDENTIALS_CONFIG.scrypt_p
+    salt = urandom(CREDENTIALS_CONFIG.salt_bytes)
+    digest = _scrypt(password, salt, n, r, p)
+    return "$".join(
+        (
+            SCHEME,
+            str(n),
+            str(r),
+            str(p),
+            b64encode(salt).decode(),
+            b64encode(digest).decode(),
+        )
+    )
+
+
+def verify_password_sync(password: str, stored: str) -> tuple[bool, bool]:
+    """
+    :return: whether the password matches, and whether the stored hash
+        should be replaced (old scheme or other scrypt parameters)
+    """
+    if not stored.startswith(SCHEME + "$"):
+        return compare_digest(legacy_hash(password), stored), True
+    try:
+        _, n, r, p, salt, digest = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        salt, digest = b64decode(salt), b64decode(digest)
+    except ValueError:
+        logger.error("Malformed password hash")
+        return False, False
+    matches = compare_digest(_scrypt(password, salt, n, r, p), digest)
+    outdated = (n, r, p) != (
+        CREDENTIALS_CONFIG.scrypt_n,
+        CREDENTIALS_CONFIG.scrypt_r,
+        CREDENTIALS_CONFIG.scrypt_p,
+    )
+    return matches, outdated
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(
+        get_hash_executor(), hash_password_sync, password
+    )
+
 
-def hash_password(password: str) -> str:
-    password = password + CREDENTIALS_CONFIG.salt
-    password = getoutput(f'echo "{password}" | sha3-256sum')[:-3]
-    return password
+async def verify_password(password: str, stored: str) -> tuple[bool, bool]:
+    """verify_password_sync() in the hashing threads."""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_hash_executor(), verify_password_sync, password, stored
+    )
@@ -1,6 +1,3 @@
-import hashlib
-from subprocess import getoutput
-
 from schemas.user_schema import UserCreate, UserWithMD
 from services.user_services import UserService
 
@@ -10,24 +7,46 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from pathlib import Path
 
-from core.config import CREDENTIALS_CONFIG
-from utils.user_utils.hash import hash_password
+from utils.user_utils.hash import hash_password, verify_password
+
+logger = ModuleLoger(Path(__file__).stem)
+
+
+_dummy_hash: str | None = None
+
+
+async def dummy_hash() -> str:
+    """Return the hash unknown logins are checked against, for equal timing."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await hash_password("")
+    return _dummy_hash
 
 
 async def authentication(
     session: AsyncSession, login_in: str, password_in: str
-) -> bool:
+) -> int | None:
+    """
+    Check the password and return the stored role of the user, None if the
+    login or the password is wrong. A hash of the old scheme or with
+    outdated parameters is replaced once the password is known to be right.
+    """
     user_credentials = await UserService.get_user_credentials(
         session, login_in
     )
-    password_in = hash_password(password_in)
     if not user_credentials or (user_credentials.user_login != login_in):
-        return False
+        await verify_password(password_in, await dummy_hash())
+        return None
 
-    if password_in == user_credentials.password:
-        return True
-    else:
-        return False
+    matches, outdated = await verify_password(
+        password_in, user_credentials.password
+    )
+    if matches and outdated:
+        await UserService.update_password_hash(
+            session, login_in, await hash_password(password_in)
+        )
+        logger.info("Password hash of %s upgraded" % login_in)
+    return user_credentials.role_id if matches else None
 
 
 async def registration(session: AsyncSession, user_in: UserCreate):
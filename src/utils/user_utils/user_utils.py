@@ -8,14 +8,24 @@ from typing import Callable
 # for saving metadata of functions
 from functools import wraps
 
+# subject of the token is a printed [login, role_id] list
+from ast import literal_eval
+from hashlib import blake2b
+from time import time
+from typing import NamedTuple
+
 # auth files
 from core.config import AUTH_CONFIG
 from authx.schema import decode_token
 
 # authentication config
-from core.config import AUTH_CONFIG, ROLE_SETTING
+from core.config import AUTH_CONFIG, CREDENTIALS_CONFIG, ROLE_SETTING
+
+# bounded cache of decoded tokens
+from engine.cache import LRUCache
 
-from fastapi import HTTPException, Request
+from fastapi import HTTPException
+from starlette.requests import HTTPConnection
 
 # logger module
 from logger.logger_module import ModuleLoger
@@ -31,14 +41,73 @@ from schemas.user_schema import UserBase
 logger = ModuleLoger(Path(__file__).stem)
 
 
-async def only_teacher(request: Request):
+class Principal(NamedTuple):
+    """The user of a request, from the subject of the access token."""
+
+    login: str
+    role_id: int
+
+    @property
+    def is_teacher(self) -> bool:
+        return self.role_id == ROLE_SETTING.teacher_role_id
+
+
+# blake2b of the token -> (expires at, Principal); only verified tokens
+TOKEN_CACHE = LRUCache(maxsize=CREDENTIALS_CONFIG.token_cache_size)
+
+
+def decode_principal(token: str) -> Principal | None:
+    """
+    Verify the token and read its subject, or take both from TOKEN_CACHE.
+
+    :return: None for an invalid or expired token
+    """
+    key = blake2b(token.encode(), digest_size=16).digest()
+    cached = TOKEN_CACHE.get(key)
+    if cached is not None:
+        expires, principal = cached
+        if expires is None or expires > time():
+            return principal
+        TOKEN_CACHE.pop(key)
     try:
-        token = request.cookies[AUTH_CONFIG.JWT_ACCESS_COOKIE_NAME]
-        token = decode_token(token=token, key=AUTH_CONFIG.JWT_SECRET_KEY)
-        role = int(token["sub"][-2:-1])
-        if role != ROLE_SETTING.teacher_role_id:
-            logger.info("User %s ask access to teacher method." % token["sub"])
-            raise HTTPException(status_code=403, detail="Forbidden.")
+        payload = decode_token(token=token, key=AUTH_CONFIG.JWT_SECRET_KEY)
+        user_login, role_id = literal_eval(payload["sub"])
+        principal = Principal(str(user_login), int(role_id))
     except Exception as e:
-        logger.error(e)
+        logger.info("Invalid access token: %s" % e)
+        return None
+    TOKEN_CACHE.put(key, (payload.get("exp"), principal))
+    return principal
+
+
+def resolve_principal(connection: HTTPConnection) -> Principal | None:
+    """
+    Principal of a request or a websocket, resolved once and kept on
+    connection.state.principal.
+    """
+    if hasattr(connection.state, "principal"):
+        return connection.state.principal
+    token = connection.cookies.get(AUTH_CONFIG.JWT_ACCESS_COOKIE_NAME)
+    principal = decode_principal(token) if token else None
+    connection.state.principal = principal
+    return principal
+
+
+async def get_principal(connection: HTTPConnection) -> Principal:
+    """
+    Return the user of a request or a websocket, 401 without a valid access
+    token. Also used as a FastAPI dependency.
+    """
+    principal = resolve_principal(connection)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="Unauthorized.")
+    return principal
+
+
+async def only_teacher(connection: HTTPConnection) -> Principal:
+    """Return the current user if they are a teacher, 403 otherwise."""
+    principal = resolve_principal(connection)
+    if principal is None or not principal.is_teacher:
+        logger.info("User %s ask access to teacher method." % (principal,))
         raise HTTPException(status_code=403, detail="Forbidden.")
+    return principal
@@ -1,6 +1,8 @@
 from re import match
+from uuid import UUID
 
 from core.config import VALIDATION_SETTINGS
+from exceptions.ValidationException import UUIDValidationException
 
 
 def validate_uuid(uuid_input: str) -> bool:
@@ -18,3 +20,19 @@ def validate_uuid(uuid_input: str) -> bool:
         return False
 
     return match(r"^[0-9a-f-]+$", uuid_input) is not None
+
+
+def normalize_uuid(value: str) -> str:
+    """
+    Validate the uuid and bring it to the canonical form (lower case, with
+    dashes), so it can be used as a cache key.
+    :param value: input uuid
+    :return: canonical uuid
+    """
+    if not validate_uuid(value):
+        raise UUIDValidationException()
+    try:
+        return str(UUID(value))
+    except ValueError:
+        # the length check lets 33 to 35 characters through
+        raise UUIDValidationException() from None
@@ -3,40 +3,59 @@ from exceptions.AssignmentException import (
     AssignmentException,
     AssignmentGameFieldException,
     AssignmentPositionError,
+    AssignmentElementDuplicateError,
     AssignmentElementFieldError,
+    AssignmentActionError,
+    AssignmentGenerationError,
+    AssignmentProgramError,
+    AssignmentFieldEncodingError,
+    TraceStreamError,
 )
 from exceptions.CourseException import CourseNotFoundException
 from exceptions.ValidationException import UUIDValidationException
-from fastapi import APIRouter, HTTPException, Depends, Request, Body
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Request,
+    Body,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from pydantic import ValidationError
+import asyncio
 from typing import List
 
 from repository.assignment_repo import AssignmentRepo
 from repository.user_repo import UserRepository
-from schemas.action_schema import ActionGet
+from schemas.action_schema import ActionGet, AssignmentActionsChange
 
 # schemas of course
 from schemas.assignment_schema import (
     AssignmentGet,
     AssignmentCreate,
+    AssignmentsGeneration,
+    GeneratedAssignments,
 )
 
 from db.db_helper import db_helper
+from db.unit_of_work import UnitOfWork
 from schemas.game_element_schema import GameElementGet, GameElementCreate
+from schemas.simulation_schema import (
+    ProgramRun,
+    SimulationResultGet,
+    SolutionGet,
+    HintGet,
+)
+from schemas.program_schema import StructuredProgram
 from services.assignments_sevices import AssignmentsService
+from services.trace_stream import produce_frames, send_frames
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 
-# Auth library
-# ----------------------
-# import auth settings
-from core.config import AUTH_CONFIG
-
-# for auth working
-from authx import AuthX
-
-# ----------------------
+from core.config import TRACE_STREAM_SETTINGS
 
 # logger
 from logger.logger_module import ModuleLoger
@@ -49,12 +68,11 @@ from starlette.responses import Response
 from services.user_services import UserService
 
 # utils that check permissions
-from utils.user_utils.user_utils import only_teacher
+from utils.user_utils.user_utils import get_principal, only_teacher
 
 
 logger = ModuleLoger(Path(__file__).stem)
 
-security = AuthX(config=AUTH_CONFIG)
 router = APIRouter(tags=["Assignment"])
 
 
@@ -62,13 +80,13 @@ router = APIRouter(tags=["Assignment"])
     "/assignments/",
     response_model=List[AssignmentGet],
     dependencies=[
-        Depends(security.access_token_required),
+        Depends(get_principal),
     ],
 )
 async def get_assignments(
     response: Response,
     course_uuid: str,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> list[AssignmentGet]:
     try:
         logger.info("Try to get all assignments of course %s" % course_uuid)
@@ -223,7 +241,7 @@ async def delete_assignment(
 )
 async def get_total_info_assignment(
     assignment_uuid: str,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> tuple[AssignmentGet, tuple[GameElementGet, ...] | None]:
     pass
     try:
@@ -269,28 +287,39 @@ async def get_total_info_assignment(
 
 @router.post("/add_elements/")
 async def add_elements(
+    request: Request,
     element_list: list[GameElementCreate, ...],
     session: AsyncSession = Depends(db_helper.session_dependency),
 ):
+    await only_teacher(request)
     try:
         return await AssignmentsService.add_elements(
             element_list=element_list,
             session=session,
         )
-    except AssignmentElementFieldError:
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        )
+    except AssignmentElementFieldError as e:
         raise HTTPException(
             status_code=400,
-            detail="You cannot add this elements. "
+            detail=str(e)
+            or "You cannot add this elements. "
             "Some of them go beyond the limits of the "
             "playing field or are placed on already occupied squares. "
             "Or assignment doesn't exist.",
         )
+    except AssignmentElementDuplicateError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 
 @router.get("/actions/{assignment_uuid}/")
 async def get_actions(
     assignment_uuid: str,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     # TODO: create service and exceptions
     return await AssignmentRepo.get_assignment_actions(
@@ -299,15 +328,294 @@ async def get_actions(
     )
 
 
-@router.post("/add_actions/")
+@router.post("/add_actions/", response_model=AssignmentActionsChange)
 async def add_actions(
+    request: Request,
     actions_id: list[int, ...] = Body(),
     assignment_uuid: str = Body(),
     session: AsyncSession = Depends(db_helper.session_dependency),
-):
-    # TODO: create service and exceptions
-    return await AssignmentRepo.add_actions(
-        actions_id=actions_id,
-        assignment_uuid=assignment_uuid,
-        session=session,
-    )
+) -> AssignmentActionsChange:
+    """Attach actions to the assignment. Already attached ones are skipped."""
+    await only_teacher(request)
+    try:
+        return await AssignmentsService.add_actions(
+            actions_id=actions_id,
+            assignment_uuid=assignment_uuid,
+            session=session,
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        )
+    except AssignmentActionError:
+        raise HTTPException(
+            status_code=400,
+            detail="Assignment or some of the actions don't exist.",
+        )
+
+
+@router.post("/set_actions/", response_model=AssignmentActionsChange)
+async def set_actions(
+    request: Request,
+    actions_id: list[int, ...] = Body(),
+    assignment_uuid: str = Body(),
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> AssignmentActionsChange:
+    """
+    Replace the whole action set of the assignment with actions_id.
+    The response lists added and removed actions.
+    """
+    await only_teacher(request)
+    try:
+        return await AssignmentsService.set_actions(
+            actions_id=actions_id,
+            assignment_uuid=assignment_uuid,
+            session=session,
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        )
+    except AssignmentActionError:
+        raise HTTPException(
+            status_code=400,
+            detail="Assignment or some of the actions don't exist.",
+        )
+
+
+@router.post("/run/{assignment_uuid}/", response_model=SimulationResultGet)
+async def run_program(
+    assignment_uuid: str,
+    program_run: ProgramRun,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> SimulationResultGet:
+    """Run the program on the assignment's field and return the outcome."""
+    try:
+        result = await AssignmentsService.run_program(
+            assignment_uuid=assignment_uuid,
+            program=(
+                program_run.program.to_engine()
+                if isinstance(program_run.program, StructuredProgram)
+                else program_run.program
+            ),
+            session=session,
+            with_trace=program_run.with_trace,
+        )
+    except AssignmentProgramError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        )
+    except AssignmentNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Assignment with id {assignment_uuid} not found",
+        )
+    return SimulationResultGet.model_validate(result)
+
+
+@router.websocket("/run/{assignment_uuid}/stream/")
+async def stream_program_run(assignment_uuid: str, websocket: WebSocket):
+    """
+    Run the program and stream its trace for playback.
+
+    The client sends the body of /run/ as the first text message, then gets
+    binary frames (engine/trace_codec.py) and acknowledges played MOVES
+    frames with {"ack": sequence} (services/trace_stream.py). Errors close
+    the socket with 4000 + the status code /run/ would answer.
+    """
+    await websocket.accept()
+    try:
+        try:
+            program_run = ProgramRun.model_validate_json(
+                await asyncio.wait_for(
+                    websocket.receive_text(),
+                    timeout=TRACE_STREAM_SETTINGS.receive_timeout,
+                )
+            )
+        except (TimeoutError, ValidationError):
+            await websocket.close(code=4400, reason="Expected a program.")
+            return
+        try:
+            # the connection is returned before the stream starts
+            session_factory = db_helper.replica_session_factory
+            async with UnitOfWork(session_factory) as session:
+                field, bytecode = await AssignmentsService.prepare_trace(
+                    assignment_uuid=assignment_uuid,
+                    program=(
+                        program_run.program.to_engine()
+                        if isinstance(program_run.program, StructuredProgram)
+                        else program_run.program
+                    ),
+                    session=session,
+                )
+        except AssignmentProgramError as e:
+            await websocket.close(code=4422, reason=str(e)[:120])
+            return
+        except UUIDValidationException:
+            await websocket.close(
+                code=4400, reason="UUID of assignment validation error."
+            )
+            return
+        except AssignmentNotFoundException:
+            await websocket.close(code=4404, reason="Assignment not found.")
+            return
+
+        await send_frames(
+            websocket,
+            produce_frames(
+                field, bytecode, TRACE_STREAM_SETTINGS.frame_runs
+            ),
+            window=TRACE_STREAM_SETTINGS.window,
+            timeout=TRACE_STREAM_SETTINGS.receive_timeout,
+        )
+        await websocket.close()
+    except TraceStreamError as e:
+        logger.info("Trace stream of %s closed: %s" % (assignment_uuid, e))
+        await websocket.close(code=4408, reason=str(e))
+    except WebSocketDisconnect:
+        logger.info("Trace stream of %s disconnected" % assignment_uuid)
+
+
+@router.get("/solvability/{assignment_uuid}/", response_model=SolutionGet)
+async def get_solvability(
+    assignment_uuid: str,
+    request: Request,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> SolutionGet:
+    """
+    Whether the goal can be reached with the actions of the assignment, the
+    optimal number of steps and, for teachers only, one of the shortest
+    programs.
+    """
+    principal = await get_principal(request)
+    try:
+        solution = await AssignmentsService.solve(
+            assignment_uuid=assignment_uuid, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        )
+    except AssignmentNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Assignment with id {assignment_uuid} not found",
+        )
+    solution = SolutionGet.model_validate(solution)
+    if not principal.is_teacher:
+        # the program is the answer to the assignment
+        solution.program = None
+    return solution
+
+
+@router.get("/hint/{assignment_uuid}/", response_model=HintGet)
+async def get_hint(
+    assignment_uuid: str,
+    x: int,
+    y: int,
+    request: Request,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> HintGet:
+    """Next move from the cell (x, y) on a shortest path to the goal."""
+    await get_principal(request)
+    try:
+        hint = await AssignmentsService.get_hint(
+            assignment_uuid=assignment_uuid, x=x, y=y, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        )
+    except AssignmentNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Assignment with id {assignment_uuid} not found",
+        )
+    except AssignmentPositionError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cell ({x}, {y}) is outside of the game field.",
+        )
+    return HintGet.model_validate(hint)
+
+
+@router.post(
+    "/course/{course_uuid}/generate_assignments/",
+    response_model=GeneratedAssignments,
+)
+async def generate_assignments(
+    course_uuid: str,
+    generation: AssignmentsGeneration,
+    request: Request,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> GeneratedAssignments:
+    """
+    Create up to count solvable levels in the course. Levels are named
+    "<name_prefix> <n>" from the shortest optimal program to the longest.
+    """
+    await only_teacher(request)
+    try:
+        return await AssignmentsService.generate_assignments(
+            course_uuid=course_uuid, generation=generation, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of course validation error. UUID should be 32..36 "
+            "length and UUID must contains only hex symbols.",
+        )
+    except CourseNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Course with id {course_uuid} not found",
+        )
+    except (AssignmentActionError, AssignmentGenerationError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get(
+    "/field/{assignment_uuid}/",
+    response_class=Response,
+    responses={200: {"content": {"application/octet-stream": {}}}},
+)
+async def get_field_blob(
+    assignment_uuid: str,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> Response:
+    """
+    Return the whole game field with elements and actions in the binary
+    format of engine/field_codec.py.
+    """
+    try:
+        blob = await AssignmentsService.get_field_blob(
+            assignment_uuid=assignment_uuid, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        )
+    except AssignmentNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Assignment with id {assignment_uuid} not found",
+        )
+    except AssignmentFieldEncodingError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+    return Response(content=blob, media_type="application/octet-stream")
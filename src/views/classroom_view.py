@@ -0,0 +1,55 @@
+from contextlib import suppress
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+
+from core.config import ROLE_SETTING
+from db.db_helper import db_helper
+from db.unit_of_work import UnitOfWork
+from exceptions.ValidationException import UUIDValidationException
+from logger.logger_module import ModuleLoger
+from repository.course_repo import CourseRepository
+from services.classroom_hub import CLASSROOM_HUB, serve_subscriber
+from utils.user_utils.user_utils import get_principal
+from utils.uuid_checker import normalize_uuid
+
+logger = ModuleLoger(Path(__file__).stem)
+
+router = APIRouter(tags=["classroom"])
+
+
+@router.websocket("/course/{course_uuid}/live/")
+async def classroom_live(course_uuid: str, websocket: WebSocket):
+    """
+    Progress of the students of the course as they submit, for teachers:
+    {"updates": [...]} messages with the new journal entries (see
+    schemas/classroom_schema.py), at most one per CLASSROOM_COALESCE_MS.
+    Errors close the socket with 4000 + the HTTP status code.
+    """
+    # accepted first: a close before the handshake reaches the client as
+    # a 403 of the upgrade, without the code
+    await websocket.accept()
+    try:
+        _, role_id = await get_principal(websocket)
+    except HTTPException:
+        await websocket.close(code=4401, reason="Not authenticated.")
+        return
+    if role_id != ROLE_SETTING.teacher_role_id:
+        await websocket.close(code=4403, reason="Only for teachers.")
+        return
+    try:
+        course_id = normalize_uuid(course_uuid)
+    except UUIDValidationException:
+        await websocket.close(
+            code=4400, reason="UUID of course validation error."
+        )
+        return
+    async with UnitOfWork(db_helper.replica_session_factory) as session:
+        exists = await CourseRepository.is_course_exists(session, course_id)
+    if not exists:
+        await websocket.close(code=4404, reason="Course not found.")
+        return
+
+    with suppress(WebSocketDisconnect):
+        await serve_subscriber(websocket, CLASSROOM_HUB, course_id)
+    logger.info(f"Live view of course {course_id} closed")
@@ -17,16 +17,6 @@ from core.config import ROLE_SETTING
 from exceptions.UserException import UserNotFound
 from exceptions.ValidationException import UUIDValidationException
 
-# Auth library
-# ----------------------
-# import auth settings
-from core.config import AUTH_CONFIG
-
-# for auth working
-from authx import AuthX
-
-# ----------------------
-
 from services.course_services import CourseServices
 
 # logger
@@ -41,7 +31,6 @@ from starlette.responses import Response
 from utils.user_utils.user_utils import only_teacher
 
 router = APIRouter(tags=["course"])
-security = AuthX(config=AUTH_CONFIG)
 
 logger = ModuleLoger(Path(__file__).stem)
 
@@ -49,7 +38,7 @@ logger = ModuleLoger(Path(__file__).stem)
 @router.get("/course/{course_uuid}/", response_model=CourseGet)
 async def get_course(
     course_uuid: str,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> CourseGet:
     """
     Retrieves a course by its UUID.
@@ -80,7 +69,7 @@ async def get_course(
 @router.get("/courses/owner/{owner_login}", response_model=List[CourseGet])
 async def get_courses_by_owner(
     owner_login: str,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> list[CourseGet]:
     """
     Retrieves all courses owned by a specific user.
@@ -103,7 +92,7 @@ async def get_courses_by_owner(
 @router.get("/courses/")
 async def get_courses(
     response: Response,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> List[CourseGet]:
     try:
         courses = await CourseServices.get_all_courses(session=session)
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import GRADING_SETTINGS
+from db.db_helper import db_helper
+from logger.logger_module import ModuleLoger
+from schemas.grading_schema import SubmissionGrade
+from services.grading_services import GradingService
+from utils.user_utils.user_utils import only_teacher
+
+logger = ModuleLoger(Path(__file__).stem)
+
+router = APIRouter(tags=["grading"])
+
+
+@router.post("/grade/batch/")
+async def grade_batch(
+    submissions: list[SubmissionGrade],
+    request: Request,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> StreamingResponse:
+    """
+    Grade many (assignment_id, program) pairs. The response is NDJSON, one
+    GradeResult per line in order of completion; index points back to the
+    submission in the request.
+    """
+    await only_teacher(request)
+    if len(submissions) > GRADING_SETTINGS.max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch is larger than {GRADING_SETTINGS.max_batch_size} "
+            "submissions.",
+        )
+
+    # fields are loaded before streaming starts, the session is closed by
+    # the time the body is sent
+    fields = await GradingService.load_fields(
+        assignment_ids=[s.assignment_id for s in submissions],
+        session=session,
+    )
+
+    async def body():
+        async for result in GradingService.grade_batch(submissions, fields):
+            yield result.model_dump_json(exclude_unset=True) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
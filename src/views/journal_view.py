@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.db_helper import db_helper
+from exceptions.CourseException import CourseNotFoundException
+from exceptions.ValidationException import UUIDValidationException
+from logger.logger_module import ModuleLoger
+from schemas.journal_schema import CourseJournal
+from services.journal_services import JournalService
+from utils.user_utils.user_utils import get_principal, only_teacher
+
+logger = ModuleLoger(Path(__file__).stem)
+
+router = APIRouter(tags=["journal"])
+
+
+@router.get("/course/{course_uuid}/journal/", response_model=CourseJournal)
+async def get_course_journal(
+    course_uuid: str,
+    request: Request,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> CourseJournal:
+    """
+    Journal of the course: attempts, best result and last attempt of every
+    user of the course on every assignment.
+    """
+    await only_teacher(request)
+    try:
+        return await JournalService.get_course_journal(
+            course_uuid=course_uuid, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of course validation error. "
+            "UUID should be 32..36 length and UUID must contains "
+            "only hex symbols.",
+        ) from None
+    except CourseNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Course with id {course_uuid} not found",
+        ) from None
+
+
+@router.get(
+    "/course/{course_uuid}/journal/me/", response_model=CourseJournal
+)
+async def get_my_journal(
+    course_uuid: str,
+    request: Request,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> CourseJournal:
+    """Journal of the course with the row of the current user only."""
+    user_login, _ = await get_principal(request)
+    try:
+        return await JournalService.get_user_journal(
+            course_uuid=course_uuid, user_login=user_login, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of course validation error. "
+            "UUID should be 32..36 length and UUID must contains "
+            "only hex symbols.",
+        ) from None
+    except CourseNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Course with id {course_uuid} not found",
+        ) from None
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import LEADERBOARD_SETTINGS
+from db.db_helper import db_helper
+from exceptions.CourseException import CourseNotFoundException
+from exceptions.ValidationException import UUIDValidationException
+from logger.logger_module import ModuleLoger
+from schemas.leaderboard_schema import Leaderboard
+from services.leaderboard_services import LeaderboardService
+from utils.user_utils.user_utils import get_principal
+
+logger = ModuleLoger(Path(__file__).stem)
+
+router = APIRouter(tags=["leaderboard"])
+
+
+@router.get(
+    "/course/{course_uuid}/leaderboard/",
+    response_model=Leaderboard,
+    responses={304: {"description": "The board didn't change"}},
+)
+async def get_leaderboard(
+    course_uuid: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(
+        default=LEADERBOARD_SETTINGS.size,
+        ge=1,
+        le=LEADERBOARD_SETTINGS.max_size,
+    ),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    """
+    Best users of the course, kept in memory. Send the ETag of the last
+    answer as If-None-Match to get 304 while the board is the same.
+    """
+    await get_principal(request)
+    try:
+        etag = LeaderboardService.etag(course_uuid)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        leaderboard = await LeaderboardService.get_leaderboard(
+            course_uuid=course_uuid, limit=limit, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of course validation error. "
+            "UUID should be 32..36 length and UUID must contains "
+            "only hex symbols.",
+        ) from None
+    except CourseNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Course with id {course_uuid} not found",
+        ) from None
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return leaderboard
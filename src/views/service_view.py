@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends
+
+from db.db_helper import db_helper
+from engine.cache import (
+    DISTANCE_MAP_CACHE,
+    GRADE_CACHE,
+    PROGRAM_FINGERPRINTS,
+    SOLUTION_CACHE,
+)
+from logger.logger_module import ModuleLoger
+from services.classroom_hub import CLASSROOM_HUB
+from services.submission_buffer import SUBMISSION_BUFFER
+from utils.user_utils.user_utils import TOKEN_CACHE, only_teacher
+
+logger = ModuleLoger(Path(__file__).stem)
+
+# internal telemetry, for teachers only
+router = APIRouter(tags=["service"], dependencies=[Depends(only_teacher)])
+
+
+@router.get("/service/pool_stats/")
+async def get_pool_stats() -> dict:
+    """
+    Telemetry of the database connection pool: checked-out connections,
+    overflow, checkout wait time and checkout latency histogram.
+    """
+    stats = db_helper.pool_stats()
+    logger.info(f"Pool stats requested: {stats}")
+    return stats
+
+
+@router.get("/service/cache_stats/")
+async def get_cache_stats() -> dict:
+    """
+    Size, hits, misses and evictions of the caches of the process that
+    answers: every server worker has its own.
+    """
+    return {
+        "solutions": SOLUTION_CACHE.stats(),
+        "distance_maps": DISTANCE_MAP_CACHE.stats(),
+        "grades": GRADE_CACHE.stats(),
+        "program_fingerprints": PROGRAM_FINGERPRINTS.stats(),
+        "access_tokens": TOKEN_CACHE.stats(),
+    }
+
+
+@router.get("/service/submission_buffer_stats/")
+async def get_submission_buffer_stats() -> dict:
+    """
+    Submissions of this process waiting to be written, written so far and
+    failed flushes, see services/submission_buffer.py.
+    """
+    return SUBMISSION_BUFFER.stats()
+
+
+@router.get("/service/classroom_stats/")
+async def get_classroom_stats() -> dict:
+    """
+    Whether this process listens for updates of the other workers, and
+    the live course views it serves, see services/classroom_hub.py.
+    """
+    return CLASSROOM_HUB.stats()
@@ -0,0 +1,184 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import ROLE_SETTING, SUBMISSION_SETTINGS
+from db.db_helper import db_helper
+from exceptions.AssignmentException import (
+    AssignmentNotFoundException,
+    AssignmentProgramError,
+)
+from exceptions.SubmissionException import (
+    SubmissionBufferFullError,
+    SubmissionCursorError,
+    SubmissionForbiddenError,
+    SubmissionNotFoundException,
+)
+from exceptions.ValidationException import UUIDValidationException
+from logger.logger_module import ModuleLoger
+from schemas.submission_schema import (
+    SubmissionCreate,
+    SubmissionDelete,
+    SubmissionGet,
+    SubmissionPage,
+)
+from services.submission_services import SubmissionService
+from utils.user_utils.user_utils import get_principal, only_teacher
+
+logger = ModuleLoger(Path(__file__).stem)
+
+router = APIRouter(tags=["submission"])
+
+
+@router.post("/submission/", response_model=SubmissionGet, status_code=201)
+async def create_submission(
+    submission_in: SubmissionCreate,
+    request: Request,
+    # the primary: a grade against a field the replica hasn't updated yet
+    # would be stored for good
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SubmissionGet:
+    """
+    Run the program of the current user on the assignment and save it as
+    a submission. The submission is written to the database in the
+    background, within SUBMISSION_FLUSH_INTERVAL_MS. Only users on the
+    course of the assignment can submit.
+    """
+    user_login, _ = await get_principal(request)
+    try:
+        return await SubmissionService.submit(
+            user_login=user_login,
+            submission_in=submission_in,
+            session=session,
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        ) from None
+    except AssignmentNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Assignment with id {submission_in.assignment_id} "
+            "not found",
+        ) from None
+    except SubmissionForbiddenError:
+        raise HTTPException(
+            status_code=403, detail="You are not on the course."
+        ) from None
+    except AssignmentProgramError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except SubmissionBufferFullError:
+        logger.error("Submission buffer is full")
+        raise HTTPException(
+            status_code=503,
+            detail="Submissions can't be saved now, try again later.",
+        ) from None
+
+
+@router.get("/submission/{submission_uuid}/", response_model=SubmissionGet)
+async def get_submission(
+    submission_uuid: str,
+    request: Request,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> SubmissionGet:
+    """Submission by id. Children see only their own submissions."""
+    user_login, role_id = await get_principal(request)
+    try:
+        submission = await SubmissionService.get_submission(
+            submission_id=submission_uuid, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of submission validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        ) from None
+    except SubmissionNotFoundException:
+        submission = None
+    if submission is None or (
+        role_id != ROLE_SETTING.teacher_role_id
+        and submission.user_login != user_login
+    ):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Submission with id {submission_uuid} not found",
+        )
+    return submission
+
+
+@router.get("/submissions/", response_model=SubmissionPage)
+async def get_submissions(
+    request: Request,
+    user_login: str | None = None,
+    assignment_id: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(
+        default=SUBMISSION_SETTINGS.page_size,
+        ge=1,
+        le=SUBMISSION_SETTINGS.max_page_size,
+    ),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> SubmissionPage:
+    """
+    Submissions of a user, optionally of one assignment, ordered by
+    assignment and time. Pass next_cursor of a page as cursor to get the
+    next one. Children get their own submissions whatever user_login is.
+    """
+    current_login, role_id = await get_principal(request)
+    if role_id != ROLE_SETTING.teacher_role_id or user_login is None:
+        user_login = current_login
+    try:
+        return await SubmissionService.get_user_submissions(
+            user_login=user_login,
+            assignment_id=assignment_id,
+            cursor=cursor,
+            limit=limit,
+            session=session,
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of assignment validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        ) from None
+    except SubmissionCursorError:
+        raise HTTPException(
+            status_code=400, detail="Invalid cursor."
+        ) from None
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Error occurred while getting submissions of {user_login}: {e}"
+        )
+        raise HTTPException(
+            status_code=500, detail="Database Server Error"
+        ) from e
+
+
+@router.delete(
+    "/submission/{submission_uuid}/", response_model=SubmissionDelete
+)
+async def delete_submission(
+    submission_uuid: str,
+    request: Request,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SubmissionDelete:
+    await only_teacher(request)
+    try:
+        return await SubmissionService.delete_submission(
+            submission_id=submission_uuid, session=session
+        )
+    except UUIDValidationException:
+        raise HTTPException(
+            status_code=400,
+            detail="UUID of submission validation error. UUID should be "
+            "32..36 length and UUID must contains only hex symbols.",
+        ) from None
+    except SubmissionNotFoundException:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Submission with id {submission_uuid} not found",
+        ) from None
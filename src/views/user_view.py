@@ -18,8 +18,7 @@ from pydantic import EmailStr
 from core.config import AUTH_CONFIG
 
 # for auth working
-from authx import AuthX
-from authx.schema import decode_token
+from core.security import security
 
 # logger
 from logger.logger_module import ModuleLoger
@@ -29,7 +28,7 @@ from pathlib import Path
 
 # user login check
 from utils.user_utils.user_security import authentication
-from utils.user_utils.user_utils import only_teacher
+from utils.user_utils.user_utils import Principal, only_teacher
 
 # __file__ -> path to file
 # method stem get name of file from path without type of file
@@ -40,9 +39,6 @@ router = APIRouter(tags=["user"])
 
 RESERVED_WORDS = ["users", "teachers", "admins"]
 
-# auth work
-security = AuthX(config=AUTH_CONFIG)
-
 
 # Routes:
 @router.get(
@@ -51,7 +47,7 @@ security = AuthX(config=AUTH_CONFIG)
 )
 async def get_all_users(
     request: Request,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     """Get all list of users"""
     await only_teacher(request)
@@ -68,7 +64,7 @@ async def get_all_users(
 )
 async def get_all_students(
     request: Request,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     await only_teacher(request)
     """Get all list of students"""
@@ -84,7 +80,7 @@ async def get_all_students(
 
 @router.get("/teachers/", response_model=list[UserWithMD])
 async def get_all_teachers(
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     """Get all list of teachers"""
     teachers = await UserService.get_users(
@@ -106,7 +102,7 @@ async def get_all_teachers(
 async def get_user(
     phone: str | None = None,
     email: str | None = None,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> UserWithMD | None:
     """
     Get user by query parameters (email or phone)
@@ -151,12 +147,14 @@ async def user_auth(
     credentials: UserLogin = Body(),
     session: AsyncSession = Depends(db_helper.session_dependency),
 ):
-    if await authentication(
+    # the role comes from the database, never from the request
+    role_id = await authentication(
         session, credentials.user_login, credentials.password
-    ):
+    )
+    if role_id is not None:
         logger.info(f"User %s login successful" % credentials.user_login)
         token = security.create_access_token(
-            uid=str([credentials.user_login, credentials.role_id]),
+            uid=str([credentials.user_login, role_id]),
         )
         response.set_cookie(AUTH_CONFIG.JWT_ACCESS_COOKIE_NAME, token)
         return {"access_token": token}
@@ -166,26 +164,15 @@ async def user_auth(
     return {"status": "Incorrect username or password"}
 
 
-@router.get(
-    "/protected/",
-    dependencies=[
-        Depends(security.access_token_required),
-    ],
-)
-async def whoami(request: Request):
-    await only_teacher(
-        request
-    )  # TODO: figure out how create decorator for fast-api route
-    token = request.cookies[AUTH_CONFIG.JWT_ACCESS_COOKIE_NAME]
-    token = decode_token(token=token, key=AUTH_CONFIG.JWT_SECRET_KEY)
-    role = int(token["sub"][-2:-1])
-    return role
+@router.get("/protected/")
+async def whoami(principal: Principal = Depends(only_teacher)):
+    return principal.role_id
 
 
 @router.get("/user/{login}/", response_model=UserWithMD, status_code=200)
 async def get_user_by_login(
     login: str,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     """Get user by login"""
     """